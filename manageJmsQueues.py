@@ -6,11 +6,33 @@ Available functionality:
     [2] List queues without listeners. The report will also contain count of current messages and current consumers.
     [3] List all queues with current messages. The report will  contain count of current messages and current consumers.
     [4] List DMQ queues with current messages. The report will also contain count of current messages.
+        Reports [3] and [4] show the age of the oldest message (OLDEST_AGE) on request and can be sorted by it.
     [5] Delete messages from a given queue. Optionally, use filer to select a set of messages.
     [6] Delete queues. Input: One or several queue names separated by space.
-    [7] Move messages from one queue (e.g. DMQ) to another.
+    [7] Move messages from one queue (e.g. DMQ) to another. Optionally paced (see move_member_messages_paced).
     [8] Get the queue information:  Queue name, Messages Current Count, Messages Received Count as well as some basic
         information about the queue's first and last messages (size, timestamp, etc)
+    [10] Watch queues. Logs an alert when a threshold rule is raised or cleared (see function watch).
+    [11] Refresh snapshot. Reports [1]-[4] are rendered from a session snapshot of the destination statistics.
+    [12] List top N queues by backlog (current + pending messages) with consumers and the oldest message timestamp.
+    [13] List durable topic subscribers with count of current and pending messages and active state.
+    [14] Purge durable topic subscriber. Delete its messages or move them to a queue (with or without filter).
+    [15] Find duplicate messages on queue (same payload). Optionally, delete all but the oldest copy.
+    [16] List JMS servers with bytes, paging, thresholds, persistent store and destination totals.
+    [17] Apply retention policies. Purge messages by max age and/or max depth per queue pattern (see apply_retention).
+    [18] Save snapshot to file. Choose the file instead of an environment to render [1]-[4] and [8] offline.
+    [19] Route messages. Move messages from one queue to several queues by an ordered selector -> target rule file.
+    [20] Create queues. Create all queues of a spec file in one edit session (see create_queues).
+    [21] Migrate messages. Copy messages to a queue in another environment in transacted batches (see migrate_messages).
+    [22] Dashboard. Refreshing terminal table of the queue statistics with the views of [1]-[4] (see dashboard).
+    [23] List background jobs. [5] and [7] can run in the background after confirmation (see run_job).
+    [24] Background job status. Progress per source queue member, derived from its current message count.
+    [25] Cancel background job. The queue members not yet processed are skipped.
+    [26] List logical queues. Members of distributed queues aggregated per JMS module and queue name, with imbalance.
+    [27] Find message. Search all queues for a JMSMessageID, JMSCorrelationID or selector (see find_message).
+    [28] List JMS inventory. JMS module configuration read without an edit session, optionally exported to JSON.
+    [29] List consumers. Client ID, host, received and pending messages and receive rate per consumer.
+    [30] Reconcile queues. Missing, extra and duplicated messages of a target queue by key (see reconcile).
 Examples of message filters that can be used for deleting or moving a set of messages: 
         1. JMS_BEA_State LIKE 'expired' - remove all messages with state 'expired'
         2. JMSTimestamp > '2018-05-03 17:47:53.728' - all messages older than 2018-05-03T17:47:53.728
@@ -19,17 +41,21 @@ Examples of message filters that can be used for deleting or moving a set of mes
 See here for more examples of message selectors: https://docs.oracle.com/javaee/6/api/javax/jms/Message.html
 Manual usage:
 1. Execute: wlst manageJmsQueues.py -loadProperties manageJmsQueues_[ENV].properties
-2. Select action 0-9 manually
+2. Select action manually
 Automatic/silent usage:
 1. Execute: wlst manageJMSQueues.py [operation] [env] [par1, par2, ..., parn]
 """
 
+import fnmatch
 import os
 import os.path
 import random
 import re
 import sys
+import threading
+import time
 
+import jarray
 import java.util.Calendar
 import java.util.Date
 import java.text.SimpleDateFormat
@@ -37,11 +63,43 @@ import java.text.ParseException
 
 from time import strftime, localtime
 from java.io import File
+from java.io import ByteArrayOutputStream
 from java.io import FileInputStream
+from java.io import FileOutputStream
+from java.io import ObjectOutputStream
+from java.lang import Long
+from java.lang import Runnable
+from java.lang import String
+from java.lang import System
+from java.lang import Thread
+from java.nio import ByteBuffer
+from java.security import MessageDigest
+from java.util import Hashtable
+from java.util import Arrays
+from java.util import Comparator
+from java.util import Date
+from java.util import PriorityQueue
 from java.util import Properties
+from java.util.concurrent import Callable
+from java.util.concurrent import Executors
+from java.util.concurrent import TimeoutException
+from java.util.concurrent import TimeUnit
+from java.util.concurrent.atomic import AtomicInteger
+from javax.jms import BytesMessage
+from javax.jms import MapMessage
+from javax.jms import MessageEOFException
 from javax.jms import ObjectMessage
+from javax.jms import Session
+from javax.jms import StreamMessage
 from javax.jms import TextMessage
+from javax.management import InstanceNotFoundException
+from javax.management import ObjectName
+from javax.management.remote import JMXConnectorFactory
+from javax.management.remote import JMXServiceURL
+from javax.naming import Context
+from javax.naming import InitialContext
 from weblogic.jms.extensions import JMSMessageInfo
+from weblogic.management.jmx import MBeanServerInvocationHandler
 
 
 def main():
@@ -51,7 +109,8 @@ def main():
     """
     keep_main_loop = True
     is_connected = False
-    connection_info = {"is_connected": is_connected, "env": env, "url": url, "username": username, "password": password}
+    connection_info = {"is_connected": is_connected, "env": env, "url": url, "username": username, "password": password,
+                       "settings": get_settings(None), "offline": None}
     
     # Choose and environment and make a connection to it
     while not connection_info["is_connected"]:
@@ -59,7 +118,7 @@ def main():
         is_connected = connection_info["is_connected"]
         if is_standalone and not is_connected:
             f.close()
-            disconnect()
+            disconnect_all()
             exit()
         elif not is_connected:
             connection_info["env"] = ""
@@ -72,11 +131,13 @@ def main():
             else:
                 log("ERROR", "Incomplete/incorrect list of parameters.")
                 f.close()
-                disconnect()
+                disconnect_all()
                 exit()
             keep_main_loop = False
         else:
-            if connection_info["env"]:
+            if connection_info["offline"]:
+                cur_con_status = "currently offline, snapshot of " + connection_info["env"]
+            elif connection_info["env"]:
                 cur_con_status = "currently connectred to " + connection_info["env"]
             else:
                 cur_con_status = "currently not connected"
@@ -90,13 +151,34 @@ def main():
             print("[6] Delete queues")
             print("[7] Move messages from one JMS queue to another")
             print("[8] Get queue information")
+            print("[10] Watch queues (threshold alerts)")
+            print("[11] Refresh snapshot (" + get_snapshot_status(connection_info) + ")")
+            print("[12] List top queues by backlog")
+            print("[13] List durable topic subscribers")
+            print("[14] Purge durable topic subscriber")
+            print("[15] Find duplicate messages on queue")
+            print("[16] List JMS servers and persistent stores")
+            print("[17] Apply retention policies")
+            print("[18] Save snapshot to file")
+            print("[19] Route messages from one queue to several queues by selector rules")
+            print("[20] Create queues from a spec file")
+            print("[21] Migrate messages to a queue in another environment")
+            print("[22] Dashboard of queue backlogs")
+            print("[23] List background jobs")
+            print("[24] Background job status")
+            print("[25] Cancel background job")
+            print("[26] List logical queues (distributed queue members aggregated)")
+            print("[27] Find message by JMSMessageID, JMSCorrelationID or selector")
+            print("[28] List JMS inventory (queues, topics, foreign destinations, error destinations, quotas)")
+            print("[29] List consumers with client, host and receive rate")
+            print("[30] Reconcile messages of two queues (missing, extra, duplicated)")
             print("[9] Exit")
             print("")
             while True:
                 procedure = raw_input("[INPUT] Choose what you want to do from the list above: ")
                 print("")
                 if not procedure:
-                    print(cur_dt() + " [ERROR] Input cannot be empty. Please, enter a number from 0 to 9.")
+                    print(cur_dt() + " [ERROR] Input cannot be empty. Please, enter a number from the list above.")
                 else:
                     break
         try:
@@ -123,27 +205,103 @@ def main():
                 connection_info = start_connect(
                     "delete_messages_from_queue", connection_info)
                 delete_messages_from_queue(connection_info)
+                invalidate_snapshot(connection_info)
             elif procedure == "6" or procedure == "delete_queues":
                 connection_info = start_connect("delete_queues", connection_info)
                 delete_queues(connection_info)
+                invalidate_snapshot(connection_info)
             elif procedure == "7" or procedure == "move_messages":
                 connection_info = start_connect("move_messages", connection_info)
                 move_messages(connection_info)
+                invalidate_snapshot(connection_info)
             elif procedure == "8" or procedure == "get_queue_info":
                 connection_info = start_connect("get_queue_info", connection_info)
                 get_queue_info(connection_info)
+            elif procedure == "10" or procedure == "watch":
+                connection_info = start_connect("watch", connection_info)
+                watch(connection_info)
+            elif procedure == "11" or procedure == "refresh_snapshot":
+                connection_info = start_connect("refresh_snapshot", connection_info)
+                take_snapshot(connection_info)
+                log("INFO", "refresh_snapshot completed.")
+            elif procedure == "12" or procedure == "top_queues":
+                connection_info = start_connect("top_queues", connection_info)
+                top_queues(connection_info)
+            elif procedure == "13" or procedure == "list_topic_subscribers":
+                connection_info = start_connect("list_topic_subscribers", connection_info)
+                list_topic_subscribers(connection_info)
+            elif procedure == "14" or procedure == "purge_subscriber":
+                connection_info = start_connect("purge_subscriber", connection_info)
+                purge_subscriber(connection_info)
+                invalidate_snapshot(connection_info)
+            elif procedure == "15" or procedure == "find_duplicates":
+                connection_info = start_connect("find_duplicates", connection_info)
+                find_duplicates(connection_info)
+            elif procedure == "16" or procedure == "list_jms_servers":
+                connection_info = start_connect("list_jms_servers", connection_info)
+                list_jms_servers(connection_info)
+            elif procedure == "17" or procedure == "apply_retention":
+                connection_info = start_connect("apply_retention", connection_info)
+                apply_retention(connection_info)
+                invalidate_snapshot(connection_info)
+            elif procedure == "18" or procedure == "save_snapshot":
+                connection_info = start_connect("save_snapshot", connection_info)
+                save_snapshot(connection_info)
+            elif procedure == "19" or procedure == "route_messages":
+                connection_info = start_connect("route_messages", connection_info)
+                route_messages(connection_info)
+                invalidate_snapshot(connection_info)
+            elif procedure == "20" or procedure == "create_queues":
+                connection_info = start_connect("create_queues", connection_info)
+                create_queues(connection_info)
+                invalidate_snapshot(connection_info)
+            elif procedure == "21" or procedure == "migrate_messages":
+                connection_info = start_connect("migrate_messages", connection_info)
+                migrate_messages(connection_info)
+                invalidate_snapshot(connection_info)
+            elif procedure == "22" or procedure == "dashboard":
+                connection_info = start_connect("dashboard", connection_info)
+                dashboard(connection_info)
+            elif procedure == "23" or procedure == "list_jobs":
+                list_jobs(connection_info)
+            elif procedure == "24" or procedure == "job_status":
+                job_status(connection_info)
+            elif procedure == "25" or procedure == "cancel_job":
+                cancel_job(connection_info)
+            elif procedure == "26" or procedure == "list_logical_queues":
+                connection_info = start_connect("list_logical_queues", connection_info)
+                list_logical_queues(connection_info)
+            elif procedure == "27" or procedure == "find_message":
+                connection_info = start_connect("find_message", connection_info)
+                find_message(connection_info)
+            elif procedure == "28" or procedure == "list_inventory":
+                connection_info = start_connect("list_inventory", connection_info)
+                list_inventory(connection_info)
+            elif procedure == "29" or procedure == "list_consumers":
+                connection_info = start_connect("list_consumers", connection_info)
+                list_consumers(connection_info)
+            elif procedure == "30" or procedure == "reconcile":
+                connection_info = start_connect("reconcile", connection_info)
+                reconcile(connection_info)
             elif procedure == "9":
+                running_cnt = 0
+                for job in jobs:
+                    if job["status"] == "Running":
+                        running_cnt = running_cnt + 1
+                if running_cnt > 0:
+                    exit_choice = raw_input("[INPUT] " + str(running_cnt) + " background job(s) still running and "
+                                            + "will be stopped. Do you want to exit, Y/N [N]? ")
+                    if exit_choice.strip().upper() != "Y":
+                        continue
                 break
             else:
                 log("ERROR", "Unknown procedure number: " + procedure + ". Try again.")
         except:
+            # The session is kept: the pooled connection is health-checked and reopened before the next operation
             log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
-            disconnect()
-            is_connected = False
-            connection_info["is_connected"] = is_connected
 
     f.close()
-    disconnect()
+    disconnect_all()
     exit()
 
 
@@ -153,33 +311,21 @@ def list_all_queues(connection_info):
     The report will also contain count of current messages and current consumers.
     Automatic usage:
         wlst manageJmsQueues.py list_all_queues [env]
-    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
     """
     try:
-        servers = domainRuntimeService.getServerRuntimes()
-        if len(servers) == 0:
-            log("WARNING", "No servers were found at " +
-                connection_info["url"] + ". Terminating the script...")
-            return
-
+        snapshot = get_snapshot(connection_info)
         report = []
-        for server in servers:
-            log("INFO", "Searching queues on server " + server.name + "...")
-            jms_runtime = server.getJMSRuntime()
-            jms_servers = jms_runtime.getJMSServers()
-            for jms_server in jms_servers:
-                destinations = jms_server.getDestinations()
-                for dest in destinations:
-                    cons_cur_cnt = dest.consumersCurrentCount
-                    name = dest.name
-                    msg_cur_cnt = dest.messagesCurrentCount
-                    msg_pnd_cnt = dest.messagesPendingCount
-                    report.append([name, cons_cur_cnt, msg_cur_cnt, msg_pnd_cnt])
+        for dest in snapshot["destinations"]:
+            report.append([dest["Name"], dest["ConsumersCurrentCount"], dest["MessagesCurrentCount"],
+                           dest["MessagesPendingCount"]])
         # Create report
         report_title = "REPORT: LIST OF ALL QUEUES, " + \
-                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + \
+                       get_snapshot_time(snapshot) + get_partial_mark(snapshot["not_scanned"])
         col_names = ("QUEUE_NAME", "CUR_CONS", "CUR_MSG", "PEND_MSG")
         create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+        log_not_scanned(snapshot["not_scanned"])
         log("INFO", "list_all_queues completed.")
     except (WLSTException, ValueError, NameError, Exception), e:
         log("ERROR", str(e))
@@ -191,33 +337,23 @@ def list_queues_without_listeners(connection_info):
     The report will also contain count of current messages and current consumers.
     Automatic usage:
         wlst manageJmsQueues.py list_queues_without_listeners [env]
-    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
     """
     try:
-        servers = domainRuntimeService.getServerRuntimes()
-        if len(servers) == 0:
-            log("WARNING", "No servers were found at " +
-                connection_info["url"] + ". Terminating the script...")
-            return
-
+        snapshot = get_snapshot(connection_info)
         report = []
-        for server in servers:
-            log("INFO", "Searching queues on server " + server.name + "...")
-            jms_runtime = server.getJMSRuntime()
-            jms_servers = jms_runtime.getJMSServers()
-            for jms_server in jms_servers:
-                destinations = jms_server.getDestinations()
-                for dest in destinations:
-                    cons_cur_cnt = dest.consumersCurrentCount  # Current Consumer Count
-                    name = dest.name  # Queue name
-                    if cons_cur_cnt == 0 and "_dmq" not in name:  # Do not check DMQ queues
-                        msg_cur_cnt = dest.messagesCurrentCount  # Current Messages Count
-                        report.append([name, cons_cur_cnt, msg_cur_cnt])
+        for dest in snapshot["destinations"]:
+            cons_cur_cnt = dest["ConsumersCurrentCount"]  # Current Consumer Count
+            name = dest["Name"]  # Queue name
+            if cons_cur_cnt == 0 and "_dmq" not in name:  # Do not check DMQ queues
+                report.append([name, cons_cur_cnt, dest["MessagesCurrentCount"]])
         # Create report
         report_title = "REPORT: LIST OF QUEUES WITHOUT LISTENERS, " + \
-                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + \
+                       get_snapshot_time(snapshot) + get_partial_mark(snapshot["not_scanned"])
         col_names = ("QUEUE_NAME", "CUR_CONS", "CUR_MSG")
         create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+        log_not_scanned(snapshot["not_scanned"])
         log("INFO", "list_queues_without_listeners completed.")
 
     except (WLSTException, ValueError, NameError, Exception), e:
@@ -227,38 +363,36 @@ def list_queues_without_listeners(connection_info):
 def list_all_queues_with_current_messages(connection_info):
     """
     This function lists all queues with current and/or pending messages (i.e. queues with messagesCurrentCount > 0.
-    The report will also contain count of current and pending messages as well as count of current consumers.
+    The report will also contain count of current and pending messages, count of current consumers and, on request,
+    the age of the oldest message (see get_oldest_timestamps). The report can be sorted by the age, oldest first.
     Automatic usage:
-        wlst manageJmsQueues.py list_all_queues_with_current_messages [env]
-    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+        wlst manageJmsQueues.py list_all_queues_with_current_messages [env] [age]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
     """
+    age_option = get_age_option()
     try:
-        servers = domainRuntimeService.getServerRuntimes()
-        if len(servers) == 0:
-            log("WARNING", "No servers were found at " +
-                connection_info["url"] + ". Terminating the script...")
-            return
-
+        snapshot = get_snapshot(connection_info)
+        dests = []
+        for dest in snapshot["destinations"]:
+            if dest["MessagesCurrentCount"] > 0 or dest["MessagesPendingCount"] > 0:
+                dests.append(dest)
         report = []
-        for server in servers:
-            log("INFO", "Searching queues on server " + server.name + "...")
-            jms_runtime = server.getJMSRuntime()
-            jms_servers = jms_runtime.getJMSServers()
-            for jms_server in jms_servers:
-                destinations = jms_server.getDestinations()
-                for dest in destinations:
-                    name = dest.name
-                    msg_cur_cnt = dest.messagesCurrentCount
-                    msg_pen_cnt = dest.messagesPendingCount
-                    if msg_cur_cnt > 0 or msg_pen_cnt > 0:
-                        cons_cur_cnt = dest.consumersCurrentCount
-                        report.append(
-                            [name, cons_cur_cnt, msg_cur_cnt, msg_pen_cnt])
+        for dest in dests:
+            report.append([dest["Name"], dest["ConsumersCurrentCount"], dest["MessagesCurrentCount"],
+                           dest["MessagesPendingCount"]])
+        col_names = ("QUEUE_NAME", "CUR_CONS", "CUR_MSG", "PEND_MSG")
+        if age_option != "none":
+            oldest_timestamps = get_oldest_timestamps(connection_info, dests)
+            for i in range(len(dests)):
+                report[i].append(oldest_timestamps[i])
+            report = format_oldest_ages(report, 4, age_option == "sort")
+            col_names = col_names + ("OLDEST_AGE",)
         # Create report
         report_title = "REPORT: LIST OF QUEUES WITH CURRENT MESSAGES, " + \
-                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
-        col_names = ("QUEUE_NAME", "CUR_CONS", "CUR_MSG", "PEND_MSG")
-        create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + \
+                       get_snapshot_time(snapshot) + get_partial_mark(snapshot["not_scanned"])
+        create_report(report_title, report, col_names, is_sorted=age_option != "sort", is_total=True)
+        log_not_scanned(snapshot["not_scanned"])
         log("INFO", "list_all_queues_with_current_messages completed.")
 
     except (WLSTException, ValueError, NameError, Exception), e:
@@ -269,44 +403,204 @@ def list_dmq_queues_with_current_messages(connection_info):
     """
     This function lists DMQ queues with current messages,
     i.e. with name having "dmq" in the name and where messagesCurrentCount > 0.
-    The report will also contain count of current messages and current consumers.
+    The report will also contain count of current messages and, on request, the age of the oldest message
+    (see get_oldest_timestamps). The report can be sorted by the age, oldest first.
     Automatic usage:
-        wlst manageJmsQueues.py list_dmq_queues_with_current_messages [env]
-    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+        wlst manageJmsQueues.py list_dmq_queues_with_current_messages [env] [age]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
     """
+    age_option = get_age_option()
     try:
-        servers = domainRuntimeService.getServerRuntimes()
-        if len(servers) == 0:
-            log("WARNING", "No servers were found at " +
-                parse_url(connection_info["url"])["hostname"] + ". Terminating the script...")
-            return
-
+        snapshot = get_snapshot(connection_info)
+        dests = []
+        for dest in snapshot["destinations"]:
+            if dest["MessagesCurrentCount"] > 0 and "_dmq" in dest["Name"]:
+                dests.append(dest)
         report = []
-        for server in servers:
-            log("INFO", "Searching queues on server " + server.name + "...")
-            jms_runtime = server.getJMSRuntime()
-            jms_servers = jms_runtime.getJMSServers()
-            for jms_server in jms_servers:
-                destinations = jms_server.getDestinations()
-                for dest in destinations:
-                    name = dest.name
-                    msg_cur_cnt = dest.messagesCurrentCount
-                    if msg_cur_cnt > 0 and "_dmq" in name:
-                        report.append([name, msg_cur_cnt])
+        for dest in dests:
+            report.append([dest["Name"], dest["MessagesCurrentCount"]])
+        col_names = ("QUEUE_NAME", "CUR_MSG")
+        if age_option != "none":
+            oldest_timestamps = get_oldest_timestamps(connection_info, dests)
+            for i in range(len(dests)):
+                report[i].append(oldest_timestamps[i])
+            report = format_oldest_ages(report, 2, age_option == "sort")
+            col_names = col_names + ("OLDEST_AGE",)
         # Create report
         report_title = "REPORT: LIST OF DMQs WITH CURRENT MESSAGES, " + parse_url(connection_info["url"])[
-            "hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
-        col_names = ("QUEUE_NAME", "CUR_MSG")
-        create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+            "hostname"] + " (" + connection_info["env"] + "), " + get_snapshot_time(snapshot) + \
+            get_partial_mark(snapshot["not_scanned"])
+        create_report(report_title, report, col_names, is_sorted=age_option != "sort", is_total=True)
+        log_not_scanned(snapshot["not_scanned"])
         log("INFO", "list_dmq_queues_with_current_messages completed.")
 
     except (WLSTException, ValueError, NameError, Exception), e:
         log("ERROR", str(e))
 
 
+def get_age_option():
+    """
+    This function asks whether a report should show the OLDEST_AGE column, which reads one message per destination,
+    and whether it should be sorted by the age. For automatic calls, the column is shown and the report is sorted
+    by the age only if the parameter after the env is "age", there is no prompt.
+    :rtype: str. none, show or sort
+    """
+    if is_standalone:
+        if len(sys.argv) > 3 and sys.argv[3].lower() == "age":
+            return "sort"
+        return "none"
+    age_choice = raw_input("[INPUT] Show the age of the oldest message: Y - yes, S - sorted by it, N - no [N]? ")
+    age_choice = age_choice.strip().upper()
+    if age_choice == "S":
+        return "sort"
+    elif age_choice == "Y":
+        return "show"
+    return "none"
+
+
+def get_oldest_timestamps(connection_info, dests):
+    """
+    This function reads JMSTimestamp of the head message of each destination in parallel (scan_threads), fetching
+    only one message per destination. Each read is bounded by oldest_age_timeout_sec, which is also the timeout
+    of its cursor. The timestamps are cached in the destinations of the session snapshot ("oldest_timestamp"),
+    so they are read once per snapshot. Destinations of an offline snapshot are not read.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type dests: list. Destinations of the snapshot, see get_snapshot()
+    :rtype: list. Timestamp in ms per destination in the same order, None if empty, unknown or timed out
+    """
+    if connection_info["offline"] or not dests:
+        return [None] * len(dests)
+    to_read = []
+    for dest in dests:
+        if "oldest_timestamp" not in dest:
+            to_read.append(dest)
+    if to_read:
+        settings = connection_info["settings"]
+        timeout_sec = settings["oldest_age_timeout_sec"]
+        log("INFO", "Reading the oldest messages of " + str(len(to_read)) + " destinations...")
+        pool = Executors.newFixedThreadPool(max(1, min(settings["scan_threads"], len(to_read))))
+        try:
+            scans = []
+            for dest in to_read:
+                task = Task(get_oldest_message_timestamp,
+                            (get_mbean_proxy(connection_info, dest["object_name"]), timeout_sec))
+                scans.append([dest, task, pool.submit(task)])
+            deadline = time.time() + settings["scan_budget_sec"]
+            failed_cnt = 0
+            for dest, task, future in scans:
+                timestamp, error = wait_for_task(future, task, deadline, timeout_sec)
+                if error:
+                    failed_cnt = failed_cnt + 1  # Not cached, read again by the next report
+                else:
+                    dest["oldest_timestamp"] = timestamp
+        finally:
+            pool.shutdownNow()
+        if failed_cnt > 0:
+            log("WARNING", "The oldest message of " + str(failed_cnt) + " destinations could not be read in time.")
+    timestamps = []
+    for dest in dests:
+        timestamps.append(dest.get("oldest_timestamp"))
+    return timestamps
+
+
+def format_oldest_ages(report, column, is_age_sorted):
+    """
+    This function replaces the oldest message timestamps in the given column of the report by their age,
+    e.g. "2d 03:15:42", optionally sorting the report by the age (oldest first, unknown last).
+    :type report: list. Report rows
+    :type column: int. Index of the column with the timestamps in ms (None if unknown)
+    :type is_age_sorted: bool
+    :rtype: list. The report
+    """
+    if is_age_sorted:
+        # Known timestamps first, ascending (i.e. oldest first), unknown ones last
+        report.sort(lambda a, b: cmp(a[column] is None, b[column] is None) or cmp(a[column], b[column]))
+    now = System.currentTimeMillis()
+    for row in report:
+        if row[column] is None:
+            row[column] = "-"
+        else:
+            age_sec = max(0, (now - row[column]) // 1000)
+            row[column] = "%dd %02d:%02d:%02d" % (age_sec // 86400, age_sec % 86400 // 3600, age_sec % 3600 // 60,
+                                                  age_sec % 60)
+    return report
+
+
+def list_logical_queues(connection_info):
+    """
+    This function lists logical queues: the members of a distributed queue (the destinations with the same
+    JMS module and queue name, see parse_destination_name and get_queue_name) are aggregated into one row
+    in a single pass over the session snapshot. The report contains count of members, sums of current consumers,
+    current and pending messages, the minimum count of consumers of a member and the imbalance of the members,
+    i.e. the ratio of the max and min current messages of a member (marked with * when above imbalance_ratio).
+    Automatic usage:
+        wlst manageJmsQueues.py list_logical_queues [env]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    try:
+        snapshot = get_snapshot(connection_info)
+        groups = {}  # {"jms_module!queue name": [members, consumers, min consumers, current, pending, max, min]}
+        for dest in snapshot["destinations"]:
+            key = parse_destination_name(dest["Name"]).get("jms_module", "-") + "!" + get_queue_name(dest["Name"])
+            cons_cur_cnt = dest["ConsumersCurrentCount"]
+            msg_cur_cnt = dest["MessagesCurrentCount"]
+            if key not in groups:
+                groups[key] = [1, cons_cur_cnt, cons_cur_cnt, msg_cur_cnt, dest["MessagesPendingCount"],
+                               msg_cur_cnt, msg_cur_cnt]
+                continue
+            group = groups[key]
+            group[0] = group[0] + 1
+            group[1] = group[1] + cons_cur_cnt
+            group[2] = min(group[2], cons_cur_cnt)
+            group[3] = group[3] + msg_cur_cnt
+            group[4] = group[4] + dest["MessagesPendingCount"]
+            group[5] = max(group[5], msg_cur_cnt)
+            group[6] = min(group[6], msg_cur_cnt)
+
+        report = []
+        imbalance_ratio = connection_info["settings"]["imbalance_ratio"]
+        for key in groups.keys():
+            members, cons_cnt, min_cons_cnt, msg_cur_cnt, msg_pen_cnt, max_msg_cnt, min_msg_cnt = groups[key]
+            report.append([key, members, cons_cnt, min_cons_cnt, msg_cur_cnt, msg_pen_cnt,
+                           get_imbalance(max_msg_cnt, min_msg_cnt, members, imbalance_ratio)])
+        report_title = "REPORT: LIST OF LOGICAL QUEUES, " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + \
+                       get_snapshot_time(snapshot) + get_partial_mark(snapshot["not_scanned"])
+        col_names = ("QUEUE_NAME", "MEMBERS", "CUR_CONS", "MIN_CONS", "CUR_MSG", "PEND_MSG", "IMBALANCE")
+        create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+        log_not_scanned(snapshot["not_scanned"])
+        log("INFO", str(len(snapshot["destinations"])) + " destinations aggregated into " + str(len(report))
+            + " logical queues.")
+        log("INFO", "list_logical_queues completed.")
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def get_imbalance(max_msg_cnt, min_msg_cnt, members, imbalance_ratio):
+    """
+    This function returns the imbalance indicator of a logical queue: the ratio of the max and min current messages
+    of its members, e.g. "3.5x", marked with * when the ratio is at least imbalance_ratio.
+    :type max_msg_cnt: int
+    :type min_msg_cnt: int
+    :type members: int. Count of the members
+    :type imbalance_ratio: int
+    :rtype: str. "-" for a single member or empty members, "inf *" if a member is empty while another is not
+    """
+    if members < 2 or max_msg_cnt == 0:
+        return "-"
+    if min_msg_cnt == 0:
+        return "inf *"
+    ratio = float(max_msg_cnt) / min_msg_cnt
+    imbalance = "%.1fx" % ratio
+    if ratio >= imbalance_ratio:
+        imbalance = imbalance + " *"
+    return imbalance
+
+
 def delete_messages_from_queue(connection_info):
     """
     This function deletes all messages from a given queue.
+    Messages are deleted from all members of a distributed queue, in parallel if parallel_threads > 1.
     Automatic usage:
         wlst manageJmsQueues.py delete_messages_from_queue [env] [queue_name] [filter]
     """
@@ -316,7 +610,7 @@ def delete_messages_from_queue(connection_info):
         else:
             log("ERROR", "Incomplete/incorrect list of parameters.")
             f.close()
-            disconnect()
+            disconnect_all()
             exit()
     else:
         while True:
@@ -328,31 +622,32 @@ def delete_messages_from_queue(connection_info):
                 continue
             else:
                 break
-        
-        if len(sys.argv) > 4:
-            msg_filter = sys.argv[4:]
-        else:
-            msg_filter = raw_input("[INPUT] Enter message filter (e.g. JMSTimestamp > \'2019-01-01 00:00:00.000\') or leave blank: ")
-            msg_filter.strip()
-            msg_filter = parse_filter(msg_filter)
 
-        cursor = ""
-        if msg_filter:
-            log("INFO", "The following message filter will be applied:  " + msg_filter)
-        else:
-            msg_filter = ""
-            log("INFO", "No filters will be applied")
+    # Assign filter
+    if len(sys.argv) > 4:
+        msg_filter = parse_filter(" ".join(sys.argv[4:]))
+    elif is_standalone:
+        msg_filter = ""
+    else:
+        msg_filter = raw_input("[INPUT] Enter message filter (e.g. JMSTimestamp > \'2019-01-01 00:00:00.000\') or leave blank: ")
+        msg_filter = parse_filter(msg_filter.strip())
+    if msg_filter:
+        log("INFO", "The following message filter will be applied:  " + msg_filter)
+    else:
+        msg_filter = ""
+        log("INFO", "No filters will be applied")
 
     queue_name = queue_name.strip()
 
     try:
-        servers = domainRuntimeService.getServerRuntimes()
+        servers = get_domain_runtime_service(connection_info).getServerRuntimes()
         if len(servers) == 0:
             log("ERROR", "No servers were found at " +
                 parse_url(connection_info["url"])["hostname"] + ". Terminating the script...")
             return
 
-        is_dest_found = False
+        members = []  # [server, jms_server, dest, msg_to_del_cnt]
+        msg_to_del_total = 0
         dest_info = parse_destination_name(queue_name)
 
         for server in servers:
@@ -377,65 +672,118 @@ def delete_messages_from_queue(connection_info):
                     if queue_name == dest_name:
                         print(cur_dt() + " [INFO] =====================")
                         is_dest_found_srv = True
-                        is_dest_found = True
                         msg_cur_cnt = dest.messagesCurrentCount
                         cons_cur_cnt = dest.consumersCurrentCount
-                        if msg_filter:
-                            cursor = dest.getMessages(msg_filter, 600)
-                            cursor_size = dest.getCursorSize(cursor)
-                            msg_to_del_cnt = cursor_size
-                        else:
-                            msg_to_del_cnt = msg_cur_cnt
-                        log("INFO", "Name: " + dest_name + ", Current consumers: " + str(cons_cur_cnt) + 
+                        msg_to_del_cnt = count_messages(dest, msg_filter)
+                        log("INFO", "Name: " + dest.name + ", Current consumers: " + str(cons_cur_cnt) +
                             ", Current messages: " + str(msg_cur_cnt) + ", Messages to delete: " + str(msg_to_del_cnt))
-                        if msg_to_del_cnt > 0:
-                            if not is_standalone:
-                                del_msgs_choice = raw_input(
-                                    "[INPUT] Do you want to delete messages from this queue, Y/N [Y]? ")
-                            else:
-                                del_msgs_choice = "Y"
-                            print("")
-                            if del_msgs_choice.upper() == "Y" or del_msgs_choice.strip() == "":
-                                log("INFO", "Deleting " +
-                                    str(msg_to_del_cnt) + " messages...")
-                                msg_deleted_cnt = dest.deleteMessages(msg_filter)
-                                
-                                # Check current messages after delete
-                                if msg_deleted_cnt == msg_to_del_cnt:
-                                    log("INFO", "Successfully deleted " +
-                                        str(msg_deleted_cnt) + " out of " + str(msg_to_del_cnt) + " messages")
-                                else:
-                                    log("WARNING", "Deleted " + str(msg_deleted_cnt) + " out of "
-                                        + str(msg_to_del_cnt) + " messages. Try to repeat the procedure to delete the remaining messages.")
-                            else:
-                                log("INFO", "Skipping as per user prompt...")
-                        else:
-                            log("INFO", "The queue is empty. Skipping...")
-                        if cursor:
-                            dest.closeCursor(cursor)
-                            cursor = ""
+                        members.append([server.name, jms_server_name, dest, msg_to_del_cnt])
+                        msg_to_del_total = msg_to_del_total + msg_to_del_cnt
 
                 if is_dest_found_srv:
                     break  # stop searching jms_servers on this server
 
-        if not is_dest_found:
+        if not members:
             log("ERROR", "The queue was not found.")
+        elif msg_to_del_total == 0:
+            log("INFO", "The queue is empty. Skipping...")
+        else:
+            if not is_standalone:
+                del_msgs_choice = raw_input("[INPUT] Do you want to delete " + str(msg_to_del_total) + " messages from "
+                                            + str(len(members)) + " queue member(s), Y/N [Y]? ")
+            else:
+                del_msgs_choice = "Y"
+            print("")
+            if del_msgs_choice.upper() == "Y" or del_msgs_choice.strip() == "":
+                sources = []
+                for member in members:
+                    sources.append([member[2], member[3]])
+                run_job(connection_info, "delete_messages_from_queue " + queue_name, sources, delete_messages_job,
+                        (connection_info, members, msg_filter))
+            else:
+                log("INFO", "Skipping as per user prompt...")
         log("INFO", "delete_messages_from_queue completed.")
 
     except (WLSTException, ValueError, NameError, Exception), e:
         log("ERROR", str(e))
-        if cursor:
-            dest.closeCursor(cursor)
-            cursor = ""
+
+
+def delete_messages_job(connection_info, members, msg_filter, job):
+    """
+    This function deletes the messages matching the filter from the members of a queue found by
+    delete_messages_from_queue(), in parallel if parallel_threads > 1, and reports the result.
+    Runs in the foreground or as a background job (see run_job).
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type members: list. A list of [server, jms_server, dest, msg_to_del_cnt]
+    :type msg_filter: str. Message selector, "" for all messages
+    :type job: dict. The job, see run_job()
+    """
+    quiesce = get_quiesce_mode(connection_info)
+    tasks = []
+    for member in members:
+        if member[3] > 0:
+            log("INFO", "Deleting " + str(member[3]) + " messages from '" + member[2].name + "'...")
+            task = quiesce_task([delete_member_messages, (member[2], msg_filter)], [member[2]],
+                                member[2], msg_filter, quiesce)
+            tasks.append([member] + task)
+    results = run_tasks(get_job_tasks(job, [t[1:] for t in tasks]),
+                        connection_info["settings"]["parallel_threads"])
+
+    report = []
+    for i in range(len(tasks)):
+        member = tasks[i][0]
+        msg_to_del_cnt = member[3]
+        msg_deleted_cnt, error = results[i]
+        pause_info = ""
+        if quiesce != "none" and not error:
+            msg_deleted_cnt, msg_to_del_cnt, pause_ms = msg_deleted_cnt
+            pause_info = " (" + quiesce + " paused for " + str(pause_ms) + " ms)"
+            log("INFO", "'" + member[2].name + "' was paused for " + str(pause_ms) + " ms, "
+                + str(msg_to_del_cnt) + " messages to delete after pausing.")
+        if error:
+            log("ERROR", "Failed to delete messages from '" + member[2].name + "': " + error)
+            msg_deleted_cnt = 0
+            status = get_job_failed_status(job)
+        elif msg_deleted_cnt == msg_to_del_cnt:
+            log("INFO", "Successfully deleted " + str(msg_deleted_cnt) + " out of " + str(msg_to_del_cnt)
+                + " messages from '" + member[2].name + "'")
+            status = "Deleted"
+        else:
+            log("WARNING", "Deleted " + str(msg_deleted_cnt) + " out of " + str(msg_to_del_cnt)
+                + " messages from '" + member[2].name
+                + "'. Try to repeat the procedure to delete the remaining messages.")
+            status = "Incomplete"
+        report.append([member[0], member[1], member[2].name, msg_to_del_cnt, msg_deleted_cnt,
+                       status + pause_info])
+
+    report_title = "REPORT: DELETE MESSAGES, " + \
+                   parse_url(connection_info["url"])["hostname"] + " (" + connection_info[
+                       "env"] + "), " + cur_dt()
+    col_names = ("SERVER", "JMS_SERVER", "QUEUE_NAME", "MSG_TO_DELETE", "MSG_DELETED", "STATUS")
+    create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+
+
+def delete_member_messages(dest, msg_filter):
+    """
+    This function deletes messages matching the filter from a single destination (e.g. a member of a distributed queue).
+    :type dest: JMSDestinationRuntimeMBean
+    :type msg_filter: str. Message selector, "" for all messages
+    :rtype: int. Count of the deleted messages
+    """
+    return dest.deleteMessages(msg_filter)
 
 
 def delete_queues(connection_info):
     """
     This function deletes JMS queues from the given list of queues.
     The list must be space separated and must contain at least one queue name, i.e. "WLMsgQueueName1"
+    The queues are looked up in the JMS configuration (see get_jms_inventory), re-read at the start, so the edit
+    session is only started after the deletion was confirmed and only if there is anything to delete.
+    In each JMS module, a uniform distributed queue takes precedence over a queue of the same name, and foreign
+    destinations of that name are only deleted if the module has neither.
     For automatic calls, list of queues follows the env: 
         wlst manageJmsQueue delete_queues [env] [Q1 [Q2 Qn]]
-    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
     """
     if is_standalone:
         if len(sys.argv) > 3:
@@ -443,7 +791,7 @@ def delete_queues(connection_info):
         else:
             log("ERROR", "Incomplete list of attributes.")
             f.close()
-            disconnect()
+            disconnect_all()
             exit()
     else:
         while True:
@@ -459,112 +807,76 @@ def delete_queues(connection_info):
     print("")
     log("INFO", "Queues to delete: " + str(queue_names))
     report = []
+    is_edit_started = False
 
     try:
-        edit()
-        startEdit()
-        print("")
-        my_jms_system_resources = cmo.JMSSystemResources
-        changes_cnt = 0
+        # Find and confirm the queues in the read-only configuration, without taking the edit lock
+        invalidate_inventory(connection_info)
+        inventory = get_jms_inventory(connection_info)
+        to_delete = []
         for queue_name in queue_names:
             queue_name = queue_name.strip()
+            if not queue_name:
+                continue
             log("INFO", "Searching for queue '" + queue_name + "'...")
             cnt = 0
-            for my_jms_system_resource in my_jms_system_resources:
-                jms_module_name = my_jms_system_resource.name
-                cd('/JMSSystemResources/' + jms_module_name +
-                   '/JMSResource/' + jms_module_name)
-                # Search among uniform distributed queues
-                queue_bean = cmo.lookupUniformDistributedQueue(queue_name)
-                if queue_bean:
-                    cnt += 1
-                    print("")
-                    log("INFO", "UniformDistributedQueue '" + queue_name + "' was found in JMS module '"
-                        + jms_module_name + "'")
-
-                    if not is_standalone:
-                        del_queue_choice = raw_input(
-                            "[INPUT] Do you want to delete this queue, Y/N [Y]? ")
-                    else:
-                        del_queue_choice = "Y"
-
-                    if del_queue_choice.upper() == "Y" or del_queue_choice.strip() == "":
-                        cmo.destroyUniformDistributedQueue(queue_bean)
-                        log("INFO", "UniformDistributedQueue '" +
-                            queue_name + "' deleted.")
-                        report.append(
-                            ["UniformDistributedQueue", queue_name, "Deleted"])
-                    else:
-                        report.append(["UniformDistributedQueue",
-                                       queue_name, "Skipped by user"])
+            for module_name, dest in get_queues_to_delete(find_inventory_destinations(inventory, queue_name)):
+                cnt += 1
+                print("")
+                log("INFO", dest["type"] + " '" + queue_name + "' was found in JMS module '" + module_name + "'")
+
+                if not is_standalone:
+                    del_queue_choice = raw_input(
+                        "[INPUT] Do you want to delete this queue, Y/N [Y]? ")
                 else:
-                    # Search among non-distributed queues
-                    queue_bean = cmo.lookupQueue(queue_name)
-                    if queue_bean:
-                        cnt += 1
-                        log("INFO", "Queue '" + queue_name +
-                            "' was found in JMS module '" + jms_module_name + "'")
-
-                        if not is_standalone:
-                            del_queue_choice = raw_input(
-                                "[INPUT] Do you want to delete this queue, Y/N [Y]? ")
-                        else:
-                            del_queue_choice = "Y"
-
-                        if del_queue_choice.upper() == "Y" or del_queue_choice.strip() == "":
-                            cmo.destroyQueue(queue_bean)
-                            log("INFO", "Queue " + queue_name + " deleted.")
-                            report.append(["Queue", queue_name, "Deleted"])
-                        else:
-                            report.append(
-                                ["Queue", queue_name, "Skipped by user"])
-                    else:
-                        # Search among foreign destinations
-                        frn_srvs = cmo.getForeignServers()
-                        for frn_srv in frn_srvs:
-                            frn_dest_bean = frn_srv.lookupForeignDestination(
-                                queue_name)
-                            if frn_dest_bean:
-                                cnt += 1
-                                cd('/JMSSystemResources/' + jms_module_name + '/JMSResource/' + jms_module_name
-                                   + '/ForeignServers/' + frn_srv.name)
-                                log("INFO", "ForeignDestination '" + queue_name + "' was found in JMS module '"
-                                    + jms_module_name + "'")
-
-                                if not is_standalone:
-                                    del_queue_choice = raw_input(
-                                        "[INPUT] Do you want to delete this queue, Y/N [Y]? ")
-                                else:
-                                    del_queue_choice = "Y"
+                    del_queue_choice = "Y"
 
-                                if del_queue_choice.upper() == "Y" or del_queue_choice.strip() == "":
-                                    cmo.destroyForeignDestination(
-                                        frn_dest_bean)
-                                    log("INFO", "ForeignDestination '" +
-                                        queue_name + "' was deleted successfully.\n")
-                                    report.append(
-                                        ["ForeignDestination", queue_name, "Deleted"])
-                                else:
-                                    report.append(
-                                        ["ForeignDestination", queue_name, "Skipped by user"])
-                        continue
-                    # TODO: Add topics
+                if del_queue_choice.upper() == "Y" or del_queue_choice.strip() == "":
+                    to_delete.append([module_name, dest])
+                else:
+                    report.append([dest["type"], queue_name, "Skipped by user"])
 
             if cnt == 0:
                 log("INFO", "'" + queue_name +
                     "' was not found in any JMS module.")
                 report.append(["Queue", queue_name, "Not found"])
-            changes_cnt += cnt
         print("")
 
-        if changes_cnt > 0:
+        if to_delete:
+            wlst_connect(connection_info)
+            edit()
+            cd("/")
+            startEdit()
+            is_edit_started = True
+            print("")
+            for module_name, dest in to_delete:
+                jms_resource = cmo.lookupJMSSystemResource(module_name).getJMSResource()
+                if dest["type"] == "UniformDistributedQueue":
+                    queue_bean = jms_resource.lookupUniformDistributedQueue(dest["name"])
+                    if queue_bean:
+                        jms_resource.destroyUniformDistributedQueue(queue_bean)
+                elif dest["type"] == "Queue":
+                    queue_bean = jms_resource.lookupQueue(dest["name"])
+                    if queue_bean:
+                        jms_resource.destroyQueue(queue_bean)
+                else:
+                    frn_srv = jms_resource.lookupForeignServer(dest["foreign_server"])
+                    queue_bean = frn_srv.lookupForeignDestination(dest["name"])
+                    if queue_bean:
+                        frn_srv.destroyForeignDestination(queue_bean)
+                if not queue_bean:
+                    raise Exception(dest["type"] + " '" + dest["name"] + "' no longer exists in JMS module '"
+                                    + module_name + "'. Repeat the procedure.")
+                log("INFO", dest["type"] + " '" + dest["name"] + "' deleted.")
+                report.append([dest["type"], dest["name"], "Deleted"])
             log("INFO", "Saving changes...")
             save()
             log("INFO", "Activating session...")
             activate(block="true")
+            is_edit_started = False
+            invalidate_inventory(connection_info)
         else:
-            log("INFO", "No changes were made. Canceling edit session...")
-            cancelEdit('y')
+            log("INFO", "No changes were made.")
 
         print("")
         report_title = "REPORT: DELETE QUEUES, " + \
@@ -575,9 +887,11 @@ def delete_queues(connection_info):
 
     except (WLSTException, ValueError, NameError, Exception, CommunicationException), e:
         log("ERROR", str(e))
-        log("INFO", "Undoing changes and canceling edit session...")
-        undo("true", "y")
-        cancelEdit("y")
+        if is_edit_started:
+            log("INFO", "Undoing changes and canceling edit session...")
+            undo("true", "y")
+            cancelEdit("y")
+            report = []
         if report:
             report_title = "REPORT: DELETE QUEUES, " + \
                            parse_url(connection_info["url"])["hostname"] + " (" + connection_info[
@@ -587,13 +901,238 @@ def delete_queues(connection_info):
         print("")
 
 
+def create_queues(connection_info):
+    """
+    This function creates JMS queues listed in a spec file. Each line of the file describes one queue:
+        [module];[subdeployment];[name];[jndi name];[error destination];[redelivery limit];[quota];[type]
+    The error destination, redelivery limit, quota and type are optional (empty or -). Type is udq (uniform distributed
+    queue, default) or queue. The error destination and the quota must exist in the module or be listed in the spec.
+    The spec is validated against a fresh read of the JMS configuration (see get_jms_inventory) before the edit
+    session is started, then all queues are created in one edit session and activated once.
+    Automatic usage:
+        wlst manageJmsQueues.py create_queues [env] [spec_file]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    spec_file_name = connection_info["settings"]["queue_spec_file"]
+    if is_standalone:
+        if len(sys.argv) > 3:
+            spec_file_name = sys.argv[3]
+    else:
+        spec_input = raw_input("[INPUT] Enter queue spec file [" + spec_file_name + "]: ")
+        if spec_input.strip():
+            spec_file_name = spec_input.strip()
+        print("")
+    log("INFO", "Queue spec file: " + spec_file_name)
+    report_title = "REPORT: CREATE QUEUES, " + \
+                   parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
+    col_names = ("MODULE", "QUEUE_NAME", "JNDI_NAME", "TYPE", "STATUS")
+    report = []
+    is_edit_started = False
+
+    try:
+        specs = read_queue_specs(spec_file_name)
+        if not specs:
+            log("ERROR", "No queues were found in " + spec_file_name + ".")
+            return
+
+        invalidate_inventory(connection_info)  # The configuration may have been changed outside of the script
+        errors = validate_queue_specs(specs, get_inventory_modules(get_jms_inventory(connection_info)))
+        for spec in specs:
+            status = "To create"
+            if spec["errors"]:
+                status = "Invalid: " + ", ".join(spec["errors"])
+            report.append([spec["module"] or "-", spec["name"] or "-", spec["jndi_name"] or "-", spec["type"], status])
+        create_report(report_title, report, col_names, is_sorted=False, is_total=False)
+        if errors > 0:
+            log("ERROR", str(errors) + " of " + str(len(specs)) + " queues are invalid. No queues were created.")
+            return
+
+        if not is_standalone:
+            create_choice = raw_input("[INPUT] Do you want to create " + str(len(specs)) + " queues, Y/N [Y]? ")
+        else:
+            create_choice = "Y"
+        if not (create_choice.strip().upper() == "Y" or create_choice.strip() == ""):
+            log("WARNING", "Operation canceled by the user.")
+            return
+
+        wlst_connect(connection_info)
+        edit()
+        cd("/")
+        startEdit()
+        is_edit_started = True
+        print("")
+        # Create all queues first, so that error destinations may refer to queues listed later in the spec
+        queue_beans = []
+        for spec in specs:
+            jms_resource = cmo.lookupJMSSystemResource(spec["module"]).getJMSResource()
+            if spec["type"] == "udq":
+                queue_bean = jms_resource.createUniformDistributedQueue(spec["name"])
+            else:
+                queue_bean = jms_resource.createQueue(spec["name"])
+            queue_bean.setJNDIName(spec["jndi_name"])
+            queue_bean.setSubDeploymentName(spec["subdeployment"])
+            queue_beans.append([spec, jms_resource, queue_bean])
+        for spec, jms_resource, queue_bean in queue_beans:
+            if spec["quota"]:
+                queue_bean.setQuota(jms_resource.lookupQuota(spec["quota"]))
+            delivery_params = queue_bean.getDeliveryFailureParams()
+            if spec["redelivery_limit"] is not None:
+                delivery_params.setRedeliveryLimit(spec["redelivery_limit"])
+            if spec["error_destination"]:
+                error_dest = jms_resource.lookupUniformDistributedQueue(spec["error_destination"])
+                if not error_dest:
+                    error_dest = jms_resource.lookupQueue(spec["error_destination"])
+                delivery_params.setErrorDestination(error_dest)
+            log("INFO", spec["type"] + " '" + spec["name"] + "' created in JMS module '" + spec["module"] + "'.")
+
+        log("INFO", "Saving changes...")
+        save()
+        log("INFO", "Activating session...")
+        activate(block="true")
+        is_edit_started = False
+        invalidate_inventory(connection_info)
+
+        report = []
+        for spec in specs:
+            report.append([spec["module"], spec["name"], spec["jndi_name"], spec["type"], "Created"])
+        print("")
+        create_report(report_title, report, col_names, is_sorted=False, is_total=False)
+        log("INFO", "create_queues completed.")
+
+    except (WLSTException, ValueError, NameError, Exception, CommunicationException), e:
+        log("ERROR", str(e))
+        if is_edit_started:
+            log("INFO", "Undoing changes and canceling edit session...")
+            undo("true", "y")
+            cancelEdit("y")
+        print("")
+
+
+def read_queue_specs(spec_file_name):
+    """
+    This function reads the queue spec file of create_queues(). Lines starting with # are comments.
+    Line format: [module];[subdeployment];[name];[jndi name];[error destination];[redelivery limit];[quota];[type]
+    :type spec_file_name: str
+    :rtype: list. A list of dicts with the fields of the line (None for omitted optional fields) and an empty
+        list of validation errors, in file order
+    """
+    field_names = ["module", "subdeployment", "name", "jndi_name", "error_destination", "redelivery_limit", "quota",
+                   "type"]
+    specs = []
+    spec_file = open(spec_file_name, "r")
+    try:
+        for line in spec_file.readlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            values = line.split(";")
+            if len(values) < 4 or len(values) > len(field_names):
+                raise ValueError("Invalid queue spec: " + line)
+            spec = {"errors": []}
+            for i in range(len(field_names)):
+                value = None
+                if i < len(values) and values[i].strip() not in ("", "-"):
+                    value = values[i].strip()
+                spec[field_names[i]] = value
+            if spec["type"] is None:
+                spec["type"] = "udq"
+            spec["type"] = spec["type"].lower()
+            if spec["redelivery_limit"] is not None:
+                if not re.match("^-?\d+$", spec["redelivery_limit"]):
+                    raise ValueError("Invalid redelivery limit: " + line)
+                spec["redelivery_limit"] = int(spec["redelivery_limit"])
+            specs.append(spec)
+    finally:
+        spec_file.close()
+    return specs
+
+
+def get_inventory_modules(inventory):
+    """
+    This function returns the names of the subdeployments, destinations, JNDI names and quotas of all JMS modules
+    of the cached JMS configuration (see get_jms_inventory), keyed for the validation of the queue specs.
+    :type inventory: dict. As returned by get_jms_inventory()
+    :rtype: dict. {module name: {"subdeployments": {}, "destinations": {}, "quotas": {}}, "": {"jndi_names": {}}}.
+        The inner dicts are keyed by name, the "" entry holds the JNDI names of all modules.
+    """
+    modules = {"": {"jndi_names": {}}}
+    for inventory_module in inventory["modules"]:
+        module = {"subdeployments": {}, "destinations": {}, "quotas": {}}
+        for sub_deployment in inventory_module["subdeployments"]:
+            module["subdeployments"][sub_deployment] = 1
+        for dest in inventory_module["destinations"]:
+            if dest["type"] == "ForeignDestination":
+                continue
+            module["destinations"][dest["name"]] = 1
+            if dest["jndi_name"]:
+                modules[""]["jndi_names"][dest["jndi_name"]] = 1
+        for quota in inventory_module["quotas"]:
+            module["quotas"][quota] = 1
+        modules[inventory_module["name"]] = module
+    return modules
+
+
+def validate_queue_specs(specs, modules):
+    """
+    This function validates the queue specs against the existing JMS modules (see get_inventory_modules) and each other.
+    The errors are added to the "errors" list of each spec. Module, subdeployment, name and JNDI name are required,
+    a spec missing any of them is not validated further.
+    :type specs: list. Queue specs as returned by read_queue_specs()
+    :type modules: dict. JMS modules as returned by get_inventory_modules()
+    :rtype: int. Count of invalid specs
+    """
+    spec_names = {}
+    jndi_names = {}
+    for spec in specs:
+        if spec["name"]:
+            key = str(spec["module"]) + "/" + spec["name"]
+            spec_names[key] = spec_names.get(key, 0) + 1
+        if spec["jndi_name"]:
+            jndi_names[spec["jndi_name"]] = jndi_names.get(spec["jndi_name"], 0) + 1
+
+    invalid_cnt = 0
+    for spec in specs:
+        errors = spec["errors"]
+        for field in ("module", "subdeployment", "name", "jndi_name"):
+            if not spec[field]:
+                errors.append(field.replace("_", " ") + " missing")
+        if errors:
+            invalid_cnt = invalid_cnt + 1
+            continue
+        if spec["type"] not in ("udq", "queue"):
+            errors.append("unknown type " + spec["type"])
+        if spec["module"] not in modules:
+            errors.append("module not found")
+        else:
+            module = modules[spec["module"]]
+            if spec["subdeployment"] not in module["subdeployments"]:
+                errors.append("subdeployment not found")
+            if spec["name"] in module["destinations"]:
+                errors.append("queue exists")
+            if spec["error_destination"] and spec["error_destination"] not in module["destinations"] \
+                    and spec["module"] + "/" + spec["error_destination"] not in spec_names:
+                errors.append("error destination not found")
+            if spec["quota"] and spec["quota"] not in module["quotas"]:
+                errors.append("quota not found")
+        if spec_names[str(spec["module"]) + "/" + spec["name"]] > 1:
+            errors.append("queue listed twice")
+        if spec["jndi_name"] in modules[""]["jndi_names"]:
+            errors.append("JNDI name in use")
+        elif jndi_names[spec["jndi_name"]] > 1:
+            errors.append("JNDI name listed twice")
+        if errors:
+            invalid_cnt = invalid_cnt + 1
+    return invalid_cnt
+
+
 def move_messages(connection_info):
     """
     This function moves messages from one queue (e.g. DMQ) to another.
     Input: Names of the source queue (e.g. WLMsgRampe_Vare_PRMS_dmq) and the target queue (e.g. WLMsgRampe_Vare_PRMS).
+    Messages are moved for all members of a distributed queue, in parallel if parallel_threads > 1.
     Usage for automatic calls:
         wlst manageJmsQueue move_messages [env] [Qsrc] [Qtgt] [filter]
-    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
     """
     # Assign source and target queues
     if is_standalone:
@@ -603,7 +1142,7 @@ def move_messages(connection_info):
         else:
             log("ERROR", "Incomplete/incorrect list of parameters.")
             f.close()
-            disconnect()
+            disconnect_all()
             exit()
     else:
         while True:
@@ -630,12 +1169,11 @@ def move_messages(connection_info):
 
     # Assign filter
     if len(sys.argv) > 5:
-        msg_filter = sys.argv[5:]
+        msg_filter = parse_filter(" ".join(sys.argv[5:]))
     else:
         msg_filter = raw_input("[INPUT] Enter message filter (e.g. JMSTimestamp > \'2019-01-01 00:00:00.000\') or leave blank: ")
         msg_filter.strip()
         msg_filter = parse_filter(msg_filter)
-    cursor = ""
     if msg_filter:
         log("INFO", "The following message filter will be applied:  " + msg_filter)
     else:
@@ -643,10 +1181,7 @@ def move_messages(connection_info):
         log("INFO", "No filters will be applied")
 
     try:
-        serverRuntime()
-        print("")
-
-        servers = domainRuntimeService.getServerRuntimes()
+        servers = get_domain_runtime_service(connection_info).getServerRuntimes()
         if len(servers) == 0:
             log("ERROR", "No servers were found at " +
                 parse_url(connection_info["url"])["hostname"] + ". Terminating the script...")
@@ -684,14 +1219,7 @@ def move_messages(connection_info):
                         q_src_found_srv = True
                         q_src_bean = dest
                         q_src_bean_msg_cur_cnt = q_src_bean.messagesCurrentCount
-                        if msg_filter:
-                            cursor = dest.getMessages(msg_filter, 60)
-                            cursor_size = dest.getCursorSize(cursor)
-                            msg_to_move_cnt = cursor_size
-                            dest.closeCursor(cursor)
-                            cursor = ""
-                        else:
-                            msg_to_move_cnt = q_src_bean_msg_cur_cnt
+                        msg_to_move_cnt = count_messages(dest, msg_filter)
                         q_msg_total = q_msg_total + q_src_bean_msg_cur_cnt
                         q_msg_move_total = q_msg_move_total + msg_to_move_cnt
                     if queue_name == q_trg_name:
@@ -702,8 +1230,8 @@ def move_messages(connection_info):
                     if q_src_found_srv and q_trg_found_srv:
                         break  # stop processing queues on this JMS server
                 if q_src_found_srv and q_trg_found_srv:
-                    q_beans_list.append(
-                        [q_src_bean, q_trg_bean, q_src_bean_msg_cur_cnt, msg_to_move_cnt])
+                    q_beans_list.append([q_src_bean, q_trg_bean, q_src_bean_msg_cur_cnt, msg_to_move_cnt,
+                                         server.name, jms_server_name])
                     report.append(
                         [server.name, jms_server_name, q_src_name, q_trg_name, q_src_bean_msg_cur_cnt, msg_to_move_cnt])
                     targeted_jms_srv_name = jms_server_name
@@ -731,33 +1259,38 @@ def move_messages(connection_info):
                                        + q_trg_name + "', Y/N [Y]? ")
 
         if q_msg_move_total > 0 and (is_standalone or mv_msgs_choice.strip().upper() == "Y" or mv_msgs_choice.strip() == ""):
+            pace_input = ""
+            if not is_standalone:
+                pace_input = raw_input("[INPUT] Enter pace: messages per second, batch size/pause in seconds "
+                                       + "(e.g. 500/10), 0 to move all at once, or leave blank for the settings: ")
+            member_cnt = 0
             for row in q_beans_list:
-                msg_to_move_cnt = row[3]
-                if msg_to_move_cnt > 0:
-                    q_src_bean = row[0]
-                    q_trg_bean = row[1]
-                    log("INFO", "Moving " + str(msg_to_move_cnt) + " messages from '"
-                        + q_src_bean.name + "'...")
-                    
-                    # Move messages
-                    q_msg_moved_cnt = q_src_bean.moveMessages(msg_filter, q_trg_bean.getDestinationInfo())
-                    
-                    if q_msg_moved_cnt == msg_to_move_cnt:
-                        log("INFO", "Successfully moved " + str(q_msg_moved_cnt) + " out of " + str(msg_to_move_cnt)
-                            + " messages to '" + q_trg_bean.name + "'.")
-                    else:
-                        log("WARNING", "There are still current messages on '" + q_trg_bean.name
-                            + "'. Repeat the procedure.")
-        else:
+                if row[3] > 0:
+                    member_cnt = member_cnt + 1
+            pace = get_move_pace(connection_info["settings"], pace_input, member_cnt)
+            if pace and pace["max_backlog_per_consumer"] > 0 and not is_standalone:
+                check_choice = raw_input("[INPUT] Wait for the consumers of the target (max "
+                                         + str(pace["max_backlog_per_consumer"]) + " messages per consumer), "
+                                         + "N for a target without listeners, Y/N [Y]? ")
+                if check_choice.strip().upper() == "N":
+                    pace["max_backlog_per_consumer"] = 0
+            if pace and pace["rate"] > 0:
+                log("INFO", "Paced move: " + str(pace["rate"]) + " messages per second per queue member.")
+            elif pace:
+                log("INFO", "Paced move: " + str(pace["batch_size"]) + " messages every " + str(pace["pause_sec"])
+                    + " seconds per queue member.")
+            sources = []
+            for row in q_beans_list:
+                sources.append([row[0], row[3]])
+            run_job(connection_info, "move_messages " + q_src_name + " -> " + q_trg_name, sources, move_messages_job,
+                    (connection_info, q_beans_list, msg_filter, pace))
+        elif q_msg_move_total > 0:
             log("WARNING", "Operation canceled by the user.")
 
         log("INFO", "move_messages completed.")
 
     except (ServiceUnavailableException, WLSTException, ValueError, NameError, Exception), e:
         log("ERROR", str(e))
-        if cursor:
-            dest.closeCursor(cursor)
-            cursor = ""
         if report:
             report_title = "REPORT: MOVE_MESSAGES , " + \
                            parse_url(connection_info["url"])["hostname"] + " (" + connection_info[
@@ -769,117 +1302,2818 @@ def move_messages(connection_info):
         print("")
 
 
-def get_queue_info(connection_info):
+def move_messages_job(connection_info, q_beans_list, msg_filter, pace, job):
     """
-    This function returns information on a given queue.
-    Automatic usage:
-        wlst manageJmsQueues.py get_queue_info [env] [queue_name]
-    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+    This function moves the messages matching the filter between the member pairs found by move_messages(),
+    in parallel if parallel_threads > 1, and reports the result. With a pace, the messages are moved in slices
+    (see move_member_messages_paced) and the queues are not paused.
+    Runs in the foreground or as a background job (see run_job).
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type q_beans_list: list. A list of [source, target, current count, count to move, server, jms_server]
+    :type msg_filter: str. Message selector, "" for all messages
+    :type pace: dict. As returned by get_move_pace(), None for moving all messages at once
+    :type job: dict. The job, see run_job()
+    """
+    quiesce = get_quiesce_mode(connection_info)
+    if pace and quiesce != "none":
+        log("WARNING", "The queues are not paused (quiesce=" + quiesce + ") during a paced move.")
+        quiesce = "none"
+    tasks = []
+    for row in q_beans_list:
+        msg_to_move_cnt = row[3]
+        if msg_to_move_cnt > 0:
+            q_src_bean = row[0]
+            q_trg_bean = row[1]
+            log("INFO", "Moving " + str(msg_to_move_cnt) + " messages from '"
+                + q_src_bean.name + "'...")
+            q_paused_beans = [q_src_bean]
+            if connection_info["settings"]["quiesce_target"].upper() == "Y":
+                q_paused_beans.append(q_trg_bean)
+            if pace:
+                task = [move_member_messages_paced, (q_src_bean, q_trg_bean, msg_filter, pace, job)]
+            else:
+                task = quiesce_task([move_member_messages, (q_src_bean, q_trg_bean, msg_filter)], q_paused_beans,
+                                    q_src_bean, msg_filter, quiesce)
+            tasks.append([row] + task)
+
+    # Move messages
+    results = run_tasks(get_job_tasks(job, [t[1:] for t in tasks]),
+                        connection_info["settings"]["parallel_threads"])
+
+    result_report = []
+    for i in range(len(tasks)):
+        row = tasks[i][0]
+        q_src_bean = row[0]
+        q_trg_bean = row[1]
+        msg_to_move_cnt = row[3]
+        q_msg_moved_cnt, error = results[i]
+        pause_info = ""
+        if quiesce != "none" and not error:
+            q_msg_moved_cnt, msg_to_move_cnt, pause_ms = q_msg_moved_cnt
+            pause_info = " (" + quiesce + " paused for " + str(pause_ms) + " ms)"
+            log("INFO", "'" + q_src_bean.name + "' was paused for " + str(pause_ms) + " ms, "
+                + str(msg_to_move_cnt) + " messages to move after pausing.")
+        if error:
+            log("ERROR", "Failed to move messages from '" + q_src_bean.name + "': " + error)
+            q_msg_moved_cnt = 0
+            status = get_job_failed_status(job)
+        elif q_msg_moved_cnt == msg_to_move_cnt:
+            log("INFO", "Successfully moved " + str(q_msg_moved_cnt) + " out of " + str(msg_to_move_cnt)
+                + " messages to '" + q_trg_bean.name + "'.")
+            status = "Moved"
+        elif job["canceled"]:
+            log("WARNING", "Moved " + str(q_msg_moved_cnt) + " out of " + str(msg_to_move_cnt)
+                + " messages to '" + q_trg_bean.name + "' before the job was canceled.")
+            status = "Canceled"
+        else:
+            log("WARNING", "Moved " + str(q_msg_moved_cnt) + " out of " + str(msg_to_move_cnt)
+                + " messages to '" + q_trg_bean.name + "'. Repeat the procedure.")
+            status = "Incomplete"
+        result_report.append([row[4], row[5], q_src_bean.name, q_trg_bean.name, msg_to_move_cnt,
+                              q_msg_moved_cnt, status + pause_info])
+
+    report_title = "REPORT: MOVE MESSAGES, " + \
+                   parse_url(connection_info["url"])["hostname"] + " (" + connection_info[
+                       "env"] + "), " + cur_dt()
+    col_names = ("SERVER", "JMS SERVER", "SOURCE QUEUE", "TARGET QUEUE", "MSG_TO_MOVE_COUNT",
+                 "MSG_MOVED_COUNT", "STATUS")
+    create_report(report_title, result_report, col_names, is_sorted=True, is_total=True)
+
+
+def move_member_messages(q_src_bean, q_trg_bean, msg_filter):
+    """
+    This function moves messages matching the filter from a single source destination to a target destination
+    located on the same JMS server (e.g. members of two distributed queues).
+    :type q_src_bean: JMSDestinationRuntimeMBean
+    :type q_trg_bean: JMSDestinationRuntimeMBean
+    :type msg_filter: str. Message selector, "" for all messages
+    :rtype: int. Count of the moved messages
+    """
+    return q_src_bean.moveMessages(msg_filter, q_trg_bean.getDestinationInfo())
+
+
+def move_member_messages_paced(q_src_bean, q_trg_bean, msg_filter, pace, job):
+    """
+    This function moves messages matching the filter from a single source destination to a target destination
+    located on the same JMS server at a limited pace: in successive slices of at most pace["batch_size"] messages
+    selected by their JMSMessageIDs, with a pause after each slice derived from pace["rate"] (messages per second)
+    or given by pace["pause_sec"].
+    The slices are adjusted to the target: it may hold at most pace["max_backlog_per_consumer"] current messages
+    per consumer (0 - no limit and no consumers needed). While the target is at the limit or has no consumers,
+    the move waits, at most pace["max_wait_sec"] seconds in a row; then it stops with a warning.
+    The progress is logged every 10 seconds. The move stops after the current slice when the job is canceled,
+    or when no message of a slice could be moved (e.g. the messages are pending on a consumer of the source).
+    :type q_src_bean: JMSDestinationRuntimeMBean
+    :type q_trg_bean: JMSDestinationRuntimeMBean
+    :type msg_filter: str. Message selector, "" for all messages
+    :type pace: dict. As returned by get_move_pace()
+    :type job: dict. The job, see run_job()
+    :rtype: int. Count of the moved messages
+    """
+    state = {"msg_ids": [], "slice_size": 0, "moved": 0, "started": time.time(), "logged": time.time(),
+             "waiting": None}  # Start of the current wait for the consumers of the target
+
+    def add_message_id(wlmsg):
+        state["msg_ids"].append(wlmsg.getJMSMessageID())
+        return len(state["msg_ids"]) >= state["slice_size"]
+
+    trg_info = q_trg_bean.getDestinationInfo()
+    while not job["canceled"]:
+        state["slice_size"] = pace["batch_size"]
+        trg_msg_cnt = q_trg_bean.messagesCurrentCount
+        trg_consumers_cnt = q_trg_bean.consumersCurrentCount
+        if pace["max_backlog_per_consumer"] > 0:
+            state["slice_size"] = min(state["slice_size"],
+                                      pace["max_backlog_per_consumer"] * trg_consumers_cnt - trg_msg_cnt)
+            if state["slice_size"] <= 0:
+                if state["waiting"] is None:
+                    log("INFO", "Waiting for the consumers of '" + q_trg_bean.name + "' (" + str(trg_msg_cnt)
+                        + " current messages, " + str(trg_consumers_cnt) + " consumers)...")
+                    state["waiting"] = time.time()
+                elif time.time() - state["waiting"] >= pace["max_wait_sec"]:
+                    log("WARNING", "The consumers of '" + q_trg_bean.name + "' did not catch up within "
+                        + str(pace["max_wait_sec"]) + " seconds (" + str(trg_msg_cnt) + " current messages, "
+                        + str(trg_consumers_cnt) + " consumers). Stopping the move from '" + q_src_bean.name + "'.")
+                    break
+                time.sleep(max(1, pace["pause_sec"]))
+                continue
+        state["waiting"] = None
+
+        # Read the next slice with a cursor of its own and move it by its JMSMessageIDs
+        state["msg_ids"] = []
+        stream_messages(q_src_bean, msg_filter, add_message_id, state["slice_size"], False)
+        if not state["msg_ids"]:
+            break
+        slice_started = time.time()
+        moved = q_src_bean.moveMessages(get_message_id_selector(state["msg_ids"]), trg_info)
+        if moved == 0:
+            log("WARNING", "None of " + str(len(state["msg_ids"])) + " messages could be moved from '"
+                + q_src_bean.name + "' (pending on a consumer?). Stopping the move.")
+            break
+        state["moved"] = state["moved"] + moved
+
+        if time.time() - state["logged"] >= 10:
+            state["logged"] = time.time()
+            log("INFO", "Moved " + str(state["moved"]) + " messages from '" + q_src_bean.name + "' ("
+                + str(get_rate(state["moved"], time.time() - state["started"])) + " messages per second, target: "
+                + str(trg_msg_cnt) + " current messages, " + str(trg_consumers_cnt) + " consumers)...")
+        if pace["rate"] > 0:
+            pause_sec = len(state["msg_ids"]) / pace["rate"] - (time.time() - slice_started)
+        else:
+            pause_sec = pace["pause_sec"]
+        if pause_sec > 0:
+            time.sleep(pause_sec)
+    return state["moved"]
+
+
+def get_move_pace(settings, pace_input, member_cnt):
+    """
+    This function returns the pace of a paced move (see move_member_messages_paced) from the user input,
+    either a rate in messages per second (e.g. "50") or a batch size and a pause in seconds (e.g. "500/10",
+    "500/0" for back-to-back slices of 500). "0" moves all messages at once. Without input, the pace is move_rate,
+    or move_batch_size/move_pause_sec if the rate is 0, and all messages are moved at once if both are 0.
+    The rate is shared by the source queue members moved in parallel.
+    :type settings: dict
+    :type pace_input: str. The user input, "" for the default
+    :type member_cnt: int. Count of the source queue members moved
+    :rtype: dict. {"rate": messages per second per member, "batch_size": int, "pause_sec": int,
+        "max_backlog_per_consumer": int, "max_wait_sec": int}, None for moving all messages at once
     """
+    pace = {"rate": 0.0, "batch_size": settings["move_batch_size"], "pause_sec": settings["move_pause_sec"],
+            "max_backlog_per_consumer": settings["move_max_backlog_per_consumer"],
+            "max_wait_sec": settings["move_max_wait_sec"]}
+    pace_input = pace_input.strip()
+    if not pace_input:
+        pace["rate"] = float(settings["move_rate"])
+        if pace["rate"] <= 0 and pace["pause_sec"] <= 0:
+            return None
+    elif re.match("^\d+/\d+$", pace_input):
+        pace["batch_size"] = int(pace_input.split("/")[0])
+        pace["pause_sec"] = int(pace_input.split("/")[1])
+    elif re.match("^\d+(\.\d+)?$", pace_input):
+        pace["rate"] = float(pace_input)
+        pace["pause_sec"] = 0
+        if pace["rate"] <= 0:
+            return None
+    else:
+        raise ValueError("Invalid pace: " + pace_input)
+    if pace["rate"] > 0:
+        pace["rate"] = pace["rate"] / min(max(1, member_cnt), settings["parallel_threads"])
+        # About one slice per second
+        pace["batch_size"] = min(pace["batch_size"], max(1, int(pace["rate"])))
+        pace["pause_sec"] = 0
+    pace["batch_size"] = max(1, pace["batch_size"])
+    return pace
+
 
+def route_messages(connection_info):
+    """
+    This function routes messages from one source queue (e.g. a DMQ with messages of several origin queues) to several
+    target queues according to an ordered rule file. Each line of the file maps a message selector to a target queue:
+        JMSType = 'Order' -> WLMsgOrders
+        Country IN ('NO', 'SE') -> WLMsgNordic
+    The rules are applied in file order, i.e. a message matching several selectors goes to the first matching target.
+    If the target of a rule is missing on the JMS server of a source member, the messages matching its selector
+    are excluded from the later rules (see get_route_selectors) and stay on the source.
+    The source and all targets are resolved in one scan. The selectors are evaluated by the server, so each source
+    member is still passed twice per rule: one count for the confirmation and one move, in parallel over the members
+    if parallel_threads > 1. The messages left on the source (matching no rule, of missing targets or arrived
+    meanwhile) are read from the current message count. Set quiesce to production or both, so that messages arriving
+    during the routing are not picked up by a later rule.
+    Automatic usage:
+        wlst manageJmsQueues.py route_messages [env] [Qsrc] [rules_file]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    settings = connection_info["settings"]
+    rules_file_name = settings["routing_rules_file"]
     if is_standalone:
         if len(sys.argv) > 3:
-            queue_name = sys.argv[3]
+            q_src_name = sys.argv[3]
         else:
-            log("ERROR", "Incomplete list of attributes.")
+            log("ERROR", "Incomplete/incorrect list of parameters.")
             f.close()
-            disconnect()
+            disconnect_all()
             exit()
+        if len(sys.argv) > 4:
+            rules_file_name = sys.argv[4]
     else:
         while True:
-            queue_name = raw_input(
-                "[INPUT] Enter a queue name (e.g. WLMsgQueueName): ")
-            if not queue_name:
-                print(
-                    cur_dt() + " [ERROR] Queue name cannot be empty. Please, enter a valid name")
+            q_src_name = raw_input("[INPUT] Enter name of the source queue: ")
+            if not q_src_name:
+                print(cur_dt() + " [ERROR] Queue name cannot be empty. Please, enter a valid queue name.")
                 continue
             else:
                 break
-
-    queue_name = queue_name.strip()
-    log("INFO", "Entered queue name: " + queue_name)
+        rules_input = raw_input("[INPUT] Enter routing rules file [" + rules_file_name + "]: ")
+        if rules_input.strip():
+            rules_file_name = rules_input.strip()
+        print("")
+    q_src_name = q_src_name.strip()
+    log("INFO", "Source queue: " + q_src_name + ", routing rules: " + rules_file_name)
 
     try:
-        servers = domainRuntimeService.getServerRuntimes()
-        if len(servers) == 0:
-            log("WARNING", "No servers were found at " +
-                parse_url(connection_info["url"])["hostname"] + ". Terminating the script...")
+        rules = read_routing_rules(rules_file_name)
+        if not rules:
+            log("ERROR", "No routing rules were found in " + rules_file_name + ".")
+            return
+        for i in range(len(rules)):
+            log("INFO", "Rule " + str(i + 1) + ": " + (rules[i]["selector"] or "all messages") + " -> "
+                + rules[i]["target"])
+
+        # Resolve the source and all targets in one scan, the targets must be on the JMS server of the source member
+        src_members = []
+        targets = {}  # {"jms_server/queue name": dest}
+        for dest in discover_destinations(connection_info, ["MessagesCurrentCount"]):
+            queue_name = get_queue_name(dest["Name"])
+            if queue_name == q_src_name:
+                src_members.append(dest)
+            targets[str(dest["jms_server"]) + "/" + queue_name] = dest
+        if not src_members:
+            log("ERROR", "Source queue was not found")
             return
 
-        col_names = ("PROPERTY", "VALUE")
-        for server in servers:
-            report = []
-            report_title = "REPORT: INFORMATION ON QUEUE " + \
-                           queue_name + ", " + server.name + \
-                           " (" + connection_info["env"] + ") " + cur_dt()
-            log("INFO", "Searching for " + queue_name +
-                " on server " + server.name + "...")
-            jms_runtime = server.getJMSRuntime()
-            jms_servers = jms_runtime.getJMSServers()
-            for jms_server in jms_servers:
-                destinations = jms_server.getDestinations()
-                for dest in destinations:
-                    name = get_queue_name(dest.name)
-                    if queue_name == name:
-                        report.append(("Queue name", name))
-                        report.append(("Queue full name", dest.name))
-                        report.append(("Messages Current Count",
-                                       dest.messagesCurrentCount))
-                        report.append(("Messages Received Count",
-                                       dest.messagesReceivedCount))
-                        report.append(("Messages Pending Count",
-                                       dest.messagesPendingCount))
-                        report.append(
-                            ("Messages High Count", dest.messagesHighCount))
-                        report.append(("Consumers Current Count",
-                                       dest.consumersCurrentCount))
-
-                        if int(dest.messagesCurrentCount):
-                            # Get information about first and last messages
-                            cursor = dest.getMessages("", 0)
-                            cursor_size = dest.getCursorSize(cursor)
-                            messages = dest.getNext(cursor, cursor_size)
-                            if cursor_size > 1:
-                                msg_indexes = [0, cursor_size - 1]
-                            else:
-                                msg_indexes = [0]
-                            for i in msg_indexes:
-                                message = messages[i]
-                                jms_msg_info = JMSMessageInfo(message)
-                                wlmsg = jms_msg_info.getMessage()
-                                report.append(("", ""))
-                                if i == 0:
-                                    report.append(
-                                        ("First message..........", ""))
-                                else:
-                                    report.append(
-                                        ("Last message...........", ""))
-                                report.append(
-                                    ("JMSMessageID", wlmsg.getJMSMessageID()))
-                                loc_time = localtime(
-                                    Double(wlmsg.getJMSTimestamp() // 1000))
-                                jms_timestamp = strftime(
-                                    '%Y-%m-%d %H:%M:%S', loc_time)
-                                report.append(("JMSTimestamp", jms_timestamp))
-                                report.append(
-                                    ("PayloadSize", wlmsg.getPayloadSize()))
-                                report.append(
-                                    ("JMSExpiration", wlmsg.getJMSExpiration()))
-                                report.append(
-                                    ("JMSRedelivered", wlmsg.getJMSRedelivered()))
-                                report.append(
-                                    ("JMSRedeliveryLimit", wlmsg.getJMSRedeliveryLimit()))
-                            dest.closeCursor(cursor)
-            if report:
-                create_report(report_title, report, col_names, is_sorted=False, is_total=False)
+        members = []  # [source dest, source bean, [target bean or None per rule], [selector or None per rule]]
+        report = []
+        msg_matched_total = 0
+        for src in src_members:
+            src_bean = get_mbean_proxy(connection_info, src["object_name"])
+            trg_beans = []
+            for i in range(len(rules)):
+                key = str(src["jms_server"]) + "/" + rules[i]["target"]
+                if key in targets:
+                    trg_beans.append(get_mbean_proxy(connection_info, targets[key]["object_name"]))
+                else:
+                    log("WARNING", "Target queue '" + rules[i]["target"] + "' of rule " + str(i + 1)
+                        + " was not found on JMS server " + str(src["jms_server"]) + ", its messages stay on "
+                        + "the source.")
+                    trg_beans.append(None)
+            selectors = get_route_selectors(rules, trg_beans)
+            for i in range(len(rules)):
+                matched = 0
+                if selectors[i] is not None:
+                    matched = count_messages(src_bean, selectors[i])
+                report.append([src["server"], str(src["jms_server"]), src["Name"], i + 1, rules[i]["target"],
+                               matched])
+                msg_matched_total = msg_matched_total + matched
+            members.append([src, src_bean, trg_beans, selectors])
+
+        report_title = "REPORT: QUEUES FOUND FOR ROUTE MESSAGES, " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
+        col_names = ("SERVER", "JMS SERVER", "SOURCE QUEUE", "RULE", "TARGET QUEUE", "MSG_MATCHED_COUNT")
+        create_report(report_title, report, col_names, is_sorted=False, is_total=True)
+        log("INFO", "Matched counts are counted per selector, a message matching several selectors is counted "
+            + "for each of them but moved by the first one.")
+
+        if msg_matched_total == 0:
+            log("INFO", "There are no messages to route.")
+            return
+        if not is_standalone:
+            route_choice = raw_input("[INPUT] Do you want to route messages from '" + q_src_name + "', Y/N [Y]? ")
+        else:
+            route_choice = "Y"
+        if not (route_choice.strip().upper() == "Y" or route_choice.strip() == ""):
+            log("WARNING", "Operation canceled by the user.")
+            return
+
+        quiesce = get_quiesce_mode(connection_info)
+        tasks = []
+        for src, src_bean, trg_beans, selectors in members:
+            q_paused_beans = [src_bean]
+            if settings["quiesce_target"].upper() == "Y":
+                paused_targets = []
+                for i in range(len(rules)):
+                    if trg_beans[i] is not None and rules[i]["target"] not in paused_targets:
+                        q_paused_beans.append(trg_beans[i])
+                        paused_targets.append(rules[i]["target"])
+            tasks.append(quiesce_task([route_member_messages, (src_bean, selectors, trg_beans)], q_paused_beans,
+                                      src_bean, "", quiesce))
+        results = run_tasks(tasks, settings["parallel_threads"])
+
+        moved_totals = [0] * len(rules)
+        left_total = 0
+        failed_cnt = 0
+        for i in range(len(members)):
+            src = members[i][0]
+            moved, error = results[i]
+            if error:
+                log("ERROR", "Failed to route messages from '" + src["Name"] + "': " + error)
+                failed_cnt = failed_cnt + 1
+                continue
+            if quiesce != "none":
+                moved, msg_cnt, pause_ms = moved
+                log("INFO", "'" + src["Name"] + "' was paused for " + str(pause_ms) + " ms, " + str(msg_cnt)
+                    + " messages on it after pausing.")
+            moved, left = moved
+            for j in range(len(rules)):
+                moved_totals[j] = moved_totals[j] + moved[j]
+            left_total = left_total + left
+
+        report = []
+        for i in range(len(rules)):
+            report.append([i + 1, rules[i]["selector"] or "(all)", rules[i]["target"], moved_totals[i]])
+        report.append(["-", "(left on source: unmatched, missing targets, arrived meanwhile)", q_src_name, left_total])
+        report_title = "REPORT: ROUTE MESSAGES FROM " + q_src_name + ", " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
+        col_names = ("RULE", "SELECTOR", "TARGET QUEUE", "MSG_COUNT")
+        create_report(report_title, report, col_names, is_sorted=False, is_total=False)
+        if failed_cnt > 0:
+            log("WARNING", str(failed_cnt) + " of " + str(len(members)) + " source members failed and are not included "
+                + "in the report. Repeat the procedure.")
+        log("INFO", "route_messages completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def route_member_messages(q_src_bean, selectors, q_trg_beans):
+    """
+    This function applies the routing rules in order to a single source destination: the messages matching the
+    selector of each rule are moved to its target destination located on the same JMS server.
+    :type q_src_bean: JMSDestinationRuntimeMBean
+    :type selectors: list. Selector per rule as returned by get_route_selectors(), None if the rule is skipped
+    :type q_trg_beans: list. Target destination per rule (JMSDestinationRuntimeMBean), None if the target is missing
+    :rtype: list. [[count of moved messages per rule], current message count of the source afterwards]
+    """
+    moved = []
+    for i in range(len(selectors)):
+        if q_trg_beans[i] is None or selectors[i] is None:
+            moved.append(0)
+        else:
+            moved.append(move_member_messages(q_src_bean, q_trg_beans[i], selectors[i]))
+    return [moved, q_src_bean.messagesCurrentCount]
+
+
+def get_route_selectors(rules, q_trg_beans):
+    """
+    This function returns the selectors of the routing rules for a source member, so that the messages of a rule
+    whose target is missing are not moved by a later rule: the later selectors are extended with
+    AND NOT (selector of the rule). A later rule gets no selector at all if the rule matches all messages.
+    :type rules: list. Routing rules as returned by read_routing_rules()
+    :type q_trg_beans: list. Target destination per rule, None if the target is missing
+    :rtype: list. Selector per rule ("" for all messages), None if the rule is skipped
+    """
+    selectors = []
+    excluded = []  # Selectors of the earlier rules with a missing target
+    is_all_excluded = False
+    for i in range(len(rules)):
+        if is_all_excluded or q_trg_beans[i] is None:
+            selectors.append(None)
+        else:
+            conditions = []
+            if rules[i]["selector"]:
+                conditions.append("(" + rules[i]["selector"] + ")")
+            for selector in excluded:
+                conditions.append("NOT (" + selector + ")")
+            selectors.append(" AND ".join(conditions))
+        if q_trg_beans[i] is None:
+            if rules[i]["selector"]:
+                excluded.append(rules[i]["selector"])
+            else:
+                is_all_excluded = True
+    return selectors
+
+
+def read_routing_rules(rules_file_name):
+    """
+    This function reads the routing rule file. Lines starting with # are comments.
+    Line format: [message selector] -> [target queue name]. An empty selector or * matches all remaining messages.
+    Timestamps in selectors are converted as in the message filter (see parse_filter).
+    :type rules_file_name: str
+    :rtype: list. A list of dicts {"selector": selector, "target": queue name} in file order
+    """
+    rules = []
+    rules_file = open(rules_file_name, "r")
+    try:
+        for line in rules_file.readlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "->" not in line:
+                raise ValueError("Invalid routing rule: " + line)
+            separator = line.rfind("->")
+            selector = line[:separator].strip()
+            target = line[separator + 2:].strip()
+            if not target:
+                raise ValueError("Invalid routing rule: " + line)
+            if selector == "*":
+                selector = ""
+            rules.append({"selector": parse_filter(selector), "target": target})
+    finally:
+        rules_file.close()
+    return rules
+
+
+def migrate_messages(connection_info):
+    """
+    This function migrates messages from a queue of the current environment to a queue of another environment
+    (e.g. another domain or data centre), which move_messages cannot do.
+    The source members are streamed page by page from a cursor (page_size), each message is copied (body, properties,
+    JMSCorrelationID, JMSType, priority, delivery mode and expiration) and sent to the target queue in a transacted
+    session, migrate_batch_size messages per commit. A batch is deleted from the source (by JMSMessageID) only
+    after the target has committed it, so a failure may at worst leave duplicates on the target, never lose messages.
+    Text, bytes, map, object and stream messages are supported.
+    Automatic usage:
+        wlst manageJmsQueues.py migrate_messages [env] [Qsrc] [target_env] [target_jndi_name] [filter]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    settings = connection_info["settings"]
+    if is_standalone:
+        if len(sys.argv) > 5:
+            q_src_name = sys.argv[3]
+            trg_env = sys.argv[4]
+            trg_jndi_name = sys.argv[5]
+        else:
+            log("ERROR", "Incomplete/incorrect list of parameters.")
+            f.close()
+            disconnect_all()
+            exit()
+        msg_filter = parse_filter(" ".join(sys.argv[6:]))
+    else:
+        while True:
+            q_src_name = raw_input("[INPUT] Enter name of the source queue: ")
+            if not q_src_name:
+                print(cur_dt() + " [ERROR] Queue name cannot be empty. Please, enter a valid queue name.")
+            else:
+                break
+        print("Available target environments: " + ", ".join(prop_env_file.keys()))
+        while True:
+            trg_env = raw_input("[INPUT] Enter the target environment: ").strip()
+            if trg_env in prop_env_file:
+                break
+            print(cur_dt() + " [WARNING] The provided environment name is not found in the list. Try again.")
+        while True:
+            trg_jndi_name = raw_input("[INPUT] Enter JNDI name of the target queue: ")
+            if not trg_jndi_name:
+                print(cur_dt() + " [ERROR] JNDI name cannot be empty. Please, enter a valid JNDI name.")
+            else:
+                break
+        msg_filter = raw_input("[INPUT] Enter message filter (e.g. JMSTimestamp > \'2019-01-01 00:00:00.000\') or leave blank: ")
+        msg_filter = parse_filter(msg_filter.strip())
+        print("")
+    q_src_name = q_src_name.strip()
+    trg_jndi_name = trg_jndi_name.strip()
+    log("INFO", "Source queue: " + q_src_name + " (" + connection_info["env"] + "), target queue: " + trg_jndi_name
+        + " (" + trg_env + ")")
+    if msg_filter:
+        log("INFO", "The following message filter will be applied:  " + msg_filter)
+
+    try:
+        members = find_destinations(connection_info, q_src_name, ["MessagesCurrentCount"])
+        if not members:
+            log("ERROR", "Source queue was not found")
+            return
+        msg_to_migrate_total = 0
+        for member in members:
+            member["bean"] = get_mbean_proxy(connection_info, member["object_name"])
+            member["msg_to_migrate"] = count_messages(member["bean"], msg_filter)
+            msg_to_migrate_total = msg_to_migrate_total + member["msg_to_migrate"]
+        if msg_to_migrate_total == 0:
+            log("INFO", "There are no messages to migrate.")
+            return
+        if not is_standalone:
+            migrate_choice = raw_input("[INPUT] Do you want to migrate " + str(msg_to_migrate_total)
+                                       + " messages to '" + trg_jndi_name + "' (" + trg_env + "), Y/N [Y]? ")
+        else:
+            migrate_choice = "Y"
+        if not (migrate_choice.strip().upper() == "Y" or migrate_choice.strip() == ""):
+            log("WARNING", "Operation canceled by the user.")
+            return
+
+        trg_info = read_connection_info(trg_env)
+        log("INFO", "Connecting to " + trg_info["url"] + " (" + trg_env + ")...")
+        trg = open_jms_session(trg_info, settings["migrate_connection_factory"])
+        report = []
+        migrated_total = 0
+        started = time.time()
+        try:
+            producer = trg["session"].createProducer(trg["context"].lookup(trg_jndi_name))
+            for member in members:
+                if member["msg_to_migrate"] == 0:
+                    continue
+                log("INFO", "Migrating " + str(member["msg_to_migrate"]) + " messages from '" + member["Name"] + "'...")
+                member_started = time.time()
+                migrated, error = migrate_member_messages(member["bean"], msg_filter, trg["session"], producer,
+                                                          settings)
+                elapsed = time.time() - member_started
+                migrated_total = migrated_total + migrated
+                if error:
+                    log("ERROR", "Failed to migrate messages from '" + member["Name"] + "': " + error)
+                    status = "Failed"
+                elif migrated < member["msg_to_migrate"]:
+                    status = "Incomplete"
+                else:
+                    status = "Migrated"
+                report.append([member["server"], member["Name"], member["msg_to_migrate"], migrated,
+                               get_rate(migrated, elapsed), status])
+                if error:
+                    break  # The target is probably unavailable, do not continue with the next members
+        finally:
+            close_jms_session(trg)
+
+        elapsed = time.time() - started
+        report_title = "REPORT: MIGRATE MESSAGES TO " + trg_jndi_name + " (" + trg_env + "), " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
+        col_names = ("SERVER", "SOURCE QUEUE", "MSG_TO_MIGRATE_COUNT", "MSG_MIGRATED_COUNT", "MSG_PER_SEC", "STATUS")
+        create_report(report_title, report, col_names, is_sorted=False, is_total=True)
+        log("INFO", "Migrated " + str(migrated_total) + " out of " + str(msg_to_migrate_total) + " messages in "
+            + str(int(elapsed)) + " seconds (" + str(get_rate(migrated_total, elapsed)) + " messages per second).")
+        log("INFO", "migrate_messages completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def migrate_member_messages(dest, msg_filter, session, producer, settings):
+    """
+    This function migrates messages matching the filter from a single source destination to the target producer
+    of a transacted session. The messages are committed to the target every migrate_batch_size messages,
+    and every committed batch is deleted from the source. A failed batch is rolled back and migration stops.
+    :type dest: JMSDestinationRuntimeMBean
+    :type msg_filter: str. Message selector, "" for all messages
+    :type session: javax.jms.Session. Transacted session of the target environment
+    :type producer: javax.jms.MessageProducer. Producer of the target queue
+    :type settings: dict
+    :rtype: list. [count of migrated messages (committed to the target and deleted from the source), error or None]
+    """
+    state = {"batch": [], "migrated": 0, "not_deleted": 0, "error": None, "logged": time.time(), "started": time.time()}
+
+    def commit_batch():
+        try:
+            session.commit()
+        except:
+            state["error"] = "Target commit failed, the batch was not deleted from the source: " \
+                             + str(sys.exc_info()[1])
+            try:
+                session.rollback()
+            except:
+                pass
+            return
+        state["not_deleted"] = len(state["batch"])
+        deleted = dest.deleteMessages(get_message_id_selector(state["batch"]))
+        state["not_deleted"] = 0
+        if deleted < len(state["batch"]):
+            log("WARNING", str(len(state["batch"]) - deleted) + " committed messages were no longer on '" + dest.name
+                + "' (consumed meanwhile?) and may be duplicated on the target.")
+        state["migrated"] = state["migrated"] + len(state["batch"])
+        state["batch"] = []
+        if time.time() - state["logged"] >= 10:
+            state["logged"] = time.time()
+            log("INFO", "Migrated " + str(state["migrated"]) + " messages from '" + dest.name + "' ("
+                + str(get_rate(state["migrated"], time.time() - state["started"])) + " messages per second)...")
+
+    def handle_message(wlmsg):
+        try:
+            send_message_copy(session, producer, wlmsg)
+        except:
+            state["error"] = "Send failed: " + str(sys.exc_info()[1])
+            try:
+                session.rollback()
+            except:
+                pass
+            return True
+        state["batch"].append(wlmsg.getJMSMessageID())
+        if len(state["batch"]) >= settings["migrate_batch_size"]:
+            commit_batch()
+        return state["error"] is not None
+
+    try:
+        stream_messages(dest, msg_filter, handle_message, settings["page_size"], True)
+        if state["batch"] and state["error"] is None:
+            commit_batch()
+    except:
+        state["error"] = str(sys.exc_info()[1])
+        if state["not_deleted"] > 0:
+            state["error"] = state["error"] + ". " + str(state["not_deleted"]) + " messages were committed to the " \
+                             + "target but not deleted from the source."
+        else:
+            try:
+                session.rollback()
+            except:
+                pass
+    return [state["migrated"], state["error"]]
+
+
+def send_message_copy(session, producer, wlmsg):
+    """
+    This function sends a copy of a message (body, user properties, JMSCorrelationID, JMSType, priority,
+    delivery mode and remaining time to live) with the producer of the session.
+    :type session: javax.jms.Session
+    :type producer: javax.jms.MessageProducer
+    :type wlmsg: WLMessage
+    """
+    if isinstance(wlmsg, TextMessage):
+        msg = session.createTextMessage(wlmsg.getText())
+    elif isinstance(wlmsg, ObjectMessage):
+        msg = session.createObjectMessage(wlmsg.getObject())
+    elif isinstance(wlmsg, BytesMessage):
+        wlmsg.reset()
+        body = jarray.zeros(wlmsg.getBodyLength(), "b")
+        wlmsg.readBytes(body)
+        msg = session.createBytesMessage()
+        msg.writeBytes(body)
+    elif isinstance(wlmsg, MapMessage):
+        msg = session.createMapMessage()
+        names = wlmsg.getMapNames()
+        while names.hasMoreElements():
+            name = names.nextElement()
+            msg.setObject(name, wlmsg.getObject(name))
+    elif isinstance(wlmsg, StreamMessage):
+        wlmsg.reset()
+        msg = session.createStreamMessage()
+        while True:
+            try:
+                msg.writeObject(wlmsg.readObject())
+            except MessageEOFException:
+                break
+    else:
+        msg = session.createMessage()
+    names = wlmsg.getPropertyNames()
+    while names.hasMoreElements():
+        name = names.nextElement()
+        if not (name.startswith("JMSX") or name.startswith("JMS_")):  # Set by the provider
+            msg.setObjectProperty(name, wlmsg.getObjectProperty(name))
+    if wlmsg.getJMSCorrelationID():
+        msg.setJMSCorrelationID(wlmsg.getJMSCorrelationID())
+    if wlmsg.getJMSType():
+        msg.setJMSType(wlmsg.getJMSType())
+    time_to_live = 0
+    if wlmsg.getJMSExpiration() > 0:
+        time_to_live = max(wlmsg.getJMSExpiration() - System.currentTimeMillis(), 1)
+    producer.send(msg, wlmsg.getJMSDeliveryMode(), wlmsg.getJMSPriority(), time_to_live)
+
+
+def open_jms_session(connection_info, connection_factory):
+    """
+    This function opens a JMS connection with a transacted session to the environment.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type connection_factory: str. JNDI name of the connection factory
+    :rtype: dict. {"context": InitialContext, "connection": javax.jms.Connection, "session": javax.jms.Session}
+    """
+    env = Hashtable()
+    env.put(Context.INITIAL_CONTEXT_FACTORY, "weblogic.jndi.WLInitialContextFactory")
+    env.put(Context.PROVIDER_URL, connection_info["url"])
+    env.put(Context.SECURITY_PRINCIPAL, connection_info["username"])
+    env.put(Context.SECURITY_CREDENTIALS, connection_info["password"])
+    jms = {"context": InitialContext(env), "connection": None, "session": None}
+    try:
+        jms["connection"] = jms["context"].lookup(connection_factory).createConnection()
+        jms["session"] = jms["connection"].createSession(True, Session.SESSION_TRANSACTED)
+    except:
+        close_jms_session(jms)
+        raise
+    return jms
+
+
+def close_jms_session(jms):
+    """
+    This function closes the JMS connection and the JNDI context opened by open_jms_session().
+    :type jms: dict. {"context": InitialContext, "connection": javax.jms.Connection, "session": javax.jms.Session}
+    """
+    try:
+        if jms["connection"] is not None:
+            jms["connection"].close()  # Closes the session as well, an open transaction is rolled back
+    finally:
+        jms["context"].close()
+
+
+def get_rate(count, elapsed_sec):
+    """
+    This function returns the count per second, rounded to one decimal.
+    :type count: int
+    :type elapsed_sec: float
+    :rtype: float
+    """
+    if elapsed_sec <= 0:
+        return 0.0
+    return round(count / elapsed_sec, 1)
+
+
+def get_quiesce_mode(connection_info):
+    """
+    This function returns the quiesce setting: none, production, consumption or both.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: str
+    """
+    quiesce = connection_info["settings"]["quiesce"].lower()
+    if quiesce not in ("none", "production", "consumption", "both"):
+        log("WARNING", "Unknown quiesce mode '" + quiesce + "'. Destinations will not be paused.")
+        quiesce = "none"
+    if quiesce != "none":
+        log("INFO", "Destinations will be paused (" + quiesce + ") during the operation.")
+    return quiesce
+
+
+def quiesce_task(task, dests, q_src_bean, msg_filter, quiesce):
+    """
+    This function wraps a [function, args] task for run_tasks() into run_quiesced(), unless quiesce is "none".
+    :type task: list. [function, args]
+    :type dests: list. Destinations to pause
+    :type q_src_bean: JMSDestinationRuntimeMBean. The destination whose messages are processed by the task
+    :type msg_filter: str
+    :type quiesce: str. none, production, consumption or both
+    :rtype: list. [function, args]
+    """
+    if quiesce == "none":
+        return task
+    return [run_quiesced, (dests, quiesce, q_src_bean, msg_filter, task[0], task[1])]
+
+
+def run_quiesced(dests, quiesce, q_src_bean, msg_filter, func, args):
+    """
+    This function pauses production and/or consumption of the destinations, recounts the messages of the source
+    matching the filter, calls func(*args) and resumes the destinations.
+    Destinations are resumed in a finally block, i.e. also when the call fails. Only destinations paused
+    by this function are resumed, destinations paused by an administrator stay paused.
+    :type dests: list. Destinations to pause (JMSDestinationRuntimeMBean)
+    :type quiesce: str. production, consumption or both
+    :type q_src_bean: JMSDestinationRuntimeMBean
+    :type msg_filter: str
+    :rtype: list. [result of the call, count of messages matching the filter after pausing, pause window in ms]
+    """
+    paused = []
+    started = time.time()
+    try:
+        for dest in dests:
+            if quiesce in ("production", "both") and not dest.isProductionPaused():
+                dest.pauseProduction()
+                paused.append([dest, "production"])
+            if quiesce in ("consumption", "both") and not dest.isConsumptionPaused():
+                dest.pauseConsumption()
+                paused.append([dest, "consumption"])
+        msg_cnt = count_messages(q_src_bean, msg_filter)
+        result = apply(func, args)
+    finally:
+        errors = []
+        for dest, what in paused:
+            try:
+                if what == "production":
+                    dest.resumeProduction()
+                else:
+                    dest.resumeConsumption()
+            except:
+                errors.append(dest.name + " (" + what + "): " + str(sys.exc_info()[1]))
+        if errors:
+            raise Exception("Failed to resume " + ", ".join(errors))
+    return [result, msg_cnt, int((time.time() - started) * 1000)]
+
+
+def get_queue_info(connection_info):
+    """
+    This function returns information on a given queue.
+    Automatic usage:
+        wlst manageJmsQueues.py get_queue_info [env] [queue_name]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+
+    if is_standalone:
+        if len(sys.argv) > 3:
+            queue_name = sys.argv[3]
+        else:
+            log("ERROR", "Incomplete list of attributes.")
+            f.close()
+            disconnect_all()
+            exit()
+    else:
+        while True:
+            queue_name = raw_input(
+                "[INPUT] Enter a queue name (e.g. WLMsgQueueName): ")
+            if not queue_name:
+                print(
+                    cur_dt() + " [ERROR] Queue name cannot be empty. Please, enter a valid name")
+                continue
             else:
-                log("WARNING", "Queue was not found.")
+                break
+
+    queue_name = queue_name.strip()
+    log("INFO", "Entered queue name: " + queue_name)
+
+    if connection_info["offline"]:
+        get_queue_info_from_snapshot(connection_info, queue_name)
+        return
+
+    try:
+        servers = get_domain_runtime_service(connection_info).getServerRuntimes()
+        if len(servers) == 0:
+            log("WARNING", "No servers were found at " +
+                parse_url(connection_info["url"])["hostname"] + ". Terminating the script...")
+            return
+
+        col_names = ("PROPERTY", "VALUE")
+        not_scanned = []
+        for server in servers:
+            try:
+                if server.getState() != "RUNNING":
+                    log("WARNING", "Server " + server.name + " is " + server.getState() + ", skipped.")
+                    not_scanned.append([server.name, "state " + server.getState()])
+                    continue
+                report = []
+                report_title = "REPORT: INFORMATION ON QUEUE " + \
+                               queue_name + ", " + server.name + \
+                               " (" + connection_info["env"] + ") " + cur_dt()
+                log("INFO", "Searching for " + queue_name +
+                    " on server " + server.name + "...")
+                jms_runtime = server.getJMSRuntime()
+                jms_servers = jms_runtime.getJMSServers()
+                for jms_server in jms_servers:
+                    destinations = jms_server.getDestinations()
+                    for dest in destinations:
+                        name = get_queue_name(dest.name)
+                        if queue_name == name:
+                            report.append(("Queue name", name))
+                            report.append(("Queue full name", dest.name))
+                            report.append(("Messages Current Count",
+                                           dest.messagesCurrentCount))
+                            report.append(("Messages Received Count",
+                                           dest.messagesReceivedCount))
+                            report.append(("Messages Pending Count",
+                                           dest.messagesPendingCount))
+                            report.append(
+                                ("Messages High Count", dest.messagesHighCount))
+                            report.append(("Consumers Current Count",
+                                           dest.consumersCurrentCount))
+
+                            if int(dest.messagesCurrentCount):
+                                # Get information about first and last messages
+                                cursor = dest.getMessages("", 0)
+                                cursor_size = dest.getCursorSize(cursor)
+                                messages = dest.getNext(cursor, cursor_size)
+                                if cursor_size > 1:
+                                    msg_indexes = [0, cursor_size - 1]
+                                else:
+                                    msg_indexes = [0]
+                                for i in msg_indexes:
+                                    message = messages[i]
+                                    jms_msg_info = JMSMessageInfo(message)
+                                    wlmsg = jms_msg_info.getMessage()
+                                    report.append(("", ""))
+                                    if i == 0:
+                                        report.append(
+                                            ("First message..........", ""))
+                                    else:
+                                        report.append(
+                                            ("Last message...........", ""))
+                                    report.append(
+                                        ("JMSMessageID", wlmsg.getJMSMessageID()))
+                                    loc_time = localtime(
+                                        Double(wlmsg.getJMSTimestamp() // 1000))
+                                    jms_timestamp = strftime(
+                                        '%Y-%m-%d %H:%M:%S', loc_time)
+                                    report.append(("JMSTimestamp", jms_timestamp))
+                                    report.append(
+                                        ("PayloadSize", wlmsg.getPayloadSize()))
+                                    report.append(
+                                        ("JMSExpiration", wlmsg.getJMSExpiration()))
+                                    report.append(
+                                        ("JMSRedelivered", wlmsg.getJMSRedelivered()))
+                                    report.append(
+                                        ("JMSRedeliveryLimit", wlmsg.getJMSRedeliveryLimit()))
+                                dest.closeCursor(cursor)
+                if report:
+                    create_report(report_title, report, col_names, is_sorted=False, is_total=False)
+                else:
+                    log("WARNING", "Queue was not found.")
+            except (WLSTException, ValueError, NameError, Exception, AttributeError, TypeError), e:
+                log("WARNING", "Server " + server.name + " was not scanned: " + str(e))
+                not_scanned.append([server.name, str(e)])
+        log_not_scanned(not_scanned)
         log("INFO", "get_queue_info completed.")
 
     except (WLSTException, ValueError, NameError, Exception, AttributeError, TypeError), e:
         log("ERROR", str(e))
 
 
+def watch(connection_info):
+    """
+    This function watches the destination statistics in a polling loop and logs a structured ALERT line
+    when a rule is raised and when it is cleared. Rules (the thresholds are settings):
+        dmq_messages   - CUR_MSG > watch_dmq_max_msg on a DMQ queue
+        no_consumers   - CUR_CONS == 0 for more than watch_no_consumers_sec seconds on a non-DMQ queue
+        pending_growth - PEND_MSG growing for watch_pend_growth_intervals intervals in a row
+    To avoid flapping, a raised alert is cleared only after its condition has been false
+    for watch_clear_intervals intervals in a row.
+    The destinations are discovered once; every next cycle re-fetches only the counters.
+    Automatic usage:
+        wlst manageJmsQueues.py watch [env] [cycles]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    settings = connection_info["settings"]
+    if is_standalone:
+        if len(sys.argv) > 3:
+            cycles = sys.argv[3]
+        else:
+            cycles = settings["watch_cycles"]
+    else:
+        cycles = raw_input("[INPUT] Enter number of polling cycles (0 - until interrupted) ["
+                           + str(settings["watch_cycles"]) + "]: ")
+        if not cycles.strip():
+            cycles = settings["watch_cycles"]
+    try:
+        cycles = int(cycles)
+    except ValueError:
+        log("ERROR", "Number of cycles must be an integer.")
+        return
+
+    log("INFO", "Watching queues every " + str(settings["watch_interval_sec"]) + " seconds. Press Ctrl+C to stop.")
+    counters = ["ConsumersCurrentCount", "MessagesCurrentCount", "MessagesPendingCount"]
+    watch_state = {}  # {"dest name": {"no_cons_since": time, "prev_pend": count, "pend_growth": count, "alerts": {}}}
+    destinations = []
+    cycle = 0
+    try:
+        while cycles == 0 or cycle < cycles:
+            cycle = cycle + 1
+            started = time.time()
+            if not destinations:
+                destinations = discover_destinations(connection_info, counters)
+            elif refresh_counters(connection_info, destinations, counters) > 0:
+                log("INFO", "Some destinations are gone. The topology will be rediscovered.")
+                destinations = discover_destinations(connection_info, counters)
+
+            active_cnt = 0
+            for dest in destinations:
+                if dest["Name"] not in watch_state:
+                    watch_state[dest["Name"]] = {"no_cons_since": None, "prev_pend": None, "pend_growth": 0,
+                                                 "alerts": {}}
+                active_cnt = active_cnt + check_watch_rules(dest, watch_state[dest["Name"]], started, settings)
+            log("INFO", "Watch cycle " + str(cycle) + ": " + str(len(destinations)) + " destinations, "
+                + str(active_cnt) + " active alerts, fetched in " + str(int((time.time() - started) * 1000)) + " ms")
+
+            if cycles == 0 or cycle < cycles:
+                time.sleep(max(0, settings["watch_interval_sec"] - (time.time() - started)))
+    except KeyboardInterrupt:
+        print("")
+        log("INFO", "Watch interrupted by the user.")
+    log("INFO", "watch completed.")
+
+
+def dashboard(connection_info):
+    """
+    This function shows the destination statistics in a terminal table refreshed every dashboard_interval_sec seconds
+    (ANSI terminal required). Only the rows that changed since the previous refresh are redrawn. The destinations
+    are discovered once, every next refresh re-fetches only the counters; the topology is rediscovered on demand.
+    The table is sorted by current messages or by their growth per minute since the previous refresh.
+    Keys (type the key and press Enter):
+        a - all queues, l - queues without listeners, m - queues with messages, d - DMQs with messages,
+        s - switch sorting (CUR_MSG / GROWTH), r - rediscover the topology, q - quit
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    if is_standalone:
+        log("ERROR", "The dashboard is available in the interactive mode only.")
+        return
+    settings = connection_info["settings"]
+    counters = ["ConsumersCurrentCount", "MessagesCurrentCount", "MessagesPendingCount"]
+    views = {"a": "all queues", "l": "queues without listeners", "m": "queues with messages", "d": "DMQs with messages"}
+    view = "m"
+    sort_by = "CUR_MSG"
+    prev_counts = {}  # {"dest name": [time, current messages]}
+    screen = []  # Lines currently shown on the terminal
+    destinations = []
+    gone_cnt = 0
+    stdin = getattr(System, "in")  # System.in, "in" is a reserved word
+    log("INFO", "Starting dashboard of " + connection_info["env"] + "...")
+    try:
+        while True:
+            started = time.time()
+            if not destinations:
+                destinations = discover_destinations(connection_info, counters)
+                gone_cnt = 0
+                screen = []  # The discovery logs to the terminal, redraw all
+            else:
+                gone_cnt = gone_cnt + refresh_counters(connection_info, destinations, counters)
+
+            rows = []
+            for dest in destinations:
+                name = dest["Name"]
+                cur_cnt = dest["MessagesCurrentCount"]
+                growth = 0.0
+                if name in prev_counts and started > prev_counts[name][0]:
+                    growth = (cur_cnt - prev_counts[name][1]) * 60.0 / (started - prev_counts[name][0])
+                prev_counts[name] = [started, cur_cnt]
+                if is_dashboard_row(view, dest):
+                    rows.append([name, dest["ConsumersCurrentCount"], cur_cnt, dest["MessagesPendingCount"], growth])
+            if sort_by == "CUR_MSG":
+                rows.sort(lambda a, b: cmp(b[2], a[2]) or cmp(a[0], b[0]))
+            else:
+                rows.sort(lambda a, b: cmp(b[4], a[4]) or cmp(a[0], b[0]))
+
+            lines = [connection_info["env"] + " " + cur_dt() + " | " + views[view] + ": " + str(len(rows))
+                     + " of " + str(len(destinations)) + " | sorted by " + sort_by + " | fetched in "
+                     + str(int((time.time() - started) * 1000)) + " ms",
+                     "Keys + Enter: [a]ll [l]isteners [m]essages [d]mq [s]ort [r]ediscover [q]uit"]
+            if gone_cnt > 0:
+                lines.append(str(gone_cnt) + " destinations are gone, press r to rediscover the topology.")
+            else:
+                lines.append("")
+            lines.append("%-60s %8s %10s %10s %10s" % ("QUEUE_NAME", "CUR_CONS", "CUR_MSG", "PEND_MSG", "GROWTH/MIN"))
+            for row in rows[:settings["dashboard_rows"]]:
+                lines.append("%-60s %8d %10d %10d %10.1f" % tuple(row))
+            if len(rows) > settings["dashboard_rows"]:
+                lines.append("... " + str(len(rows) - settings["dashboard_rows"]) + " more")
+            screen = draw_dashboard(screen, lines)
+
+            # Wait for the next refresh, checking for keys without blocking
+            key = ""
+            while not key and time.time() - started < settings["dashboard_interval_sec"]:
+                while stdin.available() > 0:
+                    char = chr(stdin.read()).lower()
+                    if char.strip():
+                        key = char
+                if not key:
+                    time.sleep(0.2)
+            if key == "q":
+                break
+            elif key in views:
+                view = key
+                screen = []
+            elif key == "s":
+                if sort_by == "CUR_MSG":
+                    sort_by = "GROWTH"
+                else:
+                    sort_by = "CUR_MSG"
+                screen = []
+            elif key == "r":
+                destinations = []
+    except KeyboardInterrupt:
+        pass
+    sys.stdout.write(ANSI_MOVE % (len(screen) + 1, 1) + "\n")
+    log("INFO", "dashboard completed.")
+
+
+def is_dashboard_row(view, dest):
+    """
+    This function returns True if the destination belongs to the dashboard view. The views match the list reports:
+    a - all queues [1], l - queues without listeners [2], m - queues with messages [3], d - DMQs with messages [4]
+    :type view: str. a, l, m or d
+    :type dest: dict. Destination returned by discover_destinations()
+    :rtype: bool
+    """
+    if view == "l":
+        return dest["ConsumersCurrentCount"] == 0 and "_dmq" not in dest["Name"]
+    elif view == "m":
+        return dest["MessagesCurrentCount"] > 0 or dest["MessagesPendingCount"] > 0
+    elif view == "d":
+        return dest["MessagesCurrentCount"] > 0 and "_dmq" in dest["Name"]
+    return True
+
+
+def draw_dashboard(screen, lines):
+    """
+    This function draws the lines on the terminal with ANSI escape codes. Only the lines which differ from the lines
+    currently on the screen are redrawn. An empty screen means the terminal is cleared and all lines are drawn.
+    :type screen: list. Lines currently shown on the terminal
+    :type lines: list. Lines to show
+    :rtype: list. Lines shown on the terminal after drawing
+    """
+    output = []
+    if not screen:
+        output.append(ANSI_CLEAR)
+    for i in range(max(len(screen), len(lines))):
+        if i < len(lines):
+            line = lines[i]
+        else:
+            line = ""
+        if i >= len(screen) or screen[i] != line:
+            output.append(ANSI_MOVE % (i + 1, 1) + line + ANSI_CLEAR_LINE)
+    sys.stdout.write("".join(output))
+    sys.stdout.flush()
+    return lines
+
+
+def check_watch_rules(dest, state, now, settings):
+    """
+    This function evaluates the watch rules for one destination, raises/clears its alerts and logs the changes.
+    :type dest: dict. Destination attributes: Name, server, ConsumersCurrentCount, MessagesCurrentCount, ...
+    :type state: dict. The state of the destination kept between the cycles
+    :type now: float. Time of the current cycle
+    :type settings: dict
+    :rtype: int. Count of active alerts of the destination
+    """
+    name = dest["Name"]
+    cons_cur_cnt = dest["ConsumersCurrentCount"]
+    msg_cur_cnt = dest["MessagesCurrentCount"]
+    msg_pnd_cnt = dest["MessagesPendingCount"]
+
+    if cons_cur_cnt > 0:
+        state["no_cons_since"] = None
+    elif state["no_cons_since"] is None:
+        state["no_cons_since"] = now
+    if state["prev_pend"] is not None and msg_pnd_cnt > state["prev_pend"]:
+        state["pend_growth"] = state["pend_growth"] + 1
+    else:
+        state["pend_growth"] = 0
+    state["prev_pend"] = msg_pnd_cnt
+
+    conditions = {
+        "dmq_messages": "_dmq" in name and msg_cur_cnt > settings["watch_dmq_max_msg"],
+        "no_consumers": "_dmq" not in name and state["no_cons_since"] is not None
+                        and now - state["no_cons_since"] > settings["watch_no_consumers_sec"],
+        "pending_growth": state["pend_growth"] >= settings["watch_pend_growth_intervals"]
+    }
+
+    active_cnt = 0
+    for rule in conditions.keys():
+        alert = state["alerts"].setdefault(rule, {"active": False, "clear_cnt": 0})
+        alert_state = ""
+        if conditions[rule]:
+            alert["clear_cnt"] = 0
+            if not alert["active"]:
+                alert["active"] = True
+                alert_state = "RAISED"
+        elif alert["active"]:
+            alert["clear_cnt"] = alert["clear_cnt"] + 1
+            if alert["clear_cnt"] >= settings["watch_clear_intervals"]:
+                alert["active"] = False
+                alert_state = "CLEARED"
+        if alert_state:
+            log("ALERT", "rule=" + rule + " state=" + alert_state + " queue=" + name + " server=" + dest["server"]
+                + " cur_cons=" + str(cons_cur_cnt) + " cur_msg=" + str(msg_cur_cnt) + " pend_msg=" + str(msg_pnd_cnt))
+        if alert["active"]:
+            active_cnt = active_cnt + 1
+    return active_cnt
+
+
+def top_queues(connection_info):
+    """
+    This function lists the N queues with the largest backlog (current + pending messages).
+    Phase 1 reads only messagesCurrentCount and messagesPendingCount of all destinations and keeps the N largest
+    in a heap. Phase 2 reads the details (consumers, high count, oldest message timestamp) of these N only.
+    Automatic usage:
+        wlst manageJmsQueues.py top_queues [env] [N]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    top_n = connection_info["settings"]["top_n"]
+    if is_standalone:
+        if len(sys.argv) > 3:
+            top_n = sys.argv[3]
+    else:
+        top_n_input = raw_input("[INPUT] Enter number of queues to show [" + str(top_n) + "]: ")
+        if top_n_input.strip():
+            top_n = top_n_input
+    try:
+        top_n = int(top_n)
+    except ValueError:
+        log("ERROR", "Number of queues must be an integer.")
+        return
+
+    try:
+        # Phase 1: counters of all destinations, the N largest backlogs are kept in a min-heap
+        destinations = discover_destinations(connection_info, ["MessagesCurrentCount", "MessagesPendingCount"])
+        not_scanned = get_not_scanned(connection_info)
+        heap = PriorityQueue(max(1, top_n), BacklogComparator())
+        for dest in destinations:
+            backlog = dest["MessagesCurrentCount"] + dest["MessagesPendingCount"]
+            if backlog == 0:
+                continue
+            if heap.size() < top_n:
+                heap.add([backlog, dest])
+            elif top_n > 0 and backlog > heap.peek()[0]:
+                heap.poll()
+                heap.add([backlog, dest])
+        top = []
+        while heap.size() > 0:
+            top.insert(0, heap.poll()[1])  # The heap returns the smallest first
+        log("INFO", "Phase 1 completed: " + str(len(destinations)) + " destinations scanned, reading details of "
+            + str(len(top)) + "...")
+
+        # Phase 2: details of the top N destinations only, read in parallel like the other read-only scans
+        tasks = []
+        for dest in top:
+            tasks.append([get_destination_details, (connection_info, dest)])
+        results = run_tasks(tasks, connection_info["settings"]["scan_threads"])
+
+        report = []
+        for i in range(len(top)):
+            dest = top[i]
+            details, error = results[i]
+            if error:
+                log("WARNING", "Failed to read details of " + dest["Name"] + ": " + error)
+                details = {"ConsumersCurrentCount": "-", "MessagesHighCount": "-", "oldest_timestamp": None}
+            report.append([dest["Name"], details["ConsumersCurrentCount"], dest["MessagesCurrentCount"],
+                           dest["MessagesPendingCount"], details["MessagesHighCount"],
+                           format_timestamp(details["oldest_timestamp"])])
+
+        report_title = "REPORT: TOP " + str(top_n) + " QUEUES BY BACKLOG, " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt() \
+                       + get_partial_mark(not_scanned)
+        col_names = ("QUEUE_NAME", "CUR_CONS", "CUR_MSG", "PEND_MSG", "HIGH_MSG", "OLDEST_MSG")
+        create_report(report_title, report, col_names, is_sorted=False, is_total=True)
+        log_not_scanned(not_scanned)
+        log("INFO", "top_queues completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+class BacklogComparator(Comparator):
+    """
+    Orders [backlog, destination] pairs by backlog, so that a PriorityQueue keeps the smallest backlog at its head.
+    """
+    def compare(self, a, b):
+        return cmp(a[0], b[0])
+
+
+def get_destination_details(connection_info, dest):
+    """
+    This function reads the consumers count, the high count and the timestamp of the oldest message of a destination.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type dest: dict. Destination returned by discover_destinations()
+    :rtype: dict. {"ConsumersCurrentCount": count, "MessagesHighCount": count, "oldest_timestamp": ms or None}
+    """
+    connection = get_mbean_connection(connection_info)
+    details = get_attributes(connection, dest["object_name"], ["ConsumersCurrentCount", "MessagesHighCount"])
+    details["oldest_timestamp"] = get_oldest_message_timestamp(get_mbean_proxy(connection_info, dest["object_name"]),
+                                                               connection_info["settings"]["oldest_age_timeout_sec"])
+    return details
+
+
+def get_oldest_message_timestamp(dest, cursor_timeout_sec):
+    """
+    This function returns JMSTimestamp of the message at the head of the destination. Only one message is fetched.
+    :type dest: JMSDestinationRuntimeMBean
+    :type cursor_timeout_sec: int. The cursor is closed by the server when not used for so long
+    :rtype: long. Timestamp in milliseconds, None if the destination is empty
+    """
+    cursor = dest.getMessages("", cursor_timeout_sec)
+    try:
+        if dest.getCursorSize(cursor) == 0:
+            return None
+        messages = dest.getNext(cursor, 1)
+        return JMSMessageInfo(messages[0]).getMessage().getJMSTimestamp()
+    finally:
+        dest.closeCursor(cursor)
+
+
+def find_message(connection_info):
+    """
+    This function searches messages in all destinations of the domain and reports where they are.
+    Input: a JMSMessageID (e.g. ID:<123456.1554286427154.0>), a message selector
+    (e.g. OrderId = '42' or JMSTimestamp > '2019-01-01 00:00') or, otherwise, a JMSCorrelationID.
+    A selector cursor is opened on every non-empty destination, in parallel (scan_threads) with a short cursor timeout
+    (find_cursor_timeout_sec); every cursor is closed. The search stops as soon as the requested count of
+    messages is found.
+    Automatic usage:
+        wlst manageJmsQueues.py find_message [env] [max_hits] [id|selector]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    settings = connection_info["settings"]
+    max_hits = settings["find_max_hits"]
+    if is_standalone:
+        if len(sys.argv) > 4:
+            max_hits = sys.argv[3]
+            search = " ".join(sys.argv[4:])
+        else:
+            log("ERROR", "Incomplete/incorrect list of parameters.")
+            f.close()
+            disconnect_all()
+            exit()
+    else:
+        while True:
+            search = raw_input("[INPUT] Enter JMSMessageID, JMSCorrelationID or message selector: ")
+            if not search.strip():
+                print(cur_dt() + " [ERROR] The search cannot be empty.")
+            else:
+                break
+        max_hits_input = raw_input("[INPUT] Enter max count of messages to find [" + str(max_hits) + "]: ")
+        if max_hits_input.strip():
+            max_hits = max_hits_input
+    try:
+        max_hits = int(max_hits)
+    except ValueError:
+        log("ERROR", "Max count of messages must be an integer.")
+        return
+    msg_filter = get_search_selector(search.strip())
+    log("INFO", "Searching messages matching " + msg_filter)
+
+    try:
+        dests = []
+        for dest in discover_destinations(connection_info, ["MessagesCurrentCount"]):
+            if dest["MessagesCurrentCount"] > 0:
+                dests.append(dest)
+        not_scanned = get_not_scanned(connection_info)
+        log("INFO", "Searching " + str(len(dests)) + " non-empty destinations...")
+
+        hits = []
+        hit_cnt = AtomicInteger(0)  # Shared by the tasks, so that no cursor is opened once enough is found
+        timeout_sec = settings["find_cursor_timeout_sec"]
+        pool = Executors.newFixedThreadPool(max(1, min(settings["scan_threads"], len(dests))))
+        try:
+            searches = []
+            for dest in dests:
+                task = Task(search_destination, (get_mbean_proxy(connection_info, dest["object_name"]), msg_filter,
+                                                 max_hits, hit_cnt, timeout_sec))
+                searches.append([dest, task, pool.submit(task)])
+            deadline = time.time() + settings["scan_budget_sec"]
+            not_searched = []  # [[destination name, reason]]
+            for dest, task, future in searches:
+                if len(hits) >= max_hits:
+                    break
+                messages, error = wait_for_task(future, task, deadline, timeout_sec)
+                if error:
+                    not_searched.append([dest["Name"], error])
+                    continue
+                for wlmsg in messages:
+                    hits.append([dest["Name"], dest["server"], wlmsg.getJMSMessageID(),
+                                 wlmsg.getJMSCorrelationID() or "", format_timestamp(wlmsg.getJMSTimestamp()),
+                                 wlmsg.getJMSType() or "", wlmsg.getPayloadSize(), wlmsg.getJMSRedelivered()])
+        finally:
+            pool.shutdownNow()  # Stops the searches not needed anymore, their cursors are closed in finally
+
+        report_title = "REPORT: FIND MESSAGE " + msg_filter + ", " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt() \
+                       + get_partial_mark(not_scanned + not_searched)
+        col_names = ("QUEUE_NAME", "SERVER", "JMS_MESSAGE_ID", "CORRELATION_ID", "TIMESTAMP", "JMS_TYPE",
+                     "PAYLOAD_SIZE", "REDELIVERED")
+        create_report(report_title, hits[:max_hits], col_names, is_sorted=False, is_total=False)
+        if len(hits) >= max_hits:
+            log("INFO", "The search was stopped after " + str(max_hits) + " messages.")
+        log_not_scanned(not_scanned)
+        log_not_scanned(not_searched, "destination(s)")
+        log("INFO", "find_message completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def get_search_selector(search):
+    """
+    This function returns the message selector of find_message: JMSMessageID = '...' for an ID starting with "ID:",
+    the search itself if it looks like a selector (contains an operator), otherwise JMSCorrelationID = '...'.
+    :type search: str
+    :rtype: str
+    """
+    if search.startswith("ID:"):
+        return "JMSMessageID = '" + search + "'"
+    if re.search("[=<>]|\s(LIKE|IN|IS|BETWEEN)\s", search, re.IGNORECASE):
+        return parse_filter(search)
+    return "JMSCorrelationID = '" + search.replace("'", "''") + "'"
+
+
+def search_destination(dest, msg_filter, max_hits, hit_cnt, cursor_timeout_sec):
+    """
+    This function returns the messages of the destination matching the selector, at most as many as still
+    missing to max_hits. No cursor is opened when enough messages were found by other searches.
+    The cursor is always closed.
+    :type dest: JMSDestinationRuntimeMBean
+    :type msg_filter: str. Message selector
+    :type max_hits: int
+    :type hit_cnt: AtomicInteger. Count of messages found by all searches
+    :type cursor_timeout_sec: int. The cursor is closed by the server when not used for so long
+    :rtype: list. WLMessages (headers and properties, without body)
+    """
+    if hit_cnt.get() >= max_hits:
+        return []
+    cursor = dest.getMessages(msg_filter, cursor_timeout_sec)
+    try:
+        cursor_size = dest.getCursorSize(cursor)
+        if cursor_size == 0:
+            return []
+        # Reserve the hits, so that the searches running in parallel do not fetch more than needed
+        wanted = min(cursor_size, max_hits - hit_cnt.getAndAdd(cursor_size))
+        if wanted <= 0:
+            return []
+        messages = []
+        for item in dest.getNext(cursor, int(wanted)):
+            messages.append(JMSMessageInfo(item).getMessage())
+        return messages
+    finally:
+        dest.closeCursor(cursor)
+
+
+def list_topic_subscribers(connection_info):
+    """
+    This function lists durable subscriptions of all topics with count of current and pending messages
+    and whether the subscriber is active. All JMS servers are searched in one pass.
+    Automatic usage:
+        wlst manageJmsQueues.py list_topic_subscribers [env]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    try:
+        subscribers = discover_subscribers(connection_info)
+        not_scanned = get_not_scanned(connection_info)
+        report = []
+        for sub in subscribers:
+            report.append([sub["topic"], sub["ClientID"], sub["SubscriptionName"], sub["active"],
+                           sub["MessagesCurrentCount"], sub["MessagesPendingCount"], sub["server"]])
+        report_title = "REPORT: LIST OF DURABLE TOPIC SUBSCRIBERS, " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt() \
+                       + get_partial_mark(not_scanned)
+        col_names = ("TOPIC_NAME", "CLIENT_ID", "SUBSCRIPTION", "ACTIVE", "CUR_MSG", "PEND_MSG", "SERVER")
+        create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+        log_not_scanned(not_scanned)
+        log("INFO", "list_topic_subscribers completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def list_consumers(connection_info):
+    """
+    This function lists the consumers of all destinations with the client ID and host of their JMS connection,
+    count of received and pending messages and the receive rate, so that slow or stuck consumers stand out.
+    The connection, session and consumer runtimes of all servers are discovered in one pass and joined by the
+    keys of their ObjectNames (see discover_consumers). The rate is derived from two samples of the received count
+    taken consumer_sample_sec apart. A consumer with pending messages and no receives in between is marked STUCK.
+    Automatic usage:
+        wlst manageJmsQueues.py list_consumers [env] [queue name pattern]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    name_pattern = "*"
+    if is_standalone:
+        if len(sys.argv) > 3:
+            name_pattern = sys.argv[3]
+    else:
+        pattern_input = raw_input("[INPUT] Enter queue name pattern (e.g. WLMsgOrders*) or leave blank for all: ")
+        if pattern_input.strip():
+            name_pattern = pattern_input.strip()
+        print("")
+
+    try:
+        consumers = []
+        for consumer in discover_consumers(connection_info):
+            if fnmatch.fnmatchcase(consumer["destination"], name_pattern):
+                consumers.append(consumer)
+        not_scanned = get_not_scanned(connection_info)
+        if not consumers:
+            log("INFO", "No consumers were found.")
+            log_not_scanned(not_scanned)
+            return
+
+        sample_sec = connection_info["settings"]["consumer_sample_sec"]
+        log("INFO", "Sampling " + str(len(consumers)) + " consumers for " + str(sample_sec) + " seconds...")
+        for consumer in consumers:
+            consumer["received"] = consumer["MessagesReceivedCount"]
+        sampled = time.time()
+        time.sleep(sample_sec)
+        closed_cnt = refresh_counters(connection_info, consumers, ["MessagesReceivedCount", "MessagesPendingCount"])
+        elapsed_sec = time.time() - sampled
+        if closed_cnt > 0:
+            log("INFO", str(closed_cnt) + " consumers were closed while sampling.")
+
+        report = []
+        for consumer in consumers:
+            received_cnt = consumer["MessagesReceivedCount"] - consumer["received"]
+            if not consumer["Active"]:
+                status = "INACTIVE"
+            elif consumer["MessagesPendingCount"] > 0 and received_cnt == 0:
+                status = "STUCK"
+            else:
+                status = "OK"
+            report.append([consumer["destination"], consumer["client_id"], consumer["host"], consumer["server"],
+                           consumer["MessagesReceivedCount"], consumer["MessagesPendingCount"],
+                           get_rate(received_cnt, elapsed_sec), status])
+        report_title = "REPORT: LIST OF CONSUMERS, " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt() \
+                       + get_partial_mark(not_scanned)
+        col_names = ("QUEUE_NAME", "CLIENT_ID", "HOST", "SERVER", "RECV_MSG", "PEND_MSG", "RECV_PER_SEC", "STATUS")
+        create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+        log_not_scanned(not_scanned)
+        log("INFO", "list_consumers completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def discover_consumers(connection_info):
+    """
+    This function discovers the JMS connection, session and consumer runtimes of the domain in one pass
+    and joins each consumer to its session (JMSSessionRuntime key) and the session to its connection
+    (JMSConnectionRuntime key). The names are unique per server only, so the server is part of the join keys.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: list. A list of dicts with the consumer attributes plus destination (short name), client_id and host
+        of the connection ("-" if not known)
+    """
+    mbeans = discover_runtime_mbean_types(connection_info,
+                                          [["JMSConnectionRuntime", ["ClientID", "HostAddress"]],
+                                           ["JMSSessionRuntime", []],
+                                           ["JMSConsumerRuntime", ["DestinationName", "Active",
+                                                                   "MessagesReceivedCount", "MessagesPendingCount"]]],
+                                          "JMS consumers")
+    connections = {}
+    for jms_connection in mbeans["JMSConnectionRuntime"]:
+        connections[jms_connection["server"] + "/" + jms_connection["Name"]] = jms_connection
+    session_connections = {}
+    for session in mbeans["JMSSessionRuntime"]:
+        connection_name = session["object_name"].getKeyProperty("JMSConnectionRuntime")
+        session_connections[session["server"] + "/" + session["Name"]] = \
+            connections.get(session["server"] + "/" + str(connection_name))
+
+    consumers = mbeans["JMSConsumerRuntime"]
+    for consumer in consumers:
+        session_name = consumer["object_name"].getKeyProperty("JMSSessionRuntime")
+        jms_connection = session_connections.get(consumer["server"] + "/" + str(session_name))
+        consumer["client_id"] = "-"
+        consumer["host"] = "-"
+        if jms_connection:
+            if jms_connection["ClientID"]:
+                consumer["client_id"] = jms_connection["ClientID"]
+            if jms_connection["HostAddress"]:
+                consumer["host"] = jms_connection["HostAddress"]
+        if consumer["DestinationName"]:
+            consumer["destination"] = get_queue_name(consumer["DestinationName"])
+        else:
+            consumer["destination"] = "-"
+    return consumers
+
+
+def purge_subscriber(connection_info):
+    """
+    This function deletes messages of a durable subscription, or moves them to a queue if a target queue is given.
+    Subscription is matched by its subscription name, client ID or full name; "*" matches all subscriptions of the topic.
+    Optionally, use filter to select a set of messages.
+    Automatic usage:
+        wlst manageJmsQueues.py purge_subscriber [env] [topic_name] [subscription] [target_queue or -] [filter]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    if is_standalone:
+        if len(sys.argv) > 5:
+            topic_name = sys.argv[3]
+            sub_name = sys.argv[4]
+            q_trg_name = sys.argv[5]
+        else:
+            log("ERROR", "Incomplete/incorrect list of parameters.")
+            f.close()
+            disconnect_all()
+            exit()
+        if len(sys.argv) > 6:
+            msg_filter = parse_filter(" ".join(sys.argv[6:]))
+        else:
+            msg_filter = ""
+    else:
+        while True:
+            topic_name = raw_input("[INPUT] Enter topic name: ")
+            if not topic_name:
+                print(cur_dt() + " [ERROR] Topic name cannot be empty. Please, enter a valid name")
+            else:
+                break
+        sub_name = raw_input("[INPUT] Enter subscription name or client ID (* - all subscriptions) [*]: ")
+        q_trg_name = raw_input("[INPUT] Enter name of the queue to move messages to or leave blank to delete them: ")
+        msg_filter = raw_input("[INPUT] Enter message filter (e.g. JMSTimestamp > \'2019-01-01 00:00:00.000\') or leave blank: ")
+        msg_filter = parse_filter(msg_filter.strip())
+    topic_name = topic_name.strip()
+    sub_name = sub_name.strip()
+    if not sub_name:
+        sub_name = "*"
+    q_trg_name = q_trg_name.strip()
+    if q_trg_name == "-":
+        q_trg_name = ""
+    if msg_filter:
+        log("INFO", "The following message filter will be applied:  " + msg_filter)
+    else:
+        log("INFO", "No filters will be applied")
+
+    try:
+        members = []
+        for sub in discover_subscribers(connection_info):
+            if sub["topic"] != topic_name:
+                continue
+            if sub_name != "*" and sub_name not in (sub["SubscriptionName"], sub["ClientID"], sub["Name"]):
+                continue
+            members.append(sub)
+        if not members:
+            log("ERROR", "No durable subscriptions of topic '" + topic_name + "' matching '" + sub_name
+                + "' were found.")
+            return
+
+        # Find the target queue candidates, the one on the JMS server of each subscription is used
+        q_trg_list = []
+        if q_trg_name:
+            for dest in discover_destinations(connection_info, []):
+                if get_queue_name(dest["Name"]) == q_trg_name:
+                    q_trg_list.append(dest)
+            if not q_trg_list:
+                log("ERROR", "Target queue was not found")
+                return
+
+        msg_total = 0
+        for sub in members:
+            sub["proxy"] = get_mbean_proxy(connection_info, sub["object_name"])
+            sub["msg_cnt"] = count_messages(sub["proxy"], msg_filter)
+            msg_total = msg_total + sub["msg_cnt"]
+            log("INFO", "Subscription: " + sub["Name"] + ", Active: " + sub["active"] + ", Current messages: "
+                + str(sub["MessagesCurrentCount"]) + ", Messages to purge: " + str(sub["msg_cnt"]))
+        if msg_total == 0:
+            log("INFO", "There are no messages to purge.")
+            return
+
+        if q_trg_name:
+            action = "move " + str(msg_total) + " messages to '" + q_trg_name + "'"
+        else:
+            action = "delete " + str(msg_total) + " messages"
+        if not is_standalone:
+            purge_choice = raw_input("[INPUT] Do you want to " + action + ", Y/N [Y]? ")
+        else:
+            purge_choice = "Y"
+        print("")
+        if not (purge_choice.upper() == "Y" or purge_choice.strip() == ""):
+            log("WARNING", "Operation canceled by the user.")
+            return
+
+        tasks = []
+        report = []
+        for sub in members:
+            if sub["msg_cnt"] == 0:
+                continue
+            if q_trg_name:
+                # moveMessages cannot move messages across JMS servers
+                q_trg = None
+                for dest in q_trg_list:
+                    if dest["jms_server"] == sub["jms_server"]:
+                        q_trg = dest
+                if q_trg is None:
+                    status = "Target not found on JMS server " + str(sub["jms_server"])
+                    log("ERROR", "Failed to purge subscription '" + sub["Name"] + "': " + status)
+                    report.append([sub["server"], sub["topic"], sub["Name"], sub["msg_cnt"], 0, status])
+                    continue
+                q_trg_bean = get_mbean_proxy(connection_info, q_trg["object_name"])
+                tasks.append([sub, move_member_messages, (sub["proxy"], q_trg_bean, msg_filter)])
+            else:
+                tasks.append([sub, delete_member_messages, (sub["proxy"], msg_filter)])
+        results = run_tasks([t[1:] for t in tasks], connection_info["settings"]["parallel_threads"])
+
+        for i in range(len(tasks)):
+            sub = tasks[i][0]
+            msg_purged_cnt, error = results[i]
+            if error:
+                log("ERROR", "Failed to purge subscription '" + sub["Name"] + "': " + error)
+                msg_purged_cnt = 0
+                status = "Failed"
+            elif msg_purged_cnt == sub["msg_cnt"]:
+                status = "Purged"
+            else:
+                log("WARNING", "Purged " + str(msg_purged_cnt) + " out of " + str(sub["msg_cnt"])
+                    + " messages of '" + sub["Name"] + "'. Repeat the procedure.")
+                status = "Incomplete"
+            report.append([sub["server"], sub["topic"], sub["Name"], sub["msg_cnt"], msg_purged_cnt, status])
+
+        report_title = "REPORT: PURGE SUBSCRIBER, " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
+        col_names = ("SERVER", "TOPIC_NAME", "SUBSCRIPTION", "MSG_TO_PURGE", "MSG_PURGED", "STATUS")
+        create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+        log("INFO", "purge_subscriber completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def discover_subscribers(connection_info):
+    """
+    This function discovers all durable subscriber runtimes of the domain, together with the topic destination
+    runtimes, with one query per server and type. A subscriber ObjectName has no JMSServerRuntime key, therefore
+    its JMS server is taken from its topic, i.e. the destination named by its JMSDestinationRuntime key.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: list. A list of dicts with the subscriber attributes plus topic (short name), jms_server and active (Y/N)
+    """
+    mbeans = discover_runtime_mbean_types(connection_info,
+                                          [["JMSDurableSubscriberRuntime",
+                                            ["ClientID", "SubscriptionName", "Active", "MessagesCurrentCount",
+                                             "MessagesPendingCount"]],
+                                           ["JMSDestinationRuntime", []]], "durable subscribers")
+    jms_servers = {}  # {"server/destination runtime name": JMS server}
+    for dest in mbeans["JMSDestinationRuntime"]:
+        jms_servers[dest["server"] + "/" + dest["Name"]] = dest["jms_server"]
+    subscribers = mbeans["JMSDurableSubscriberRuntime"]
+    for sub in subscribers:
+        topic = sub["object_name"].getKeyProperty("JMSDestinationRuntime")
+        if topic:
+            sub["topic"] = get_queue_name(topic)
+            sub["jms_server"] = jms_servers.get(sub["server"] + "/" + topic)
+        else:
+            sub["topic"] = "-"
+        if sub["Active"]:
+            sub["active"] = "Y"
+        else:
+            sub["active"] = "N"
+    return subscribers
+
+
+def find_duplicates(connection_info):
+    """
+    This function finds messages with duplicate payloads on a given queue and optionally deletes all but the oldest
+    copy of each group. Messages are streamed page by page without keeping their bodies: per distinct payload
+    only the full SHA-256 digest with its count and oldest copy is kept in memory. The digest covers the message
+    type and the body of TextMessage/ObjectMessage plus the properties listed in the setting dedup_properties.
+    Other message types are skipped. If the duplicates are to be deleted, the queue is streamed a second time and
+    every message of a duplicate group other than its oldest copy is deleted by JMSMessageID in batches of
+    dedup_batch_size, so the IDs of the duplicates are never all held in memory. Copies arrived after the first
+    pass are deleted as well.
+    Automatic usage:
+        wlst manageJmsQueues.py find_duplicates [env] [queue_name] [delete: Y/N] [filter]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    settings = connection_info["settings"]
+    if is_standalone:
+        if len(sys.argv) > 4:
+            queue_name = sys.argv[3]
+            del_choice = sys.argv[4]
+        else:
+            log("ERROR", "Incomplete/incorrect list of parameters.")
+            f.close()
+            disconnect_all()
+            exit()
+        if len(sys.argv) > 5:
+            msg_filter = parse_filter(" ".join(sys.argv[5:]))
+        else:
+            msg_filter = ""
+    else:
+        while True:
+            queue_name = raw_input("[INPUT] Enter queue name (e.g. WLMsgQueueName_dmq): ")
+            if not queue_name:
+                print(cur_dt() + " [ERROR] Queue name cannot be empty. Please, enter a valid name")
+            else:
+                break
+        msg_filter = raw_input("[INPUT] Enter message filter (e.g. JMSTimestamp > \'2019-01-01 00:00:00.000\') or leave blank: ")
+        msg_filter = parse_filter(msg_filter.strip())
+        del_choice = ""
+    queue_name = queue_name.strip()
+    if msg_filter:
+        log("INFO", "The following message filter will be applied:  " + msg_filter)
+    prop_names = []
+    for prop_name in settings["dedup_properties"].split(","):
+        if prop_name.strip():
+            prop_names.append(prop_name.strip())
+
+    try:
+        members = find_destinations(connection_info, queue_name, ["MessagesCurrentCount"])
+        if not members:
+            log("ERROR", "The queue was not found.")
+            return
+
+        groups = {}  # {digest: [count, oldest JMSTimestamp, oldest JMSMessageID]}
+        scan = {"scanned": 0, "skipped": 0}
+        for member in members:
+            dest = get_mbean_proxy(connection_info, member["object_name"])
+            log("INFO", "Scanning " + str(member["MessagesCurrentCount"]) + " messages of '" + dest.name + "'...")
+
+            def handle_message(wlmsg):
+                scan["scanned"] = scan["scanned"] + 1
+                if scan["scanned"] % 10000 == 0:
+                    log("INFO", "Scanned " + str(scan["scanned"]) + " messages, " + str(len(groups))
+                        + " distinct payloads...")
+                digest = get_message_digest(wlmsg, prop_names)
+                if digest is None:
+                    scan["skipped"] = scan["skipped"] + 1
+                    return
+                msg_id = wlmsg.getJMSMessageID()
+                msg_ts = wlmsg.getJMSTimestamp()
+                if digest not in groups:
+                    groups[digest] = [1, msg_ts, msg_id]
+                    return
+                group = groups[digest]
+                group[0] = group[0] + 1
+                if msg_ts < group[1]:
+                    group[1:] = [msg_ts, msg_id]
+
+            stream_messages(dest, msg_filter, handle_message, settings["page_size"], True)
+
+        report = []
+        oldest_ids = {}  # {digest: oldest JMSMessageID} of the groups with duplicates
+        dup_total = 0
+        for digest in groups.keys():
+            group = groups[digest]
+            if group[0] > 1:
+                report.append([group[2], format_timestamp(group[1]), group[0], group[0] - 1])
+                oldest_ids[digest] = group[2]
+                dup_total = dup_total + group[0] - 1
+        groups = None  # Release the digests of the distinct payloads
+        report.sort(lambda a, b: cmp(b[2], a[2]))
+        log("INFO", "Scanned " + str(scan["scanned"]) + " messages: " + str(len(report)) + " duplicate groups, "
+            + str(dup_total) + " duplicates, " + str(scan["skipped"]) + " messages skipped (not text/object).")
+        if len(report) > settings["dedup_max_groups"]:
+            log("INFO", "Only the " + str(settings["dedup_max_groups"]) + " largest groups are shown.")
+            report = report[:settings["dedup_max_groups"]]
+        report_title = "REPORT: DUPLICATE MESSAGES ON " + queue_name + ", " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
+        col_names = ("OLDEST_JMS_MESSAGE_ID", "OLDEST_TIMESTAMP", "COPIES", "DUPLICATES")
+        create_report(report_title, report, col_names, is_sorted=False, is_total=True)
+        report = None
+
+        if dup_total == 0:
+            log("INFO", "There are no duplicates to delete.")
+        else:
+            if not is_standalone:
+                del_choice = raw_input("[INPUT] Do you want to delete " + str(dup_total)
+                                       + " duplicates (the oldest copy is kept), Y/N [N]? ")
+            if del_choice.strip().upper() == "Y":
+                deleted = {"total": 0}
+                batch_size = settings["dedup_batch_size"]
+                for member in members:
+                    dest = get_mbean_proxy(connection_info, member["object_name"])
+                    batch = []  # JMSMessageIDs of the duplicates to delete in one selector
+                    log("INFO", "Deleting duplicates from '" + dest.name + "'...")
+
+                    def delete_duplicate(wlmsg, dest=dest, batch=batch):
+                        msg_id = wlmsg.getJMSMessageID()
+                        oldest_id = oldest_ids.get(get_message_digest(wlmsg, prop_names))
+                        if oldest_id is None or oldest_id == msg_id:
+                            return
+                        batch.append(msg_id)
+                        if len(batch) >= batch_size:
+                            deleted["total"] = deleted["total"] + dest.deleteMessages(get_message_id_selector(batch))
+                            del batch[:]
+
+                    stream_messages(dest, msg_filter, delete_duplicate, settings["page_size"], True)
+                    if batch:
+                        deleted["total"] = deleted["total"] + dest.deleteMessages(get_message_id_selector(batch))
+                    log("INFO", "Deleted duplicates from '" + dest.name + "', " + str(deleted["total"])
+                        + " out of " + str(dup_total) + " in total.")
+                deleted_total = deleted["total"]
+                invalidate_snapshot(connection_info)
+                if deleted_total == dup_total:
+                    log("INFO", "Successfully deleted " + str(deleted_total) + " duplicates.")
+                else:
+                    log("WARNING", "Deleted " + str(deleted_total) + " out of " + str(dup_total)
+                        + " duplicates. Some of them might have been consumed or arrived meanwhile.")
+            else:
+                log("INFO", "Duplicates were not deleted.")
+        log("INFO", "find_duplicates completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def get_message_digest(wlmsg, prop_names):
+    """
+    This function returns the digest (full SHA-256 as a long) of the message type, the message body and the given
+    message properties. The full digest is kept, since duplicates are deleted on its basis.
+    :type wlmsg: WLMessage
+    :type prop_names: list. Names of the message properties to include
+    :rtype: long. None if the message is neither TextMessage nor ObjectMessage or its body or properties
+        cannot be read
+    """
+    md = MessageDigest.getInstance("SHA-256")
+    try:
+        if isinstance(wlmsg, TextMessage):
+            text = wlmsg.getText()
+            if text is None:
+                text = ""
+            md.update(String("TextMessage\n").getBytes("UTF-8"))
+            md.update(String(text).getBytes("UTF-8"))
+        elif isinstance(wlmsg, ObjectMessage):
+            md.update(String("ObjectMessage\n").getBytes("UTF-8"))
+            bytes_out = ByteArrayOutputStream()
+            obj_out = ObjectOutputStream(bytes_out)
+            obj_out.writeObject(wlmsg.getObject())
+            obj_out.close()
+            md.update(bytes_out.toByteArray())
+        else:
+            return None
+        for prop_name in prop_names:
+            md.update(String("\n" + prop_name + "=" + unicode(wlmsg.getObjectProperty(prop_name))).getBytes("UTF-8"))
+    except:
+        return None  # E.g. the class of the object is not available to WLST
+    digest = 0L
+    for byte in md.digest():
+        digest = (digest << 8) | (byte & 0xFF)
+    return digest
+
+
+def reconcile(connection_info):
+    """
+    This function reconciles the messages of two queues, e.g. after a move, a migration or a restore, possibly in
+    another environment: which messages of the source are missing on the target, which are extra on the target
+    and which arrived more than once. The messages are matched by JMSMessageID, JMSCorrelationID or a message
+    property (business key), e.g. JMSCorrelationID after migrate_messages, which assigns new JMSMessageIDs.
+    Pass 1 streams the keys of both queues and keeps only a compact digest (8 bytes) per message in a long array,
+    which is sorted and merged (see collect_key_digests and merge_key_digests). Pass 2 is run only if there are
+    differences: it streams both queues again to resolve the keys and JMSMessageIDs of at most reconcile_max_rows
+    of the differing digests for the report.
+    Automatic usage:
+        wlst manageJmsQueues.py reconcile [env] [Qsrc] [target_env] [Qtrg] [key] [filter]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    settings = connection_info["settings"]
+    key_name = "JMSMessageID"
+    if is_standalone:
+        if len(sys.argv) > 5:
+            q_src_name = sys.argv[3]
+            trg_env = sys.argv[4]
+            q_trg_name = sys.argv[5]
+        else:
+            log("ERROR", "Incomplete/incorrect list of parameters.")
+            f.close()
+            disconnect_all()
+            exit()
+        if len(sys.argv) > 6:
+            key_name = sys.argv[6]
+        msg_filter = parse_filter(" ".join(sys.argv[7:]))
+    else:
+        while True:
+            q_src_name = raw_input("[INPUT] Enter name of the source queue: ")
+            if not q_src_name:
+                print(cur_dt() + " [ERROR] Queue name cannot be empty. Please, enter a valid queue name.")
+            else:
+                break
+        print("Available target environments: " + ", ".join(prop_env_file.keys()))
+        while True:
+            trg_env = raw_input("[INPUT] Enter the target environment [" + connection_info["env"] + "]: ").strip()
+            if not trg_env:
+                trg_env = connection_info["env"]
+            if trg_env in prop_env_file or trg_env == connection_info["env"]:
+                break
+            print(cur_dt() + " [WARNING] The provided environment name is not found in the list. Try again.")
+        while True:
+            q_trg_name = raw_input("[INPUT] Enter name of the target queue: ")
+            if not q_trg_name:
+                print(cur_dt() + " [ERROR] Queue name cannot be empty. Please, enter a valid queue name.")
+            else:
+                break
+        key_input = raw_input("[INPUT] Enter the key: JMSMessageID, JMSCorrelationID or a property name ["
+                              + key_name + "]: ")
+        if key_input.strip():
+            key_name = key_input.strip()
+        msg_filter = raw_input("[INPUT] Enter message filter (e.g. JMSTimestamp > \'2019-01-01 00:00:00.000\') or leave blank: ")
+        msg_filter = parse_filter(msg_filter.strip())
+        print("")
+    q_src_name = q_src_name.strip()
+    q_trg_name = q_trg_name.strip()
+    log("INFO", "Source queue: " + q_src_name + " (" + connection_info["env"] + "), target queue: " + q_trg_name
+        + " (" + trg_env + "), key: " + key_name)
+    if msg_filter:
+        log("INFO", "The following message filter will be applied:  " + msg_filter)
+
+    try:
+        if trg_env == connection_info["env"]:
+            trg_info = connection_info
+        else:
+            trg_info = read_connection_info(trg_env)
+        sides = []
+        for side_info, queue_name in ((connection_info, q_src_name), (trg_info, q_trg_name)):
+            members = find_destinations(side_info, queue_name, ["MessagesCurrentCount"])
+            if not members:
+                log("ERROR", "Queue " + queue_name + " was not found in " + side_info["env"] + ".")
+                return
+            dests = []
+            for member in members:
+                dests.append(get_mbean_proxy(side_info, member["object_name"]))
+            sides.append(dests)
+
+        # Pass 1: sorted digests of the keys of both queues
+        digests = []
+        no_key_cnt = 0
+        for dests in sides:
+            side_digests, size, side_no_key_cnt = collect_key_digests(dests, msg_filter, key_name, settings)
+            digests.append([side_digests, size])
+            no_key_cnt = no_key_cnt + side_no_key_cnt
+        if no_key_cnt > 0:
+            log("WARNING", str(no_key_cnt) + " messages without " + key_name + " were skipped.")
+        totals, diffs = merge_key_digests(digests[0], digests[1], settings["reconcile_max_rows"])
+        digests = None  # Release the digests before pass 2
+        log("INFO", "Source: " + str(totals["source"]) + " messages, target: " + str(totals["target"])
+            + " messages, missing: " + str(totals["missing"]) + ", extra: " + str(totals["extra"])
+            + ", duplicated: " + str(totals["duplicated"]) + ".")
+
+        # Pass 2: keys and JMSMessageIDs of the differences
+        report = []
+        if diffs:
+            log("INFO", "Resolving " + str(len(diffs)) + " differences...")
+            for side in range(2):
+                resolve_key_digests(sides[side], msg_filter, key_name, diffs, side, settings)
+            for digest in diffs.keys():
+                diff = diffs[digest]
+                report.append([str(diff["key"]), diff["status"], diff["counts"][0], diff["counts"][1],
+                               str(diff["msg_ids"][0]), str(diff["msg_ids"][1])])
+            report.sort(lambda a, b: cmp(a[1], b[1]) or cmp(a[0], b[0]))
+            if totals["missing"] + totals["extra"] + totals["duplicated"] > len(report):
+                log("INFO", "Only the first " + str(len(report)) + " differences are shown (reconcile_max_rows).")
+        report_title = "REPORT: RECONCILE " + q_src_name + " (" + connection_info["env"] + ") WITH " + q_trg_name + \
+                       " (" + trg_env + ") BY " + key_name + ", " + cur_dt() + \
+                       get_partial_mark(get_not_scanned(connection_info) + get_not_scanned(trg_info))
+        col_names = ("KEY", "STATUS", "SRC_COUNT", "TRG_COUNT", "SRC_JMS_MESSAGE_ID", "TRG_JMS_MESSAGE_ID")
+        create_report(report_title, report, col_names, is_sorted=False, is_total=False)
+        if not diffs:
+            log("INFO", "Every message of the source is on the target exactly once.")
+        log("INFO", "reconcile completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def collect_key_digests(dests, msg_filter, key_name, settings):
+    """
+    This function streams the messages of the destinations (e.g. the members of a distributed queue) and returns
+    the digests of their keys (see get_key_digest) sorted in a long array, 8 bytes per message.
+    :type dests: list. JMSDestinationRuntimeMBeans
+    :type msg_filter: str. Message selector, "" for all messages
+    :type key_name: str. JMSMessageID, JMSCorrelationID or a message property name
+    :type settings: dict
+    :rtype: list. [sorted long array (only the first size elements are used), size, count of messages without key]
+    """
+    state = {"digests": jarray.zeros(1024, "l"), "size": 0, "no_key": 0}
+
+    def add_digest(wlmsg):
+        key = get_message_key(wlmsg, key_name)
+        if key is None:
+            state["no_key"] = state["no_key"] + 1
+            return
+        if state["size"] >= settings["reconcile_max_messages"]:
+            raise ValueError("More than " + str(settings["reconcile_max_messages"]) + " messages to reconcile "
+                             + "(reconcile_max_messages). Use a filter to reconcile them in parts.")
+        if state["size"] == len(state["digests"]):
+            state["digests"] = Arrays.copyOf(state["digests"], min(2 * state["size"],
+                                                                   settings["reconcile_max_messages"]))
+        state["digests"][state["size"]] = get_key_digest(key)
+        state["size"] = state["size"] + 1
+        if state["size"] % 100000 == 0:
+            log("INFO", "Read " + str(state["size"]) + " keys...")
+
+    for dest in dests:
+        log("INFO", "Reading keys of '" + dest.name + "'...")
+        stream_messages(dest, msg_filter, add_digest, settings["page_size"], False)
+    Arrays.sort(state["digests"], 0, state["size"])
+    return [state["digests"], state["size"], state["no_key"]]
+
+
+def merge_key_digests(source, target, max_diffs):
+    """
+    This function merges the sorted key digests of the source and the target and counts the keys missing on
+    the target, extra on the target and duplicated on the target (more copies than on the source).
+    :type source: list. [sorted long array, size] as returned by collect_key_digests()
+    :type target: list. [sorted long array, size] as returned by collect_key_digests()
+    :type max_diffs: int. Max count of differences returned
+    :rtype: list. [{"source": count, "target": count, "missing": count, "extra": count, "duplicated": count},
+        {digest: {"status": Missing|Extra|Duplicated, "counts": [source, target], "key": None,
+        "msg_ids": [None, None]}}]
+    """
+    src_digests, src_size = source
+    trg_digests, trg_size = target
+    totals = {"source": src_size, "target": trg_size, "missing": 0, "extra": 0, "duplicated": 0}
+    diffs = {}
+    i = 0
+    j = 0
+    while i < src_size or j < trg_size:
+        if j >= trg_size or (i < src_size and src_digests[i] <= trg_digests[j]):
+            digest = src_digests[i]
+        else:
+            digest = trg_digests[j]
+        src_cnt = 0
+        while i < src_size and src_digests[i] == digest:
+            src_cnt = src_cnt + 1
+            i = i + 1
+        trg_cnt = 0
+        while j < trg_size and trg_digests[j] == digest:
+            trg_cnt = trg_cnt + 1
+            j = j + 1
+        if src_cnt == trg_cnt:
+            continue
+        if trg_cnt < src_cnt:
+            status = "Missing"
+            totals["missing"] = totals["missing"] + src_cnt - trg_cnt
+        elif src_cnt == 0:
+            status = "Extra"
+            totals["extra"] = totals["extra"] + trg_cnt
+        else:
+            status = "Duplicated"
+            totals["duplicated"] = totals["duplicated"] + trg_cnt - src_cnt
+        if len(diffs) < max_diffs:
+            diffs[digest] = {"status": status, "counts": [src_cnt, trg_cnt], "key": None, "msg_ids": [None, None]}
+    return [totals, diffs]
+
+
+def resolve_key_digests(dests, msg_filter, key_name, diffs, side, settings):
+    """
+    This function streams the messages of the destinations again and records the key and the first JMSMessageID
+    of the given side of each difference. Streaming stops as soon as all differences of the side are resolved.
+    :type dests: list. JMSDestinationRuntimeMBeans
+    :type msg_filter: str. Message selector, "" for all messages
+    :type key_name: str. JMSMessageID, JMSCorrelationID or a message property name
+    :type diffs: dict. Differences as returned by merge_key_digests(), updated in place
+    :type side: int. 0 - source, 1 - target
+    :type settings: dict
+    """
+    state = {"unresolved": 0}
+    for diff in diffs.values():
+        if diff["counts"][side] > 0:
+            state["unresolved"] = state["unresolved"] + 1
+
+    def resolve_digest(wlmsg):
+        key = get_message_key(wlmsg, key_name)
+        if key is None:
+            return False
+        diff = diffs.get(get_key_digest(key))
+        if diff is not None and diff["msg_ids"][side] is None:
+            diff["key"] = key
+            diff["msg_ids"][side] = wlmsg.getJMSMessageID()
+            state["unresolved"] = state["unresolved"] - 1
+        return state["unresolved"] == 0
+
+    for dest in dests:
+        if state["unresolved"] == 0:
+            break
+        stream_messages(dest, msg_filter, resolve_digest, settings["page_size"], False)
+
+
+def get_message_key(wlmsg, key_name):
+    """
+    This function returns the reconciliation key of the message.
+    :type wlmsg: WLMessage
+    :type key_name: str. JMSMessageID, JMSCorrelationID or a message property name
+    :rtype: str. None if the message has no such key
+    """
+    if key_name == "JMSMessageID":
+        return wlmsg.getJMSMessageID()
+    elif key_name == "JMSCorrelationID":
+        return wlmsg.getJMSCorrelationID()
+    value = wlmsg.getObjectProperty(key_name)
+    if value is None:
+        return None
+    return str(value)
+
+
+def get_key_digest(key):
+    """
+    This function returns a compact digest (the first 8 bytes of MD5 as a long) of a message key.
+    Probability of a collision is negligible up to many millions of messages.
+    :type key: str
+    :rtype: long
+    """
+    md = MessageDigest.getInstance("MD5")
+    md.update(String(key).getBytes("UTF-8"))
+    return ByteBuffer.wrap(md.digest()).getLong()
+
+
+def get_message_id_selector(msg_ids):
+    """
+    This function returns a message selector matching the given JMSMessageIDs,
+    e.g. "JMSMessageID IN ('ID:<1.1>', 'ID:<1.2>')"
+    :type msg_ids: list
+    :rtype: str
+    """
+    return "JMSMessageID IN ('" + "', '".join(msg_ids) + "')"
+
+
+def stream_messages(dest, msg_filter, handler, page_size, is_body):
+    """
+    This function passes the messages of the destination matching the filter to handler(wlmsg) page by page,
+    so that only one page is kept in memory. Streaming stops when the handler returns a true value.
+    The cursor is always closed.
+    :type dest: JMSDestinationRuntimeMBean (or another JMS message management runtime MBean)
+    :type msg_filter: str. Message selector, "" for all messages
+    :type handler: function. Called with the WLMessage of each message
+    :type page_size: int. Count of messages fetched in one round trip
+    :type is_body: bool. If True, the body of every message is fetched as well (one round trip per message)
+    :rtype: int. Count of the streamed messages
+    """
+    cursor = dest.getMessages(msg_filter, 600)
+    streamed = 0
+    try:
+        cursor_size = dest.getCursorSize(cursor)
+        while streamed < cursor_size:
+            page = dest.getNext(cursor, page_size)
+            if not page:
+                break
+            for item in page:
+                msg_info = JMSMessageInfo(item)
+                if is_body:
+                    msg_info = JMSMessageInfo(dest.getMessage(cursor, msg_info.getHandle()))
+                streamed = streamed + 1
+                if handler(msg_info.getMessage()):
+                    return streamed
+    finally:
+        dest.closeCursor(cursor)
+    return streamed
+
+
+def list_jms_servers(connection_info):
+    """
+    This function lists JMS servers with their utilisation: bytes current/high, messages paged out, whether
+    the bytes/messages thresholds have been reached, the persistent store with its object count and allocated
+    I/O and window buffer bytes (the runtime does not expose the size of the store), as well as count of destinations
+    and their current/pending messages rolled up per JMS server.
+    The store of a JMS server is read from its configuration (PersistentStore). A JMS server without one uses the
+    default store of its server, i.e. the store runtime of that server named _WLS_*.
+    JMS servers, persistent stores and destinations are read in one pass over the servers.
+    The destinations also refresh the session snapshot used by the list reports (see cache_snapshot).
+    Automatic usage:
+        wlst manageJmsQueues.py list_jms_servers [env]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    try:
+        created = time.time()
+        mbeans = discover_runtime_mbean_types(connection_info, [
+            ["JMSServerRuntime", ["BytesCurrentCount", "BytesHighCount", "MessagesPagedOutTotalCount",
+                                  "BytesThresholdTime", "MessagesThresholdTime"]],
+            ["PersistentStoreRuntime", ["ObjectCount", "AllocatedIoBufferBytes", "AllocatedWindowBufferBytes"]],
+            ["JMSDestinationRuntime", SNAPSHOT_ATTRIBUTES]], "JMS servers, stores and queues")
+        not_scanned = get_not_scanned(connection_info)
+        cache_snapshot(connection_info, created, mbeans["JMSDestinationRuntime"])
+
+        # Roll up destination totals per JMS server
+        dest_totals = {}  # {"server/jms_server": [destinations count, current messages, pending messages]}
+        for dest in mbeans["JMSDestinationRuntime"]:
+            totals = dest_totals.setdefault(dest["server"] + "/" + str(dest["jms_server"]), [0, 0, 0])
+            totals[0] = totals[0] + 1
+            totals[1] = totals[1] + dest["MessagesCurrentCount"]
+            totals[2] = totals[2] + dest["MessagesPendingCount"]
+
+        stores = {}  # {"server/store name": store runtime}
+        default_stores = {}  # {"server": store runtime of the default store}
+        for store in mbeans["PersistentStoreRuntime"]:
+            stores[store["server"] + "/" + store["Name"].split("@")[0]] = store
+            if store["Name"].startswith("_WLS_"):
+                default_stores[store["server"]] = store
+        jms_server_stores = get_jms_server_stores(connection_info)
+
+        report = []
+        for jms_server in mbeans["JMSServerRuntime"]:
+            totals = dest_totals.get(jms_server["server"] + "/" + jms_server["Name"], [0, 0, 0])
+            store_name = jms_server_stores.get(jms_server["Name"].split("@")[0])
+            if store_name:
+                store = stores.get(jms_server["server"] + "/" + store_name)
+            else:
+                store = default_stores.get(jms_server["server"])
+                if store:
+                    store_name = store["Name"]
+                else:
+                    store_name = "(default)"
+            if store:
+                store_objects = store.get("ObjectCount", "-")
+                store_bytes = store.get("AllocatedIoBufferBytes", 0) + store.get("AllocatedWindowBufferBytes", 0)
+            else:
+                store_objects = "-"
+                store_bytes = "-"
+            if jms_server["BytesThresholdTime"] > 0 or jms_server["MessagesThresholdTime"] > 0:
+                threshold = "Y"
+            else:
+                threshold = "N"
+            report.append([jms_server["server"], jms_server["Name"], totals[0], totals[1], totals[2],
+                           jms_server["BytesCurrentCount"], jms_server["BytesHighCount"],
+                           jms_server["MessagesPagedOutTotalCount"], threshold, store_name, store_objects, store_bytes])
+
+        report_title = "REPORT: LIST OF JMS SERVERS, " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt() \
+                       + get_partial_mark(not_scanned)
+        col_names = ("SERVER", "JMS_SERVER", "DESTS", "CUR_MSG", "PEND_MSG", "BYTES_CUR", "BYTES_HIGH",
+                     "PAGED_OUT_MSG", "THRESHOLD", "STORE", "STORE_OBJECTS", "STORE_BUFFER_BYTES")
+        create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+        log_not_scanned(not_scanned)
+        log("INFO", "list_jms_servers completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def list_inventory(connection_info):
+    """
+    This function lists the JMS module configuration: queues, uniform distributed queues, topics, uniform distributed
+    topics and foreign destinations with their JNDI name, subdeployment, error destination, redelivery limit and quota.
+    The configuration is read from the read-only domain configuration (no edit session) and cached for the session
+    (see get_jms_inventory). Optionally, the inventory is exported to a JSON file.
+    Automatic usage:
+        wlst manageJmsQueues.py list_inventory [env] [json_file]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    json_file_name = ""
+    if is_standalone:
+        if len(sys.argv) > 3:
+            json_file_name = sys.argv[3]
+    else:
+        refresh_choice = raw_input("[INPUT] Re-read the configuration, Y/N [N]? ")
+        if refresh_choice.strip().upper() == "Y":
+            invalidate_inventory(connection_info)
+        json_file_name = raw_input("[INPUT] Enter JSON file name to export the inventory to or leave blank: ").strip()
+
+    try:
+        inventory = get_jms_inventory(connection_info)
+        report = []
+        for module in inventory["modules"]:
+            for dest in module["destinations"]:
+                report.append([module["name"], dest["type"], dest["name"], str(dest["jndi_name"]),
+                               str(dest["subdeployment"]), str(dest["error_destination"]),
+                               str(dest["redelivery_limit"]), str(dest["quota"])])
+        report_title = "REPORT: JMS INVENTORY, " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + \
+                       strftime("%Y-%m-%d %H:%M:%S %Z", localtime(inventory["created"]))
+        col_names = ("MODULE", "TYPE", "NAME", "JNDI_NAME", "SUBDEPLOYMENT", "ERROR_DESTINATION", "REDELIVERY_LIMIT",
+                     "QUOTA")
+        create_report(report_title, report, col_names, is_sorted=True, is_total=False)
+
+        if json_file_name:
+            json_file = open(json_file_name, "w")
+            try:
+                json_file.write(to_json(inventory) + "\n")
+            finally:
+                json_file.close()
+            log("INFO", "The inventory was exported to " + json_file_name + ".")
+        log("INFO", "list_inventory completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def get_jms_inventory(connection_info):
+    """
+    This function returns the JMS module configuration of the environment, cached for the session.
+    The configuration is read in one traversal of the read-only domain configuration (DomainConfiguration of the
+    domain runtime service), so no edit session (edit lock) is needed.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: dict. {"env": env, "created": time, "modules": [{"name": name, "subdeployments": [names],
+        "quotas": [names], "destinations": [{"type": type, "name": name, "jndi_name": name, "subdeployment": name,
+        "error_destination": name, "redelivery_limit": limit, "quota": name, "foreign_server": name}]}]}
+        Values not applicable to the destination type are None.
+    """
+    env = connection_info["env"]
+    if env in inventory_cache and inventory_cache[env]["url"] == connection_info["url"]:
+        return inventory_cache[env]
+
+    log("INFO", "Reading the JMS configuration...")
+    connection = get_mbean_connection(connection_info)
+    domain = connection.getAttribute(ObjectName(DOMAIN_RUNTIME_SERVICE), "DomainConfiguration")
+    inventory = {"env": env, "url": connection_info["url"], "created": time.time(), "modules": []}
+    for jms_system_resource in connection.getAttribute(domain, "JMSSystemResources"):
+        module = {"name": jms_system_resource.getKeyProperty("Name"), "subdeployments": [], "quotas": [],
+                  "destinations": []}
+        for sub_deployment in connection.getAttribute(jms_system_resource, "SubDeployments"):
+            module["subdeployments"].append(sub_deployment.getKeyProperty("Name"))
+        jms_resource = connection.getAttribute(jms_system_resource, "JMSResource")
+        resources = get_attributes(connection, jms_resource, ["Queues", "UniformDistributedQueues", "Topics",
+                                                              "UniformDistributedTopics", "ForeignServers", "Quotas"])
+        for quota in resources["Quotas"]:
+            module["quotas"].append(quota.getKeyProperty("Name"))
+        for dest_type in ("Queue", "UniformDistributedQueue", "Topic", "UniformDistributedTopic"):
+            for dest_bean in resources[dest_type + "s"]:
+                dest = get_attributes(connection, dest_bean, ["Name", "JNDIName", "SubDeploymentName", "Quota",
+                                                              "DeliveryFailureParams"])
+                delivery = get_attributes(connection, dest["DeliveryFailureParams"],
+                                          ["RedeliveryLimit", "ErrorDestination"])
+                module["destinations"].append({
+                    "type": dest_type, "name": dest["Name"], "jndi_name": dest["JNDIName"],
+                    "subdeployment": dest["SubDeploymentName"], "quota": get_object_name_key(dest["Quota"]),
+                    "error_destination": get_object_name_key(delivery["ErrorDestination"]),
+                    "redelivery_limit": delivery["RedeliveryLimit"], "foreign_server": None})
+        for foreign_server in resources["ForeignServers"]:
+            for foreign_dest in connection.getAttribute(foreign_server, "ForeignDestinations"):
+                dest = get_attributes(connection, foreign_dest, ["Name", "LocalJNDIName"])
+                module["destinations"].append({
+                    "type": "ForeignDestination", "name": dest["Name"], "jndi_name": dest["LocalJNDIName"],
+                    "subdeployment": None, "quota": None, "error_destination": None, "redelivery_limit": None,
+                    "foreign_server": foreign_server.getKeyProperty("Name")})
+        inventory["modules"].append(module)
+    inventory_cache[env] = inventory
+    return inventory
+
+
+def invalidate_inventory(connection_info):
+    """
+    This function drops the cached JMS configuration of the environment, e.g. after it was changed.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    if connection_info["env"] in inventory_cache:
+        del inventory_cache[connection_info["env"]]
+
+
+def find_inventory_destinations(inventory, name):
+    """
+    This function returns the configured destinations with the given name in all JMS modules.
+    :type inventory: dict. As returned by get_jms_inventory()
+    :type name: str
+    :rtype: list. A list of [module name, destination dict]
+    """
+    found = []
+    for module in inventory["modules"]:
+        for dest in module["destinations"]:
+            if dest["name"] == name:
+                found.append([module["name"], dest])
+    return found
+
+
+def get_queues_to_delete(found):
+    """
+    This function selects the destinations deleted by delete_queues() from those found by name: per JMS module
+    the uniform distributed queue, otherwise the queue, otherwise the foreign destinations. Only queues are deleted,
+    topics are never selected.
+    :type found: list. A list of [module name, destination dict] as returned by find_inventory_destinations()
+    :rtype: list. A list of [module name, destination dict]
+    """
+    selected = []
+    modules = []
+    for module_name, dest in found:
+        if module_name not in modules:
+            modules.append(module_name)
+    for module_name in modules:
+        for dest_types in (["UniformDistributedQueue"], ["Queue"], ["ForeignDestination"]):
+            module_selected = []
+            for found_module_name, dest in found:
+                if found_module_name == module_name and dest["type"] in dest_types:
+                    module_selected.append([module_name, dest])
+            if module_selected:
+                selected.extend(module_selected)
+                break
+    return selected
+
+
+def get_object_name_key(object_name):
+    """
+    This function returns the Name key of a configuration MBean ObjectName, e.g. of the error destination.
+    :type object_name: ObjectName or None
+    :rtype: str. The name, None if the ObjectName is None
+    """
+    if object_name is None:
+        return None
+    return object_name.getKeyProperty("Name")
+
+
+def to_json(value):
+    """
+    This function serializes dicts, lists, strings, numbers and None to JSON (there is no json module in Jython 2.2).
+    :type value: any of the above
+    :rtype: str
+    """
+    if value is None:
+        return "null"
+    elif isinstance(value, dict):
+        items = []
+        keys = value.keys()
+        keys.sort()
+        for key in keys:
+            items.append(to_json(str(key)) + ": " + to_json(value[key]))
+        return "{" + ", ".join(items) + "}"
+    elif isinstance(value, list) or isinstance(value, tuple):
+        items = []
+        for item in value:
+            items.append(to_json(item))
+        return "[" + ", ".join(items) + "]"
+    elif isinstance(value, int) or isinstance(value, long) or isinstance(value, float):
+        return str(value)
+    text = str(value)
+    for char, escaped in (("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n"), ("\r", "\\r"), ("\t", "\\t")):
+        text = text.replace(char, escaped)
+    return '"' + text + '"'
+
+
+def get_jms_server_stores(connection_info):
+    """
+    This function reads the persistent stores of the JMS servers from the (read-only) domain configuration.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: dict. {"JMS server name": "store name"}, store name is None for the default store
+    """
+    connection = get_mbean_connection(connection_info)
+    domain = connection.getAttribute(ObjectName(DOMAIN_RUNTIME_SERVICE), "DomainConfiguration")
+    jms_server_stores = {}
+    for jms_server in connection.getAttribute(domain, "JMSServers"):
+        store = connection.getAttribute(jms_server, "PersistentStore")
+        if store is None:
+            jms_server_stores[jms_server.getKeyProperty("Name")] = None
+        else:
+            jms_server_stores[jms_server.getKeyProperty("Name")] = store.getKeyProperty("Name")
+    return jms_server_stores
+
+
+def apply_retention(connection_info):
+    """
+    This function purges messages according to a retention policy file. Each line of the file maps a queue name
+    pattern to a maximum message age and/or a maximum queue depth (the first matching line wins), e.g.
+        *_dmq = max_age=7d
+        WLMsgOrders* = max_age=48h, max_depth=100000
+    Age units: m (minutes), h (hours), d (days). All matching destinations are resolved in one scan.
+    For each destination the purge boundary is the later of (now - max_age) and the timestamp of the newest message
+    exceeding max_depth. A per-destination watermark (the boundary of the last complete purge) is stored in a local
+    file, so every run only selects messages between the watermark and the new boundary. The watermark is not advanced
+    when a purge is incomplete, and it is ignored when max_depth is exceeded, so that older messages (e.g. redriven
+    to the queue with their original JMSTimestamp) are purged as well.
+    Automatic usage:
+        wlst manageJmsQueues.py apply_retention [env] [policy_file]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    settings = connection_info["settings"]
+    policy_file_name = settings["retention_policy_file"]
+    if is_standalone:
+        if len(sys.argv) > 3:
+            policy_file_name = sys.argv[3]
+    else:
+        policy_input = raw_input("[INPUT] Enter retention policy file [" + policy_file_name + "]: ")
+        if policy_input.strip():
+            policy_file_name = policy_input.strip()
+
+    try:
+        policies = read_retention_policies(policy_file_name)
+        if not policies:
+            log("ERROR", "No retention policies were found in " + policy_file_name + ".")
+            return
+        watermarks = load_properties(settings["retention_watermark_file"])
+        sdf = java.text.SimpleDateFormat("yyyy-MM-dd HH:mm:ss.SSS")
+        now = System.currentTimeMillis()
+
+        members = []  # [dest dict, policy, boundary, selector, msg_to_del_cnt, dest bean]
+        msg_to_del_total = 0
+        for dest in discover_destinations(connection_info, ["MessagesCurrentCount"]):
+            policy = None
+            for candidate in policies:
+                if fnmatch.fnmatchcase(get_queue_name(dest["Name"]), candidate["pattern"]):
+                    policy = candidate
+                    break
+            if policy is None:
+                continue
+
+            dest_bean = get_mbean_proxy(connection_info, dest["object_name"])
+            boundary = None
+            is_depth_exceeded = False
+            if policy["max_age"] is not None:
+                boundary = now - policy["max_age"]
+            if policy["max_depth"] is not None and dest["MessagesCurrentCount"] > policy["max_depth"]:
+                depth_boundary = get_depth_boundary(dest_bean, dest["MessagesCurrentCount"] - policy["max_depth"])
+                if depth_boundary is not None:
+                    is_depth_exceeded = True
+                    if boundary is None or depth_boundary > boundary:
+                        boundary = depth_boundary
+            if boundary is None:
+                continue
+
+            # The selector is built with readable timestamps and converted by parse_filter
+            msg_filter = "JMSTimestamp < " + sdf.format(Date(boundary))
+            watermark_key = connection_info["env"] + "/" + dest["Name"]
+            watermark = watermarks.getProperty(watermark_key)
+            if watermark and not is_depth_exceeded:
+                if long(watermark) >= boundary:
+                    continue  # Nothing new since the last purge
+                msg_filter = "JMSTimestamp >= " + sdf.format(Date(long(watermark))) + " AND " + msg_filter
+            msg_filter = parse_filter(msg_filter)
+            msg_to_del_cnt = count_messages(dest_bean, msg_filter)
+            members.append([dest, policy, boundary, msg_filter, msg_to_del_cnt, dest_bean])
+            msg_to_del_total = msg_to_del_total + msg_to_del_cnt
+
+        if not members:
+            log("INFO", "No destinations need to be purged.")
+            return
+        log("INFO", str(msg_to_del_total) + " messages to delete from " + str(len(members)) + " destinations.")
+        if msg_to_del_total > 0 and not is_standalone:
+            del_choice = raw_input("[INPUT] Do you want to apply the retention policies, Y/N [Y]? ")
+        else:
+            del_choice = "Y"
+        if not (del_choice.upper() == "Y" or del_choice.strip() == ""):
+            log("WARNING", "Operation canceled by the user.")
+            return
+
+        tasks = []
+        for member in members:
+            tasks.append([delete_member_messages, (member[5], member[3])])
+        results = run_tasks(tasks, settings["parallel_threads"])
+
+        report = []
+        for i in range(len(members)):
+            dest, policy, boundary, msg_filter, msg_to_del_cnt, dest_bean = members[i]
+            msg_deleted_cnt, error = results[i]
+            if error:
+                log("ERROR", "Failed to delete messages from '" + dest["Name"] + "': " + error)
+                msg_deleted_cnt = 0
+                status = "Failed"
+            elif msg_deleted_cnt == msg_to_del_cnt:
+                watermarks.setProperty(connection_info["env"] + "/" + dest["Name"], str(boundary))
+                status = "Purged"
+            else:
+                # The watermark is kept, so the messages not deleted (e.g. pending) are selected again by the next run
+                status = "Incomplete"
+            report.append([dest["Name"], policy["pattern"], format_timestamp(boundary), dest["MessagesCurrentCount"],
+                           msg_to_del_cnt, msg_deleted_cnt, status])
+        store_properties(watermarks, settings["retention_watermark_file"], "Retention watermarks: env/destination=ms")
+
+        report_title = "REPORT: APPLY RETENTION, " + \
+                       parse_url(connection_info["url"])["hostname"] + " (" + connection_info["env"] + "), " + cur_dt()
+        col_names = ("QUEUE_NAME", "POLICY", "BOUNDARY", "CUR_MSG", "MSG_TO_DELETE", "MSG_DELETED", "STATUS")
+        create_report(report_title, report, col_names, is_sorted=True, is_total=True)
+        log("INFO", "apply_retention completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def read_retention_policies(policy_file_name):
+    """
+    This function reads the retention policy file. Lines starting with # are comments.
+    Line format: [queue name pattern] = max_age=[N][m|h|d], max_depth=[N] (either of the limits can be omitted)
+    :type policy_file_name: str
+    :rtype: list. A list of dicts {"pattern": pattern, "max_age": ms or None, "max_depth": count or None} in file order
+    """
+    age_units = {"m": 60000, "h": 3600000, "d": 86400000}
+    policies = []
+    policy_file = open(policy_file_name, "r")
+    try:
+        for line in policy_file.readlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "=" not in line:
+                raise ValueError("Invalid retention policy: " + line)
+            pattern, limits = line.split("=", 1)
+            policy = {"pattern": pattern.strip(), "max_age": None, "max_depth": None}
+            for limit in limits.split(","):
+                if not limit.strip():
+                    continue
+                if "=" not in limit:
+                    raise ValueError("Invalid retention policy: " + line)
+                name, value = limit.split("=", 1)
+                name = name.strip()
+                value = value.strip()
+                if name == "max_age" and value[-1:] in age_units:
+                    policy["max_age"] = long(value[:-1]) * age_units[value[-1:]]
+                elif name == "max_depth":
+                    policy["max_depth"] = long(value)
+                else:
+                    raise ValueError("Invalid retention policy: " + line)
+            policies.append(policy)
+    finally:
+        policy_file.close()
+    return policies
+
+
+def get_depth_boundary(dest, excess_cnt):
+    """
+    This function returns the timestamp boundary that selects the excess_cnt oldest messages of the destination,
+    i.e. JMSTimestamp of the message at position excess_cnt (from the head) plus 1 ms.
+    :type dest: JMSDestinationRuntimeMBean
+    :type excess_cnt: int
+    :rtype: long. None if the destination has fewer messages
+    """
+    cursor = dest.getMessages("", 60)
+    try:
+        if dest.getCursorSize(cursor) < excess_cnt:
+            return None
+        messages = dest.getItems(cursor, Long(excess_cnt - 1), 1)
+        if not messages:
+            return None
+        return JMSMessageInfo(messages[0]).getMessage().getJMSTimestamp() + 1
+    finally:
+        dest.closeCursor(cursor)
+
+
+def save_snapshot(connection_info):
+    """
+    This function saves the session snapshot of the destination statistics (taken if missing or expired)
+    to a compact local tab separated file. The file can be opened later instead of an environment (offline mode),
+    so reports [1]-[4] and the counters of [8] can be rendered without connecting to the domain.
+    Automatic usage:
+        wlst manageJmsQueues.py save_snapshot [env] [file_name]
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    file_name = "manageJmsQueues_" + connection_info["env"] + "_" + strftime("%Y%m%d_%H%M%S", localtime()) \
+                + SNAPSHOT_FILE_EXT
+    if is_standalone:
+        if len(sys.argv) > 3:
+            file_name = sys.argv[3]
+    else:
+        file_input = raw_input("[INPUT] Enter snapshot file name [" + file_name + "]: ")
+        if file_input.strip():
+            file_name = file_input.strip()
+    if not file_name.endswith(SNAPSHOT_FILE_EXT):
+        file_name = file_name + SNAPSHOT_FILE_EXT
+
+    try:
+        snapshot = get_snapshot(connection_info)
+        snapshot_file = open(file_name, "w")
+        try:
+            snapshot_file.write("# " + os.path.basename(sys.argv[0]) + " snapshot\n")
+            snapshot_file.write("env=" + snapshot["env"] + "\n")
+            snapshot_file.write("url=" + snapshot["url"] + "\n")
+            snapshot_file.write("created=" + str(snapshot["created"]) + "\n")
+            not_scanned = []
+            for server_name, reason in snapshot["not_scanned"]:
+                not_scanned.append(server_name)
+            snapshot_file.write("not_scanned=" + ",".join(not_scanned) + "\n")
+            snapshot_file.write("\t".join(["Name", "server", "jms_server"] + SNAPSHOT_NAME_PARTS
+                                          + SNAPSHOT_ATTRIBUTES) + "\n")
+            for dest in snapshot["destinations"]:
+                dest_info = parse_destination_name(dest["Name"])
+                row = [dest["Name"], dest["server"], str(dest["jms_server"])]
+                for name_part in SNAPSHOT_NAME_PARTS:
+                    row.append(dest_info.get(name_part, ""))
+                for attr_name in SNAPSHOT_ATTRIBUTES:
+                    row.append(str(dest[attr_name]))
+                snapshot_file.write("\t".join(row) + "\n")
+        finally:
+            snapshot_file.close()
+        log("INFO", "Snapshot of " + str(len(snapshot["destinations"])) + " destinations saved to " + file_name + ".")
+        log("INFO", "save_snapshot completed.")
+
+    except (WLSTException, ValueError, NameError, Exception), e:
+        log("ERROR", str(e))
+
+
+def load_snapshot(file_name):
+    """
+    This function loads a snapshot file saved by save_snapshot().
+    :type file_name: str
+    :rtype: dict. {"env": env, "url": url, "created": time, "destinations": [destination dicts],
+        "not_scanned": [[server name, reason]]}
+    """
+    snapshot = {"destinations": []}
+    col_names = None
+    snapshot_file = open(file_name, "r")
+    try:
+        for line in snapshot_file.readlines():
+            line = line.rstrip("\r\n")
+            if not line or line.startswith("#"):
+                continue
+            if col_names is None:
+                if "\t" in line:
+                    col_names = line.split("\t")  # The header of the destination rows
+                else:
+                    key, value = line.split("=", 1)
+                    snapshot[key] = value
+                continue
+            dest = {"object_name": None}
+            values = line.split("\t")
+            for i in range(len(col_names)):
+                if col_names[i] in SNAPSHOT_ATTRIBUTES:
+                    dest[col_names[i]] = long(values[i])
+                else:
+                    dest[col_names[i]] = values[i]
+            snapshot["destinations"].append(dest)
+    finally:
+        snapshot_file.close()
+    snapshot["created"] = float(snapshot["created"])
+    not_scanned = []
+    for server_name in snapshot.get("not_scanned", "").split(","):
+        if server_name:
+            not_scanned.append([server_name, "not scanned when the snapshot was saved"])
+    snapshot["not_scanned"] = not_scanned
+    return snapshot
+
+
+def get_queue_info_from_snapshot(connection_info, queue_name):
+    """
+    This function returns the counters of a given queue from the snapshot file (offline mode of get_queue_info).
+    Information about the messages is not available offline.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type queue_name: str
+    """
+    snapshot = connection_info["offline"]
+    col_names = ("PROPERTY", "VALUE")
+    is_found = False
+    for dest in snapshot["destinations"]:
+        name = get_queue_name(dest["Name"])
+        if queue_name != name:
+            continue
+        is_found = True
+        report = [("Queue name", name),
+                  ("Queue full name", dest["Name"]),
+                  ("Messages Current Count", dest["MessagesCurrentCount"]),
+                  ("Messages Received Count", dest["MessagesReceivedCount"]),
+                  ("Messages Pending Count", dest["MessagesPendingCount"]),
+                  ("Messages High Count", dest["MessagesHighCount"]),
+                  ("Consumers Current Count", dest["ConsumersCurrentCount"])]
+        report_title = "REPORT: INFORMATION ON QUEUE " + queue_name + ", " + dest["server"] + \
+                       " (" + connection_info["env"] + ") " + get_snapshot_time(snapshot)
+        create_report(report_title, report, col_names, is_sorted=False, is_total=False)
+    if not is_found:
+        log("WARNING", "Queue was not found.")
+    log("INFO", "get_queue_info completed.")
+
+
+def count_messages(dest, msg_filter):
+    """
+    This function returns count of messages on the destination matching the filter.
+    The cursor opened for counting is always closed.
+    :type dest: JMSDestinationRuntimeMBean
+    :type msg_filter: str. Message selector, "" for all messages
+    :rtype: int
+    """
+    if not msg_filter:
+        return dest.messagesCurrentCount
+    cursor = dest.getMessages(msg_filter, 60)
+    try:
+        return dest.getCursorSize(cursor)
+    finally:
+        dest.closeCursor(cursor)
+
+
 def create_report(report_title, report, col_names, is_sorted, is_total):
     """ This function prints a tabular report with left or right text adjustment depending on the content data type.
     :type report_title: str. The title of the report
@@ -950,14 +4184,276 @@ def create_report(report_title, report, col_names, is_sorted, is_total):
                 row_adj.append(rw[x][0].ljust(rw[x][1]))
         report_adj.append(" ".join(row_adj))
 
-    # Print the report
-    f.write("\n")
-    print("")
-    log_report(report_title)
-    for row in report_adj:
-        log_report(row)
-    f.write("\n")
-    print("")
+    # Print the report, the lock keeps log lines of background jobs out of it
+    log_lock.acquire()
+    try:
+        f.write("\n")
+        print("")
+        log_report(report_title)
+        for row in report_adj:
+            log_report(row)
+        f.write("\n")
+        print("")
+    finally:
+        log_lock.release()
+
+
+def run_job(connection_info, name, sources, func, args):
+    """
+    This function runs func(*args + (job,)) in the foreground or, if the user chooses so in the interactive mode,
+    as a background job on a worker thread, so that the menu (e.g. the list reports) can be used meanwhile.
+    The progress of a job is derived from the current message count of its source destinations (see get_job_progress).
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type name: str. Name of the job, e.g. "move_messages Q1 -> Q2"
+    :type sources: list. A list of [source destination (JMSDestinationRuntimeMBean), count of messages to process]
+    :type func: function. The operation, must accept the job as the last argument
+    :type args: tuple. The arguments of the operation except the job
+    """
+    for source in sources:
+        source.append(source[0].getMessagesCurrentCount())  # The count before the job
+    job = {"id": len(jobs) + 1, "name": name, "env": connection_info["env"], "connection_info": connection_info,
+           "sources": sources, "started": time.time(), "finished": None, "status": "Running", "canceled": False}
+    if not is_standalone:
+        bg_choice = raw_input("[INPUT] Run in the background, Y/N [N]? ")
+        if bg_choice.strip().upper() == "Y":
+            jobs.append(job)
+            thread = Thread(Job(job, func, args), "job-" + str(job["id"]))
+            thread.setDaemon(True)
+            thread.start()
+            log("INFO", "Job #" + str(job["id"]) + " (" + name + ") started. Use [23]-[25] to follow or cancel it.")
+            return
+    apply(func, args + (job,))
+
+
+class Job(Runnable):
+    """
+    A background job started by run_job(). Calls func(*args + (job,)) and records the outcome in the job.
+    """
+    def __init__(self, job, func, args):
+        self.job = job
+        self.func = func
+        self.args = args
+
+    def run(self):
+        job = self.job
+        try:
+            apply(self.func, self.args + (job,))
+            if job["canceled"]:
+                job["status"] = "Canceled"
+            else:
+                job["status"] = "Completed"
+        except:
+            job["status"] = "Failed"
+            log("ERROR", "Job #" + str(job["id"]) + ": " + str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
+        job["finished"] = time.time()
+        invalidate_snapshot(job["connection_info"])
+        log("INFO", "Job #" + str(job["id"]) + " (" + job["name"] + ") " + job["status"].lower() + ".")
+
+
+def get_job_tasks(job, tasks):
+    """
+    This function wraps [function, args] tasks for run_tasks(), so that the tasks not yet started are skipped
+    once the job is canceled. A task already running on the server cannot be interrupted and completes.
+    :type job: dict. The job, see run_job()
+    :type tasks: list. A list of [function, args] pairs
+    :rtype: list. A list of [function, args] pairs
+    """
+    job_tasks = []
+    for func, args in tasks:
+        job_tasks.append([run_unless_canceled, (job, func, args)])
+    return job_tasks
+
+
+def run_unless_canceled(job, func, args):
+    """
+    This function calls func(*args) unless the job is canceled.
+    :type job: dict. The job, see run_job()
+    :rtype: the result of the call
+    """
+    if job["canceled"]:
+        raise Exception("Canceled by the user")
+    return apply(func, args)
+
+
+def get_job_failed_status(job):
+    """
+    This function returns the report status of a failed task of the job: Canceled or Failed.
+    :type job: dict. The job, see run_job()
+    :rtype: str
+    """
+    if job["canceled"]:
+        return "Canceled"
+    return "Failed"
+
+
+def get_job_progress(job):
+    """
+    This function estimates the progress of a job per source destination from the decrease of its current message
+    count since the start of the job, capped at the count of the messages to process. New messages or consumers
+    on the source make the estimate inaccurate.
+    :type job: dict. The job, see run_job()
+    :rtype: list. A list of [source name, count of messages to process, count of processed messages or None]
+    """
+    progress = []
+    for dest, msg_to_process_cnt, msg_cur_cnt in job["sources"]:
+        try:
+            processed_cnt = min(msg_to_process_cnt, max(0, msg_cur_cnt - dest.getMessagesCurrentCount()))
+        except:
+            processed_cnt = None  # The destination is not available
+        progress.append([dest.name, msg_to_process_cnt, processed_cnt])
+    return progress
+
+
+def list_jobs(connection_info):
+    """
+    This function lists the background jobs of the session with their status and progress.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    report = []
+    for job in jobs:
+        to_process_total = 0
+        processed_total = 0
+        if job["status"] == "Running":
+            for name, msg_to_process_cnt, processed_cnt in get_job_progress(job):
+                to_process_total = to_process_total + msg_to_process_cnt
+                if processed_cnt is not None:
+                    processed_total = processed_total + processed_cnt
+            progress = get_percentage(processed_total, to_process_total)
+            elapsed = time.time() - job["started"]
+        else:
+            progress = "-"
+            elapsed = job["finished"] - job["started"]
+        report.append([job["id"], job["name"], job["env"], job["status"], format_timestamp(job["started"] * 1000),
+                       int(elapsed), progress])
+    report_title = "REPORT: LIST OF JOBS, " + cur_dt()
+    col_names = ("ID", "NAME", "ENV", "STATUS", "STARTED", "ELAPSED_SEC", "PROGRESS")
+    create_report(report_title, report, col_names, is_sorted=False, is_total=False)
+    log("INFO", "list_jobs completed.")
+
+
+def job_status(connection_info):
+    """
+    This function shows the progress of a background job per source destination.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    job = get_job()
+    if job is None:
+        return
+    report = []
+    for name, msg_to_process_cnt, processed_cnt in get_job_progress(job):
+        if processed_cnt is None:
+            report.append([name, msg_to_process_cnt, "-", "-"])
+        else:
+            report.append([name, msg_to_process_cnt, processed_cnt, get_percentage(processed_cnt, msg_to_process_cnt)])
+    report_title = "REPORT: JOB #" + str(job["id"]) + " " + job["name"] + " (" + job["env"] + "), " + job["status"] \
+                   + ", " + cur_dt()
+    col_names = ("SOURCE QUEUE", "MSG_TO_PROCESS", "MSG_PROCESSED", "PROGRESS")
+    create_report(report_title, report, col_names, is_sorted=True, is_total=False)
+    log("INFO", "job_status completed.")
+
+
+def cancel_job(connection_info):
+    """
+    This function cancels a running background job: the queue members not yet processed are skipped,
+    the member being processed on the server completes.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    job = get_job()
+    if job is None:
+        return
+    if job["status"] != "Running":
+        log("WARNING", "Job #" + str(job["id"]) + " is not running.")
+        return
+    cancel_choice = raw_input("[INPUT] Do you want to cancel job #" + str(job["id"]) + " (" + job["name"]
+                              + "), Y/N [Y]? ")
+    if cancel_choice.strip().upper() == "Y" or cancel_choice.strip() == "":
+        job["canceled"] = True
+        log("INFO", "Job #" + str(job["id"]) + " will stop after the queue member being processed.")
+
+
+def get_job():
+    """
+    This function prompts for a job ID and returns the job.
+    :rtype: dict. The job, None if not found
+    """
+    if not jobs:
+        log("INFO", "There are no jobs.")
+        return None
+    job_id = raw_input("[INPUT] Enter job ID [" + str(len(jobs)) + "]: ").strip()
+    if not job_id:
+        job_id = str(len(jobs))
+    if not job_id.isdigit() or int(job_id) < 1 or int(job_id) > len(jobs):
+        log("ERROR", "Job " + job_id + " was not found.")
+        return None
+    return jobs[int(job_id) - 1]
+
+
+def get_percentage(part, total):
+    """
+    This function returns the part of the total in percent, e.g. "42%".
+    :type part: int
+    :type total: int
+    :rtype: str
+    """
+    if total <= 0:
+        return "100%"
+    return str(int(part * 100 / total)) + "%"
+
+
+class Task(Callable):
+    """
+    A unit of work for run_tasks(). Calls func(*args) and returns [result, error], where error is "" on success.
+    Errors are returned rather than raised, so one failing task does not hide the results of the others.
+    """
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.started = None  # Time when the task was started by a thread
+
+    def call(self):
+        self.started = time.time()
+        try:
+            return [apply(self.func, self.args), ""]
+        except:
+            return [None, str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1])]
+
+
+def run_tasks(tasks, max_threads):
+    """
+    This function runs the given tasks serially (max_threads <= 1) or on a pool of at most max_threads threads.
+    The tasks must not prompt the user, this is left to the caller. They may write to the log, log() is serialised
+    by log_lock, but then their lines can interleave with those of the other tasks.
+    :type tasks: list. A list of [function, args] pairs, where args is a tuple of the function arguments
+    :type max_threads: int. Concurrency limit
+    :rtype: list. A list of [result, error] pairs in the same order as the tasks
+    """
+    results = []
+    if max_threads <= 1 or len(tasks) <= 1:
+        for func, args in tasks:
+            results.append(Task(func, args).call())
+        return results
+
+    pool = Executors.newFixedThreadPool(min(max_threads, len(tasks)))
+    try:
+        futures = []
+        for func, args in tasks:
+            futures.append(pool.submit(Task(func, args)))
+        for future in futures:
+            results.append(future.get())
+    finally:
+        pool.shutdown()
+    return results
+
+
+def format_timestamp(timestamp):
+    """
+    This function formats a JMS timestamp in milliseconds as local date time in %Y-%m-%d %H:%M:%S format.
+    :type timestamp: long. Milliseconds, or None
+    :rtype: str. Formatted timestamp, "-" for None
+    """
+    if timestamp is None:
+        return "-"
+    return strftime('%Y-%m-%d %H:%M:%S', localtime(float(timestamp // 1000)))
 
 
 def cur_dt():
@@ -976,8 +4472,12 @@ def log(level, text):
     :type level: str. INFO, WARNING, ERROR
     :type text: str. The text of the log message
     """
-    f.write(cur_dt() + " " + ID + " [" + level + "] " + str(text) + "\n")
-    print(cur_dt() + " [" + level + "] " + str(text))
+    log_lock.acquire()
+    try:
+        f.write(cur_dt() + " " + ID + " [" + level + "] " + str(text) + "\n")
+        print(cur_dt() + " [" + level + "] " + str(text))
+    finally:
+        log_lock.release()
 
 
 def log_report(text):
@@ -986,15 +4486,19 @@ def log_report(text):
     E.g. "2018-09-05 12:22:33 id0010 [INFO] Creating session"
     :type text: str
     """
-    f.write(text + "\n")
-    print(text)
+    log_lock.acquire()
+    try:
+        f.write(text + "\n")
+        print(text)
+    finally:
+        log_lock.release()
 
 
 def start_connect(function_name, connection_info):
     """
     This function connection to the given server if not yet connected.
     :type function_name: string. Name of the function that will be started. Used for logging.
-    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
     :rtype: dict
     """
     log("INFO", "======================================================================")
@@ -1011,12 +4515,10 @@ def connect_wls(connection_info):
         1. Prompts for an environment among those available,
         2. Reads the properties from the corresponding property file
         3. Makes a connection to the given environment
-    :type connection_info: dict. Connection information: is_connected, env, url, username, password
+    Connections are kept in the JMX connection pool, so switching back to a previously used environment is instant.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
     :rtype: dict
     """
-    if connection_info["is_connected"]:
-        disconnect()
-
     env = connection_info["env"]
     if not env:
         print("")
@@ -1025,42 +4527,612 @@ def connect_wls(connection_info):
         env_list = list(prop_env_file.keys())
         env_list.sort()
         for env in env_list:
-            print(env)
+            if env in jmx_pool:
+                print(env + " (connected)")
+            else:
+                print(env)
+        snapshot_files = []
+        for f_name in os.listdir(os.getcwd()):
+            if f_name.endswith(SNAPSHOT_FILE_EXT):
+                snapshot_files.append(f_name)
+        snapshot_files.sort()
+        for f_name in snapshot_files:
+            print(f_name + " (offline)")
         print("")
 
         while True:
-            env = raw_input("[INPUT] Choose an environment from the list above: ")
-            if env in prop_env_file:
+            env = raw_input("[INPUT] Choose an environment or a snapshot file from the list above: ")
+            if env in prop_env_file or (env.endswith(SNAPSHOT_FILE_EXT) and os.path.exists(env)):
                 break
             else:
                 print(cur_dt() + " [WARNING] The provided environment name is not found in the list. Try again.")
 
+    # Offline mode: reports are rendered from a snapshot file
+    if env.endswith(SNAPSHOT_FILE_EXT):
+        log("INFO", "Loading snapshot file " + env + "...")
+        try:
+            snapshot = load_snapshot(env)
+            connection_info = {"is_connected": True, "env": snapshot["env"], "url": snapshot["url"], "username": "",
+                               "password": "", "settings": get_settings(None), "offline": snapshot}
+            log("INFO", "Offline mode: " + str(len(snapshot["destinations"])) + " destinations of " + snapshot["env"]
+                + " captured " + get_snapshot_time(snapshot) + ".")
+        except:
+            log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
+            connection_info = {"is_connected": False, "env": env, "url": "", "username": "", "password": "",
+                               "settings": get_settings(None), "offline": None}
+        return connection_info
+
     # Check that env was provided when starting the script as standalone
-    if env in prop_env_file:
-        prop_file_name = prop_env_file[env]
-    else:
+    if env not in prop_env_file:
         log("ERROR", "Property file for the environment " + env + " was not found.  ")
         f.close()
         exit()
 
-    # Read properties from the propery file
-    in_stream = FileInputStream(prop_file_name)
-    prop_file = Properties()
-    prop_file.load(in_stream)
+    connection_info = read_connection_info(env)
+    log("INFO", "Trying to connect to " + connection_info["url"] + " as " + connection_info["username"] + "...")
+    try:
+        get_mbean_connection(connection_info)
+        connection_info["is_connected"] = True
+    except:
+        log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
+    return connection_info
+
+
+def read_connection_info(env):
+    """
+    This function reads the connection details and the settings of the environment from its property file.
+    :type env: str. Environment name, one of the keys of prop_env_file
+    :rtype: dict. Connection information: is_connected (always False), env, url, username, password, settings, offline
+    """
+    in_stream = FileInputStream(prop_env_file[env])
+    try:
+        prop_file = Properties()
+        prop_file.load(in_stream)
+    finally:
+        in_stream.close()
     url = prop_file.getProperty("url")
     username = prop_file.getProperty("usrname")
     password = prop_file.getProperty("password")
+    settings = get_settings(prop_file)
+    return {"is_connected": False, "env": env, "url": url, "username": username, "password": password,
+            "settings": settings, "offline": None}
+
+
+def get_mbean_connection(connection_info):
+    """
+    This function returns a connection to the domain runtime MBean server of the environment.
+    Connections are pooled per environment, so several environments can be kept open at once.
+    A pooled connection is health-checked before it is returned only if it has been idle for jmx_check_idle_sec or
+    a call on it has failed since (see mark_jmx_connection_failed), so that borrowing it for every MBean proxy costs
+    no round trip. A broken connection is reopened transparently, retrying with exponential backoff
+    (settings jmx_connect_retries and jmx_backoff_ms).
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: MBeanServerConnection
+    """
+    if connection_info["offline"]:
+        raise Exception("The operation is not available in offline mode (snapshot file). Change environment.")
+    env = connection_info["env"]
+    if env in jmx_pool:
+        pooled = jmx_pool[env]
+        if pooled["url"] == connection_info["url"]:
+            now = time.time()
+            if not pooled["failed"] and now - pooled["used"] < connection_info["settings"]["jmx_check_idle_sec"]:
+                pooled["used"] = now
+                return pooled["connection"]
+            try:
+                pooled["connection"].getMBeanCount()
+                pooled["used"] = now
+                pooled["failed"] = False
+                return pooled["connection"]
+            except:
+                log("WARNING", "Connection to " + env + " is broken: " + str(sys.exc_info()[1]) + ". Reconnecting...")
+        close_jmx_connection(env)
+
+    settings = connection_info["settings"]
+    backoff = settings["jmx_backoff_ms"]
+    attempt = 1
+    while True:
+        try:
+            connector = open_jmx_connector(connection_info)
+            connection = connector.getMBeanServerConnection()
+            jmx_pool[env] = {"url": connection_info["url"], "connector": connector, "connection": connection,
+                             "used": time.time(), "failed": False}
+            return connection
+        except:
+            if attempt >= settings["jmx_connect_retries"]:
+                raise
+            log("WARNING", "Connection attempt " + str(attempt) + " to " + connection_info["url"] + " failed: "
+                + str(sys.exc_info()[1]) + ". Retrying in " + str(backoff) + " ms...")
+            time.sleep(backoff / 1000.0)
+            backoff = backoff * 2
+            attempt = attempt + 1
+
+
+def open_jmx_connector(connection_info):
+    """
+    This function opens a JMX connector to the domain runtime MBean server over t3 (or the protocol of the url).
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: JMXConnector
+    """
+    url_info = parse_url(connection_info["url"])
+    service_url = JMXServiceURL(url_info["protocol"], url_info["hostname"], int(url_info["port"]), DOMAIN_RUNTIME_JNDI)
+    env = Hashtable()
+    env.put(Context.SECURITY_PRINCIPAL, connection_info["username"])
+    env.put(Context.SECURITY_CREDENTIALS, connection_info["password"])
+    env.put(JMXConnectorFactory.PROTOCOL_PROVIDER_PACKAGES, "weblogic.management.remote")
+    return JMXConnectorFactory.connect(service_url, env)
+
+
+def mark_jmx_connection_failed(env):
+    """
+    This function marks the pooled JMX connection of the environment (if any) as failed, so that it is
+    health-checked the next time it is borrowed (see get_mbean_connection).
+    :type env: str
+    """
+    if env in jmx_pool:
+        jmx_pool[env]["failed"] = True
+
+
+def close_jmx_connection(env):
+    """
+    This function closes the pooled JMX connection of the environment (if any). Errors are ignored.
+    :type env: str
+    """
+    if env in jmx_pool:
+        try:
+            jmx_pool[env]["connector"].close()
+        except:
+            pass
+        del jmx_pool[env]
+
+
+def get_domain_runtime_service(connection_info):
+    """
+    This function returns a proxy of DomainRuntimeServiceMBean on top of the pooled JMX connection.
+    The proxy works the same way as the WLST domainRuntimeService, e.g. get_domain_runtime_service(ci).getServerRuntimes()
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: DomainRuntimeServiceMBean
+    """
+    connection = get_mbean_connection(connection_info)
+    return MBeanServerInvocationHandler.newProxyInstance(connection, ObjectName(DOMAIN_RUNTIME_SERVICE))
+
+
+def find_destinations(connection_info, queue_name, attr_names):
+    """
+    This function returns all destinations (e.g. the members of a distributed queue) with the given name.
+    The name is either the short queue name (see get_queue_name) or the full destination name.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type queue_name: str
+    :type attr_names: list. Names of the destination attributes to read in addition to Name
+    :rtype: list. Destinations as returned by discover_destinations()
+    """
+    members = []
+    for dest in discover_destinations(connection_info, attr_names):
+        if dest["Name"] == queue_name or get_queue_name(dest["Name"]) == queue_name:
+            members.append(dest)
+    if get_not_scanned(connection_info):
+        log("WARNING", "Members of " + queue_name + " on the servers which were not scanned are not included.")
+    return members
+
+
+def get_snapshot(connection_info):
+    """
+    This function returns the session snapshot of the destination statistics of the environment.
+    The cached snapshot is reused while it is younger than snapshot_ttl_sec, otherwise the domain is scanned again.
+    A partial snapshot (some servers not scanned) is not reused, the scan is repeated for the missing servers only.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: dict. {"env": env, "url": url, "created": time, "destinations": [destination dicts],
+        "not_scanned": [[server name, reason]]}
+    """
+    if connection_info["offline"]:
+        return connection_info["offline"]
+    env = connection_info["env"]
+    if env in snapshot_cache:
+        snapshot = snapshot_cache[env]
+        if snapshot["url"] == connection_info["url"] and not snapshot["not_scanned"] \
+                and time.time() - snapshot["created"] < connection_info["settings"]["snapshot_ttl_sec"]:
+            log("INFO", "Using the snapshot taken " + str(int(time.time() - snapshot["created"])) + " seconds ago.")
+            return snapshot
+    return take_snapshot(connection_info)
+
+
+def take_snapshot(connection_info):
+    """
+    This function scans the domain for the destination statistics and caches the result as the session snapshot.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: dict. {"env": env, "url": url, "created": time, "destinations": [destination dicts],
+        "not_scanned": [[server name, reason]]}
+    """
+    created = time.time()
+    destinations = discover_destinations(connection_info, SNAPSHOT_ATTRIBUTES)
+    return cache_snapshot(connection_info, created, destinations)
+
+
+def cache_snapshot(connection_info, created, destinations):
+    """
+    This function caches the destinations of the last discovery as the session snapshot.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type created: float. Time of the start of the discovery
+    :type destinations: list. Destinations with SNAPSHOT_ATTRIBUTES as returned by discover_destinations()
+    :rtype: dict. The snapshot, see take_snapshot()
+    """
+    snapshot = {"env": connection_info["env"], "url": connection_info["url"], "created": created,
+                "destinations": destinations, "not_scanned": get_not_scanned(connection_info)}
+    snapshot_cache[connection_info["env"]] = snapshot
+    return snapshot
+
+
+def invalidate_snapshot(connection_info):
+    """
+    This function drops the session snapshot of the environment, e.g. after a destructive operation.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    if connection_info["env"] in snapshot_cache:
+        del snapshot_cache[connection_info["env"]]
+
+
+def get_snapshot_status(connection_info):
+    """
+    This function returns the age of the session snapshot for the menu, e.g. "snapshot age 12 s" or "no snapshot"
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: str
+    """
+    if connection_info["env"] not in snapshot_cache:
+        return "no snapshot"
+    return "snapshot age " + str(int(time.time() - snapshot_cache[connection_info["env"]]["created"])) + " s"
+
+
+def get_snapshot_time(snapshot):
+    """
+    This function returns the time of the snapshot and its age for report titles,
+    e.g. "2018-08-27 13:28:15 CEST (snapshot age 12 s)"
+    :type snapshot: dict
+    :rtype: str
+    """
+    snapshot_dt = strftime("%Y-%m-%d %H:%M:%S %Z", localtime(snapshot["created"]))
+    return snapshot_dt + " (snapshot age " + str(int(time.time() - snapshot["created"])) + " s)"
 
-    log("INFO", "Trying to connect to " + url + " as " + username + "...")
+
+def get_attributes(connection, object_name, attr_names):
+    """
+    This function reads several attributes of an MBean in one round trip.
+    :type connection: MBeanServerConnection
+    :type object_name: ObjectName
+    :type attr_names: list. Names of the attributes, e.g. ["Name", "MessagesCurrentCount"]
+    :rtype: dict. {"attribute name": value}
+    """
+    values = {}
+    for attr in connection.getAttributes(object_name, jarray.array(attr_names, String)).asList().toArray():
+        values[attr.getName()] = attr.getValue()
+    return values
+
+
+def get_servers(connection_info):
+    """
+    This function returns the servers of the domain with their state (RUNNING, ADMIN, ...).
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: list. A list of dicts {"Name": name, "State": state}
+    """
+    connection = get_mbean_connection(connection_info)
+    servers = []
+    for server_object_name in connection.getAttribute(ObjectName(DOMAIN_RUNTIME_SERVICE), "ServerRuntimes"):
+        servers.append(get_attributes(connection, server_object_name, ["Name", "State"]))
+    return servers
+
+
+def discover_destinations(connection_info, attr_names):
+    """
+    This function discovers all JMS destination runtimes of the domain with one query per server
+    and reads the given attributes of each destination in one round trip.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type attr_names: list. Names of the destination attributes to read in addition to Name
+    :rtype: list. A list of dicts with the attributes plus object_name, server and jms_server
+    """
+    return discover_runtime_mbeans(connection_info, "JMSDestinationRuntime", attr_names, "queues")
+
+
+def discover_runtime_mbeans(connection_info, mbean_type, attr_names, description):
+    """
+    This function discovers all runtime MBeans of the given type in the domain with one query per server
+    and reads the given attributes of each MBean in one round trip.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type mbean_type: str. MBean type, e.g. "JMSDestinationRuntime", "JMSDurableSubscriberRuntime"
+    :type attr_names: list. Names of the attributes to read in addition to Name
+    :type description: str. What is searched for, used for logging, e.g. "queues"
+    :rtype: list. A list of dicts with the attributes plus object_name, server and jms_server
+    """
+    return discover_runtime_mbean_types(connection_info, [[mbean_type, attr_names]], description)[mbean_type]
+
+
+def discover_runtime_mbean_types(connection_info, mbean_types, description):
+    """
+    This function discovers the runtime MBeans of several types in one pass over the servers of the domain
+    (one query per server and type) and reads the given attributes of each MBean in one round trip.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type mbean_types: list. A list of [mbean_type, attr_names] pairs, e.g. [["JMSServerRuntime", ["BytesCurrentCount"]]]
+    :type description: str. What is searched for, used for logging, e.g. "queues"
+    :rtype: dict. {"mbean_type": a list of dicts with the attributes plus object_name, server and jms_server}
+    """
+    settings = connection_info["settings"]
+    scan_key = description
+    for mbean_type, attr_names in mbean_types:
+        scan_key = scan_key + "/" + mbean_type + ":" + ",".join(attr_names)
+    env_checkpoints = scan_checkpoints.setdefault(connection_info["env"], {})
+    checkpoints = env_checkpoints.setdefault(scan_key, {})  # {"server": [time, {"mbean_type": [mbeans]}]}
+    mbeans = {}
+    for mbean_type, attr_names in mbean_types:
+        mbeans[mbean_type] = []
+    servers = get_servers(connection_info)
+    if len(servers) == 0:
+        log("WARNING", "No servers were found at " + parse_url(connection_info["url"])["hostname"] + ".")
+    not_scanned = []
+    scans = []  # [server name, Task, Future]
+    pool = None
+    deadline = time.time() + settings["scan_budget_sec"]
     try:
-        connect(username, password, url)
-        is_connected = True
-        connection_info = {"is_connected": is_connected, "env": env, "url": url, "username": username, "password": password}
-    except:
-        log("ERROR", str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1]))
-        is_connected = False
-        connection_info = {"is_connected": is_connected, "env": env, "url": url, "username": username, "password": password}
-    return connection_info
+        for server in servers:
+            checkpoint = checkpoints.get(server["Name"])
+            if checkpoint and time.time() - checkpoint[0] < settings["snapshot_ttl_sec"]:
+                log("INFO", "Reusing " + description + " of server " + server["Name"]
+                    + " from the previous partial scan.")
+                for mbean_type, attr_names in mbean_types:
+                    mbeans[mbean_type].extend(checkpoint[1][mbean_type])
+            elif server["State"] != "RUNNING":
+                log("WARNING", "Server " + server["Name"] + " is " + str(server["State"]) + ", skipped.")
+                not_scanned.append([server["Name"], "state " + str(server["State"])])
+            else:
+                if pool is None:
+                    pool = Executors.newFixedThreadPool(max(1, settings["scan_threads"]))
+                log("INFO", "Searching " + description + " on server " + server["Name"] + "...")
+                task = Task(scan_server, (connection_info, server["Name"], mbean_types))
+                scans.append([server["Name"], task, pool.submit(task)])
+
+        for server_name, task, future in scans:
+            server_mbeans, error = wait_for_task(future, task, deadline, settings["scan_server_timeout_sec"])
+            if error:
+                log("WARNING", "Server " + server_name + " was not scanned: " + error)
+                not_scanned.append([server_name, error])
+                continue
+            checkpoints[server_name] = [time.time(), server_mbeans]
+            for mbean_type, attr_names in mbean_types:
+                mbeans[mbean_type].extend(server_mbeans[mbean_type])
+    finally:
+        if pool is not None:
+            pool.shutdownNow()  # Interrupts the scans still running after the deadline
+    if not not_scanned:
+        del env_checkpoints[scan_key]  # A complete scan needs no checkpoints
+    last_scan[connection_info["env"]] = not_scanned
+    return mbeans
+
+
+def scan_server(connection_info, server_name, mbean_types):
+    """
+    This function reads the runtime MBeans of the given types of one server, retrying with exponential backoff
+    (settings scan_retries and jmx_backoff_ms) when the server fails. MBeans unregistered during the scan are skipped.
+    Runs as a task of discover_runtime_mbean_types(), therefore it does not write to the log.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type server_name: str
+    :type mbean_types: list. A list of [mbean_type, attr_names] pairs
+    :rtype: list. [{"mbean_type": a list of dicts with the attributes plus object_name, server and jms_server}
+        or None, error or None]
+    """
+    retries = connection_info["settings"]["scan_retries"]
+    backoff_ms = connection_info["settings"]["jmx_backoff_ms"]
+    attempt = 0
+    while True:
+        try:
+            connection = get_mbean_connection(connection_info)
+            server_mbeans = {}
+            for mbean_type, attr_names in mbean_types:
+                server_mbeans[mbean_type] = []
+                query = ObjectName("com.bea:Type=" + mbean_type + ",Location=" + server_name + ",*")
+                for object_name in connection.queryNames(query, None).toArray():
+                    try:
+                        mbean = get_attributes(connection, object_name, ["Name"] + attr_names)
+                    except InstanceNotFoundException:
+                        continue
+                    mbean["object_name"] = object_name
+                    mbean["server"] = server_name
+                    mbean["jms_server"] = object_name.getKeyProperty("JMSServerRuntime")
+                    server_mbeans[mbean_type].append(mbean)
+            return [server_mbeans, None]
+        except:
+            error = str(sys.exc_info()[0]) + " " + str(sys.exc_info()[1])
+            mark_jmx_connection_failed(connection_info["env"])
+            attempt = attempt + 1
+            if attempt > retries:
+                return [None, error + " (" + str(attempt) + " attempts)"]
+            time.sleep(backoff_ms / 1000.0)
+            backoff_ms = backoff_ms * 2
+
+
+def wait_for_task(future, task, deadline, timeout_sec):
+    """
+    This function waits for the result of a task submitted to a thread pool, at most timeout_sec seconds from
+    the start of the task and never beyond the deadline. A task still queued at the deadline counts as timed out.
+    :type future: Future. Returned by ExecutorService.submit(task)
+    :type task: Task
+    :type deadline: float. Time in seconds since the epoch
+    :type timeout_sec: int
+    :rtype: list. The [result, error] pair of the task, or [None, reason] when the task timed out or failed
+    """
+    while True:
+        now = time.time()
+        limit = deadline
+        reason = "scan budget exceeded"
+        if task.started is not None and task.started + timeout_sec < limit:
+            limit = task.started + timeout_sec
+            reason = "timeout after " + str(timeout_sec) + " s"
+        if now >= limit:
+            future.cancel(True)
+            return [None, reason]
+        try:
+            # Wait in short steps, so that the limit of a task which was still queued is applied once it starts
+            result, error = future.get(long(min(limit - now, 1.0) * 1000) + 1, TimeUnit.MILLISECONDS)
+        except TimeoutException:
+            continue
+        if error:
+            return [None, error]
+        return result
+
+
+def get_not_scanned(connection_info):
+    """
+    This function returns the servers which were not scanned by the last discovery in the environment.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :rtype: list. A list of [server name, reason] pairs, empty if all servers were scanned
+    """
+    return last_scan.get(connection_info["env"], [])
+
+
+def get_partial_mark(not_scanned):
+    """
+    This function returns the mark appended to the title of a report based on a partial scan.
+    :type not_scanned: list. A list of [server name, reason] pairs
+    :rtype: str. " [PARTIAL]" or ""
+    """
+    if not_scanned:
+        return " [PARTIAL]"
+    return ""
+
+
+def log_not_scanned(not_scanned, what="server(s)"):
+    """
+    This function logs the footer of a report based on a partial scan: the servers (or e.g. destinations)
+    not scanned and why.
+    :type not_scanned: list. A list of [server name, reason] pairs
+    :type what: str. What was not scanned, "server(s)" by default
+    """
+    if not not_scanned:
+        return
+    if what == "server(s)":
+        log("WARNING", "PARTIAL REPORT. Not scanned: " + str(len(not_scanned)) + " server(s), repeat the report "
+            + "to rescan only these servers:")
+    else:
+        log("WARNING", "PARTIAL REPORT. Not scanned: " + str(len(not_scanned)) + " " + what + ":")
+    for server_name, reason in not_scanned:
+        log("WARNING", "    " + server_name + " - " + reason)
+
+
+def refresh_counters(connection_info, destinations, attr_names):
+    """
+    This function re-reads the given attributes of already discovered destinations without rediscovering the topology.
+    Destinations that no longer exist are removed from the list.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type destinations: list. Destinations returned by discover_destinations()
+    :type attr_names: list. Names of the destination attributes to re-read
+    :rtype: int. Count of the removed destinations
+    """
+    connection = get_mbean_connection(connection_info)
+    existing = []
+    for dest in destinations:
+        try:
+            dest.update(get_attributes(connection, dest["object_name"], attr_names))
+            existing.append(dest)
+        except InstanceNotFoundException:
+            pass
+    removed_cnt = len(destinations) - len(existing)
+    destinations[:] = existing
+    return removed_cnt
+
+
+def get_mbean_proxy(connection_info, object_name):
+    """
+    This function returns a proxy of the MBean with the given name on top of the pooled JMX connection,
+    e.g. of a JMSDestinationRuntimeMBean found by discover_destinations()
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    :type object_name: ObjectName
+    :rtype: the MBean interface
+    """
+    return MBeanServerInvocationHandler.newProxyInstance(get_mbean_connection(connection_info), object_name)
+
+
+def wlst_connect(connection_info):
+    """
+    This function makes a WLST connection to the environment unless already connected to it.
+    WLST is only needed for the edit operations (edit()/startEdit()), all runtime operations use the JMX connection pool.
+    :type connection_info: dict. Connection information: is_connected, env, url, username, password, settings, offline
+    """
+    if connection_info["offline"]:
+        raise Exception("The operation is not available in offline mode (snapshot file). Change environment.")
+    if wlst_session["env"] == connection_info["env"]:
+        return
+    if wlst_session["env"]:
+        disconnect()
+        wlst_session["env"] = ""
+    connect(connection_info["username"], connection_info["password"], connection_info["url"])
+    wlst_session["env"] = connection_info["env"]
+
+
+def disconnect_all():
+    """
+    This function closes all pooled JMX connections and the WLST connection (if any). Errors are ignored.
+    """
+    for env in jmx_pool.keys():
+        close_jmx_connection(env)
+    if wlst_session["env"]:
+        try:
+            disconnect()
+        except:
+            pass
+        wlst_session["env"] = ""
+
+
+def get_settings(prop_file):
+    """
+    This function returns the optional settings of the script: the defaults from DEFAULT_SETTINGS
+    overridden by the values found in the environment property file.
+    Values are converted to the type of the default value (int or str).
+    :type prop_file: Properties. The environment property file, or None to return the defaults
+    :rtype: dict
+    """
+    settings = {}
+    for key in DEFAULT_SETTINGS.keys():
+        settings[key] = DEFAULT_SETTINGS[key]
+        if prop_file is None:
+            continue
+        value = prop_file.getProperty(key)
+        if value is None or not value.strip():
+            continue
+        try:
+            if isinstance(DEFAULT_SETTINGS[key], (int, long)):
+                settings[key] = int(value.strip())
+            else:
+                settings[key] = value.strip()
+        except ValueError:
+            log("WARNING", "Invalid value '" + value + "' of the setting " + key + ". Using the default value "
+                + str(DEFAULT_SETTINGS[key]) + ".")
+    return settings
+
+
+def load_properties(file_name):
+    """
+    This function loads a property file. A missing file results in empty properties.
+    :type file_name: str
+    :rtype: Properties
+    """
+    properties = Properties()
+    if os.path.exists(file_name):
+        in_stream = FileInputStream(file_name)
+        try:
+            properties.load(in_stream)
+        finally:
+            in_stream.close()
+    return properties
+
+
+def store_properties(properties, file_name, comment):
+    """
+    This function saves properties to a property file.
+    :type properties: Properties
+    :type file_name: str
+    :type comment: str. Comment written at the top of the file
+    """
+    out_stream = FileOutputStream(file_name)
+    try:
+        properties.store(out_stream, comment)
+    finally:
+        out_stream.close()
 
 
 def get_queue_name(name):
@@ -1189,34 +5261,22 @@ def get_env_prop_file():
 
 def parse_filter(msg_filter):
     """ 
-    The function converts a given timestamp in in the format yyyy-MM-dd HH:mm[:ss[.SSS]] into milliseconds
+    The function converts timestamps in the format yyyy-MM-dd HH:mm[:ss[.SSS]] found in the filter into milliseconds.
+    Quotes around the timestamps are removed, e.g. "JMSTimestamp > '2019-01-01 00:00'" -> "JMSTimestamp > 1546297200000".
+    All timestamps of the filter are converted, e.g. "JMSTimestamp >= 2019-01-01 00:00 AND JMSTimestamp < 2019-02-01 00:00"
     :type: msg_filter: str
     :rtype: str
-    """    
-    # Search for timestamp in format "yyyy-MM-dd HH:mm:ss.SSS"
-    search_result = re.search("(.*)[\'|\"]*(\d{4}-\d{2}-\d{2}.\d{2}:\d{2}:\d{2}\.\d{3})", msg_filter)
-    if search_result:
-        filter_part1 = search_result.group(1)
-        filter_part2 = search_result.group(2)
-        msg_filter = filter_part1 + str(get_milliseconds(filter_part2))
-        return msg_filter
-    
-    # Search for timestamp in format "yyyy-MM-dd HH:mm:ss"
-    search_result = re.search("(.*)(\d{4}-\d{2}-\d{2}.\d{2}:\d{2}:\d{2})", msg_filter)
-    if search_result:
-        filter_part1 = search_result.group(1)
-        filter_part2 = search_result.group(2)
-        msg_filter = filter_part1 + str(get_milliseconds(filter_part2 + ".000"))
-        return msg_filter
-    
-    # Search for timestamp in format "yyyy-MM-dd HH:mm"
-    search_result = re.search("(.*)(\d{4}-\d{2}-\d{2}.\d{2}:\d{2})", msg_filter)
-    if search_result:
-        filter_part1 = search_result.group(1)
-        filter_part2 = search_result.group(2)
-        msg_filter = filter_part1 + str(get_milliseconds(filter_part2 + ":00.000"))
-        return msg_filter
-    return msg_filter
+    """
+    def replace_timestamp(search_result):
+        timestamp_str = search_result.group(1)
+        timestamp_str = timestamp_str[:10] + " " + timestamp_str[11:]
+        if len(timestamp_str) == 16:  # Timestamp in format "yyyy-MM-dd HH:mm"
+            timestamp_str = timestamp_str + ":00.000"
+        elif len(timestamp_str) == 19:  # Timestamp in format "yyyy-MM-dd HH:mm:ss"
+            timestamp_str = timestamp_str + ".000"
+        return str(get_milliseconds(timestamp_str))
+
+    return re.sub("[\'\"]?(\d{4}-\d{2}-\d{2}.\d{2}:\d{2}(:\d{2}(\.\d{3})?)?)[\'\"]?", replace_timestamp, msg_filter)
 
 
 def get_milliseconds(timestamp_str):
@@ -1231,6 +5291,75 @@ def get_milliseconds(timestamp_str):
     return timestampe_in_millisec
 
 
+# Optional settings with their default values. Can be overridden in the environment property files.
+DEFAULT_SETTINGS = {
+    "parallel_threads": 1,  # Max count of queue members processed in parallel by destructive operations (1 - serially)
+    "jmx_connect_retries": 3,  # Max count of attempts to (re)open a JMX connection
+    "jmx_backoff_ms": 1000,  # Delay before the second connection attempt, doubled for every next attempt
+    "jmx_check_idle_sec": 60,  # Idle time after which a pooled JMX connection is health-checked before reuse
+    "scan_retries": 2,  # Count of retries of a failed server during discovery
+    "scan_threads": 10,  # Count of servers scanned in parallel during discovery
+    "scan_server_timeout_sec": 30,  # Max time of the discovery on one server
+    "scan_budget_sec": 120,  # Max total time of the discovery, servers not scanned by then are skipped
+    "watch_interval_sec": 10,  # Polling interval of the watch operation
+    "watch_cycles": 0,  # Default number of watch cycles (0 - until interrupted)
+    "watch_dmq_max_msg": 0,  # Alert when a DMQ queue has more current messages
+    "watch_no_consumers_sec": 300,  # Alert when a non-DMQ queue has no consumers for longer
+    "watch_pend_growth_intervals": 3,  # Alert when pending messages grow for so many intervals in a row
+    "watch_clear_intervals": 3,  # Clear an alert when its condition is false for so many intervals in a row
+    "snapshot_ttl_sec": 60,  # Reports [1]-[4] are rendered from the session snapshot while it is younger than this
+    "top_n": 20,  # Default number of queues listed by top_queues
+    "consumer_sample_sec": 10,  # Time between the two samples of the received counts taken by list_consumers
+    "imbalance_ratio": 2,  # Max/min member depth marked as imbalanced by list_logical_queues
+    "find_max_hits": 10,  # Default count of messages after which find_message stops
+    "find_cursor_timeout_sec": 10,  # Cursor timeout and max search time per destination of find_message
+    "oldest_age_timeout_sec": 10,  # Max time of reading the oldest message of a destination for OLDEST_AGE
+    "dashboard_interval_sec": 5,  # Refresh interval of the dashboard
+    "dashboard_rows": 40,  # Max count of queues shown by the dashboard
+    "quiesce": "none",  # Pause the source during [5] and [7]: none, production, consumption or both
+    "quiesce_target": "N",  # Y - pause the target of [7] as well
+    "page_size": 500,  # Count of messages fetched from a cursor in one round trip when streaming messages
+    "dedup_properties": "",  # Comma separated message properties included in the payload digest of find_duplicates
+    "dedup_batch_size": 100,  # Count of JMSMessageIDs in one delete selector of find_duplicates
+    "dedup_max_groups": 100,  # Max count of duplicate groups shown in the report of find_duplicates
+    "reconcile_max_messages": 10000000,  # Max count of messages per queue of reconcile (8 bytes of memory each)
+    "reconcile_max_rows": 1000,  # Max count of differences listed in the report of reconcile
+    "retention_policy_file": "manageJmsQueues_retention.policy",  # Default policy file of apply_retention
+    "retention_watermark_file": "manageJmsQueues_retention.watermarks",  # Boundaries of the last apply_retention runs
+    "routing_rules_file": "manageJmsQueues_routing.rules",  # Default rule file of route_messages
+    "queue_spec_file": "manageJmsQueues_queues.spec",  # Default spec file of create_queues
+    "migrate_connection_factory": "weblogic.jms.ConnectionFactory",  # JNDI name in the target env of migrate_messages
+    "migrate_batch_size": 100,  # Count of messages sent in one transaction by migrate_messages
+    "move_rate": 0,  # Messages per second of a paced move_messages (0 - no rate limit)
+    "move_batch_size": 100,  # Max count of JMSMessageIDs in one slice of a paced move_messages
+    "move_pause_sec": 0,  # Pause after each slice of a paced move_messages without a rate (0 - move all at once)
+    "move_max_backlog_per_consumer": 100,  # A paced move_messages waits while the target has more messages per consumer
+    "move_max_wait_sec": 600  # A paced move_messages stops after waiting so long for the consumers of the target
+}
+
+# Runtime MBeans are read over JMX connections to the domain runtime MBean server, pooled per environment
+DOMAIN_RUNTIME_JNDI = "/jndi/weblogic.management.mbeanservers.domainruntime"
+DOMAIN_RUNTIME_SERVICE = "com.bea:Name=DomainRuntimeService," \
+                         "Type=weblogic.management.mbeanservers.domainruntime.DomainRuntimeServiceMBean"
+jmx_pool = {}  # {"env": {"url": url, "connector": JMXConnector, "connection": MBeanServerConnection,
+#                   "used": time of the last borrow, "failed": True if a call failed since}}
+wlst_session = {"env": ""}  # Environment of the current WLST connection, used only by the edit operations
+
+# Session snapshots of the destination statistics, shared by the list reports
+SNAPSHOT_ATTRIBUTES = ["ConsumersCurrentCount", "MessagesCurrentCount", "MessagesPendingCount", "MessagesHighCount",
+                       "MessagesReceivedCount"]
+snapshot_cache = {}  # {"env": snapshot}
+inventory_cache = {}  # {"env": inventory}, JMS configuration read by get_jms_inventory()
+jobs = []  # Background jobs of the session, see run_job()
+log_lock = threading.RLock()  # Serializes the output of the main thread and the background jobs
+ANSI_CLEAR = "\033[2J\033[H"  # Clear the terminal and move the cursor home
+ANSI_CLEAR_LINE = "\033[K"  # Clear the rest of the line
+ANSI_MOVE = "\033[%d;%dH"  # Move the cursor to (row, column)
+scan_checkpoints = {}  # {"env": {"scan key": {"server": [time, mbeans]}}}, per-server results of partial scans
+last_scan = {}  # {"env": [[server name, reason]]}, servers not scanned by the last discovery
+SNAPSHOT_FILE_EXT = ".snapshot"
+SNAPSHOT_NAME_PARTS = ["jms_module", "jndi_name"]  # Parts of the destination name saved to snapshot files
+
 # Create a four digit random id left padded with zeros for logging
 n = random.randint(1, 1000)
 ID = "id" + str("%04d" % n)
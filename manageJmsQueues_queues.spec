@@ -0,0 +1,5 @@
+# Queues of create_queues, one per line:
+# [module];[subdeployment];[name];[jndi name];[error destination];[redelivery limit];[quota];[type]
+# Error destination, redelivery limit, quota and type (udq - uniform distributed queue, default, or queue) are optional.
+#WLMsgModule;WLMsgSub;WLMsgOrders;jms/WLMsgOrders;WLMsgOrders_dmq;5;WLMsgQuota
+#WLMsgModule;WLMsgSub;WLMsgOrders_dmq;jms/WLMsgOrders_dmq